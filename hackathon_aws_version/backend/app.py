@@ -1,5 +1,6 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
+import json
 import os
 from dotenv import load_dotenv
 from nvidia_rag import NVIDIARAGEngine
@@ -48,11 +49,64 @@ def chat():
             "error": str(e)
         }), 500
 
+def sse_event(event: dict) -> str:
+    """Format one server-sent event frame."""
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+@app.route('/chat/stream', methods=['POST'])
+def chat_stream():
+    """Stream the reply as server-sent events: token events, then done (or error)."""
+    data = request.json
+    user_message = data.get('message', '')
+    
+    if not user_message:
+        return jsonify({"error": "No message provided"}), 400
+    
+    temperature = data.get('temperature', 0.7)
+    max_tokens = data.get('max_tokens', 1024)
+    top_k = data.get('top_k', 3)
+    
+    def generate():
+        try:
+            for event in rag_engine.chat_stream(
+                user_message,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                top_k=top_k
+            ):
+                yield sse_event(event)
+        except Exception as e:
+            yield sse_event({
+                "type": "error",
+                "reply": f"I apologize, but I encountered an error: {str(e)}",
+                "error": str(e)
+            })
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 @app.route('/reload', methods=['POST'])
 def reload_kb():
-    """Reload knowledge base and recompute embeddings."""
-    count = rag_engine.load_knowledge_base()
-    return jsonify({"status": "reloaded", "documents": count}), 200
+    """
+    Start a background reload of the knowledge base and return its job
+    (poll /reload/<job_id>). Send {"wait": true} to block until it finishes.
+    """
+    data = request.get_json(silent=True) or {}
+    job = rag_engine.reload_jobs.submit()
+    if data.get('wait'):
+        job.wait()
+        return jsonify(job.as_dict()), 500 if job.status == 'failed' else 200
+    return jsonify(job.as_dict()), 202, {'Location': f"/reload/{job.id}"}
+
+@app.route('/reload/<job_id>', methods=['GET'])
+def reload_status(job_id):
+    """Status of a reload job; failed jobs leave the previous index serving."""
+    job = rag_engine.reload_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": rag_engine.reload_jobs.unknown_job_message(job_id)}), 404
+    return jsonify(job.as_dict()), 200
 
 @app.route('/models', methods=['GET'])
 def get_models():
@@ -0,0 +1,17 @@
+"""
+Production entry point for the async app:
+    gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker asgi:app
+Same preloading as wsgi.py; the lifespan hook sees the loaded knowledge
+base and doesn't reload it in each worker.
+"""
+
+import gc
+
+from asgi_app import app, rag_engine
+
+print("Loading knowledge base...")
+count = rag_engine.load_knowledge_base()
+print(f"Loaded {count} documents")
+
+gc.collect()
+gc.freeze()
@@ -0,0 +1,113 @@
+"""
+Async (ASGI) serving mode for the RAG engine.
+Chats await the NIM endpoints through AsyncOpenAI instead of blocking a
+thread, so a single process can hold hundreds of in-flight requests.
+
+Usage:
+    uvicorn asgi_app:app --host 0.0.0.0 --port 5000
+"""
+
+import asyncio
+import contextlib
+import os
+
+from dotenv import load_dotenv
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from nvidia_rag import NVIDIARAGEngine
+
+load_dotenv()
+
+# Initialize NVIDIA RAG Engine
+rag_engine = NVIDIARAGEngine()
+
+
+async def health(request: Request):
+    return JSONResponse(rag_engine.health_check())
+
+
+async def chat(request: Request):
+    data = await request.json()
+    user_message = data.get('message', '')
+
+    if not user_message:
+        return JSONResponse({"error": "No message provided"}, status_code=400)
+
+    try:
+        response = await rag_engine.achat(
+            user_message,
+            temperature=data.get('temperature', 0.7),
+            max_tokens=data.get('max_tokens', 1024),
+            top_k=data.get('top_k', 3)
+        )
+        return JSONResponse(response)
+
+    except Exception as e:
+        return JSONResponse({
+            "reply": f"I apologize, but I encountered an error: {str(e)}",
+            "sources": [],
+            "error": str(e)
+        }, status_code=500)
+
+
+async def reload_kb(request: Request):
+    """
+    Start a background reload of the knowledge base and return its job
+    (poll /reload/<job_id>). Send {"wait": true} to block until it finishes.
+    """
+    try:
+        data = await request.json()
+    except ValueError:
+        data = {}
+    job = rag_engine.reload_jobs.submit()
+    if isinstance(data, dict) and data.get('wait'):
+        await asyncio.to_thread(job.wait)
+        return JSONResponse(job.as_dict(), status_code=500 if job.status == 'failed' else 200)
+    return JSONResponse(job.as_dict(), status_code=202, headers={'Location': f"/reload/{job.id}"})
+
+
+async def reload_status(request: Request):
+    """Status of a reload job; failed jobs leave the previous index serving."""
+    job_id = request.path_params['job_id']
+    job = rag_engine.reload_jobs.get(job_id)
+    if job is None:
+        return JSONResponse({"error": rag_engine.reload_jobs.unknown_job_message(job_id)}, status_code=404)
+    return JSONResponse(job.as_dict())
+
+
+async def get_models(request: Request):
+    """Get current model configuration."""
+    return JSONResponse({
+        "llm_model": rag_engine.llm_model,
+        "embedding_model": rag_engine.embedding_model,
+        "base_url": os.getenv('NVIDIA_NIM_BASE_URL')
+    })
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    # Load knowledge base on startup (off the event loop: it may embed the corpus),
+    # unless asgi.py already preloaded it in the gunicorn master
+    if not rag_engine.knowledge_base:
+        print("Loading knowledge base...")
+        count = await asyncio.to_thread(rag_engine.load_knowledge_base)
+        print(f"Loaded {count} documents")
+    yield
+
+
+app = Starlette(
+    routes=[
+        Route('/health', health, methods=['GET']),
+        Route('/chat', chat, methods=['POST']),
+        Route('/reload', reload_kb, methods=['POST']),
+        Route('/reload/{job_id}', reload_status, methods=['GET']),
+        Route('/models', get_models, methods=['GET'])
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
+    lifespan=lifespan
+)
@@ -0,0 +1,29 @@
+import os
+import uuid
+
+
+def temp_path(path: str, suffix: str = '') -> str:
+    """
+    A temporary name next to `path` that no other writer will pick. PIDs
+    aren't enough: replicas sharing a volume often all run as PID 1.
+    """
+    return f"{path}.tmp-{uuid.uuid4().hex}{suffix}"
+
+
+def publish(tmp: str, path: str) -> bool:
+    """
+    Move a finished temp file to `path` unless it already exists, in which
+    case another process built the same file first: the temp file is dropped
+    and the caller opens the existing one. The hard link either creates `path`
+    or fails, so of several writers racing, exactly one publishes and no
+    published file is ever replaced. That matters on shared volumes (NFS/EFS),
+    where other hosts may have it mapped and would get ESTALE or SIGBUS once
+    its inode goes away. Returns whether this call published the file.
+    """
+    try:
+        os.link(tmp, path)
+        published = True
+    except FileExistsError:
+        published = False
+    os.remove(tmp)
+    return published
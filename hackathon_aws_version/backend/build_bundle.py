@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Build a retrieval bundle offline, so serving processes load it instead of
+chunking, embedding and indexing the corpus at startup:
+
+    python build_bundle.py ../../data/processed_blogs.json -o bundle
+    KNOWLEDGE_BASE_BUNDLE=bundle gunicorn -c gunicorn.conf.py wsgi:app
+
+The bundle uses the same configuration as the server (.env: embedding
+model, EMBEDDING_STORE_DTYPE, VECTOR_INDEX, CHUNKING, ...). Without a real
+NVIDIA_API_KEY it is a TF-IDF bundle.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from dotenv import load_dotenv
+
+from bundle import is_bundle, read_manifest
+from nvidia_rag import DEFAULT_KNOWLEDGE_BASE_PATH, NVIDIARAGEngine
+
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build a prebuilt retrieval bundle from a knowledge base')
+    parser.add_argument('knowledge_base', nargs='?',
+                        help='Corpus file (.json or .jsonl); default: KNOWLEDGE_BASE_PATH, '
+                             'then ../../data/processed_blogs.json')
+    parser.add_argument('-o', '--output', default='bundle', help='Bundle directory (default: bundle)')
+    parser.add_argument('--verify', metavar='BUNDLE', help='Only check an existing bundle against its checksums')
+    args = parser.parse_args()
+
+    if args.verify:
+        try:
+            manifest = read_manifest(args.verify, verify=True)
+        except (OSError, ValueError) as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print(f"✅ Bundle {manifest['version']}: {len(manifest['files'])} files match their checksums")
+        return
+
+    # Always from a corpus file: resolved here so KNOWLEDGE_BASE_BUNDLE is never picked up
+    data_path = args.knowledge_base or os.getenv('KNOWLEDGE_BASE_PATH') or DEFAULT_KNOWLEDGE_BASE_PATH
+    if is_bundle(data_path):
+        print(f"❌ {data_path} is a bundle; build from the corpus file it was made from")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    engine = NVIDIARAGEngine()
+    stats = engine.reload_knowledge_base(data_path)
+    if not stats['documents']:
+        print("❌ No documents in the knowledge base")
+        sys.exit(1)
+    manifest = engine.save_bundle(args.output)
+
+    size = sum(f['bytes'] for f in manifest['files'].values())
+    print(f"✅ Bundle {manifest['version']}: {manifest['documents']} documents, {manifest['chunks']} chunks, "
+          f"{manifest['embeddings']['kind']} embeddings, {size / 1e6:.1f} MB in {time.perf_counter() - start:.1f}s")
+    print(f"   {args.output}")
+
+
+if __name__ == "__main__":
+    main()
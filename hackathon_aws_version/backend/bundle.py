@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+from datetime import datetime
+from typing import Dict, List
+
+import numpy as np
+from scipy import sparse
+
+from atomic_files import temp_path
+from bm25 import BM25Index
+from document_store import ChunkStore, DocumentStore
+from embedding_store import EmbeddingStore
+from snapshot import IndexSnapshot
+from vector_index import ExactIndex, SparseIndex, create_index, load_or_build_index
+
+BUNDLE_FORMAT = 1
+MANIFEST = 'manifest.json'
+
+
+def is_bundle(path: str) -> bool:
+    return os.path.isfile(os.path.join(path, MANIFEST))
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_bundle(snapshot: IndexSnapshot, path: str, settings: Dict) -> Dict:
+    """
+    Write everything retrieval needs from a built snapshot as a bundle at
+    `path`: post and chunk stores, the embedding matrix (or fitted TF-IDF
+    vectorizer and matrix), the saved vector index and BM25 postings, plus a
+    manifest with each file's size and SHA-256. `settings` records the engine
+    configuration it was built with (embedding model, chunking, ...).
+
+    The bundle is assembled in a temporary directory, renamed to a versioned
+    sibling `<path>.v-<version>`, and `path` is a symlink switched to it in one
+    rename, so a reader always finds either the old bundle or the new one.
+    Earlier versions are left in place: pods may still be serving from them.
+    """
+    if not snapshot.knowledge_base or snapshot.document_embeddings is None:
+        raise ValueError("Snapshot has no documents or embeddings to bundle")
+
+    path = os.path.abspath(path)
+    tmp = temp_path(path)
+    os.makedirs(tmp)
+    try:
+        files: List[str] = []
+        files += snapshot.knowledge_base.save(os.path.join(tmp, 'documents'))
+        files += snapshot.chunks.save(os.path.join(tmp, 'chunks'))
+        with open(os.path.join(tmp, 'keys.json'), 'w', encoding='utf-8') as f:
+            json.dump({"keys": snapshot.doc_keys, "hashes": snapshot.doc_hashes}, f, ensure_ascii=False)
+        files.append(os.path.join(tmp, 'keys.json'))
+        snapshot.bm25.save(os.path.join(tmp, 'bm25.npz'))
+        files.append(os.path.join(tmp, 'bm25.npz'))
+
+        if snapshot.vectorizer is not None:
+            embeddings = {"kind": "tfidf", "features": len(snapshot.vectorizer.vocabulary_)}
+            with open(os.path.join(tmp, 'vectorizer.pkl'), 'wb') as f:
+                pickle.dump(snapshot.vectorizer, f, protocol=pickle.HIGHEST_PROTOCOL)
+            sparse.save_npz(os.path.join(tmp, 'tfidf.npz'), snapshot.document_embeddings, compressed=False)
+            files += [os.path.join(tmp, 'vectorizer.pkl'), os.path.join(tmp, 'tfidf.npz')]
+        else:
+            matrix = snapshot.document_embeddings
+            store = snapshot.embedding_store
+            embeddings = {"kind": "nim", "model": settings.get('embedding_model'),
+                          "dtype": str(matrix.dtype), "dimension": int(matrix.shape[1])}
+            np.save(os.path.join(tmp, 'embeddings.npy'), matrix)
+            files.append(os.path.join(tmp, 'embeddings.npy'))
+            if store is not None and store.scale is not None:
+                np.save(os.path.join(tmp, 'embeddings-scale.npy'), store.scale)
+                files.append(os.path.join(tmp, 'embeddings-scale.npy'))
+            index = snapshot.vector_index
+            if not isinstance(index, ExactIndex):
+                index_path = index.filename(os.path.join(tmp, 'embeddings'))
+                index.save(index_path)
+                files.append(index_path)
+
+        checksums = {
+            os.path.basename(file): {"bytes": os.path.getsize(file), "sha256": file_sha256(file)}
+            for file in files
+        }
+        # Versioned by what went in (posts, settings, embedding and index config), not by
+        # file bytes, which aren't reproducible (pickled sets); same inputs, same version
+        version = hashlib.sha256(json.dumps(
+            [snapshot.doc_hashes, settings, embeddings, snapshot.vector_index.info()],
+            sort_keys=True, default=str).encode('utf-8'))
+        manifest = {
+            "format": BUNDLE_FORMAT,
+            "version": version.hexdigest()[:16],
+            "created_at": datetime.now().isoformat(),
+            "source": os.path.abspath(snapshot.data_path) if snapshot.data_path else None,
+            "documents": len(snapshot.knowledge_base),
+            "chunks": len(snapshot.chunks),
+            "embeddings": embeddings,
+            "vector_index": snapshot.vector_index.info(),
+            "settings": settings,
+            "files": checksums
+        }
+        with open(os.path.join(tmp, MANIFEST), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+        # Same inputs give the same version: keep the directory that's already there
+        target = f"{path}.v-{manifest['version']}"
+        try:
+            os.rename(tmp, target)
+        except OSError:
+            if not os.path.isdir(target):
+                raise
+            shutil.rmtree(tmp, ignore_errors=True)
+        _switch_link(path, os.path.basename(target))
+        return manifest
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+
+def _switch_link(path: str, target: str):
+    """Point the symlink `path` at `target` (relative to its directory) atomically."""
+    if os.path.isdir(path) and not os.path.islink(path):
+        # A bundle from before versioned directories: move it aside once
+        legacy = temp_path(path)
+        print(f"⚠️  Moving unversioned bundle {path} to {legacy}")
+        os.rename(path, legacy)
+    link = temp_path(path)
+    os.symlink(target, link)
+    try:
+        os.replace(link, path)
+    except BaseException:
+        os.remove(link)
+        raise
+
+
+def read_manifest(path: str, verify: bool = False) -> Dict:
+    """
+    Load a bundle's manifest and check its files are all present with the
+    recorded sizes; `verify` also recomputes every SHA-256 (reads the whole bundle).
+    Checksums catch truncated or corrupted copies, not tampering: the manifest
+    sits next to the files, and a TF-IDF bundle's vectorizer is unpickled on
+    load, so only load bundles from a trusted source.
+    """
+    with open(os.path.join(path, MANIFEST), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('format') != BUNDLE_FORMAT:
+        raise ValueError(f"Unsupported bundle format {manifest.get('format')} in {path}")
+    for name, expected in manifest['files'].items():
+        file = os.path.join(path, name)
+        if not os.path.isfile(file) or os.path.getsize(file) != expected['bytes']:
+            raise ValueError(f"Bundle file missing or truncated: {file}")
+        if verify and file_sha256(file) != expected['sha256']:
+            raise ValueError(f"Bundle checksum mismatch: {file}")
+    return manifest
+
+
+def read_bundle(path: str, manifest: Dict, version: int = 0) -> IndexSnapshot:
+    """Open a bundle as a new snapshot; matrices and texts are memory-mapped, not read."""
+    snapshot = IndexSnapshot(version, os.path.abspath(path))
+    snapshot.knowledge_base = DocumentStore.load(os.path.join(path, 'documents'))
+    snapshot.chunks = ChunkStore.load(os.path.join(path, 'chunks'), snapshot.knowledge_base)
+    with open(os.path.join(path, 'keys.json'), 'r', encoding='utf-8') as f:
+        keys = json.load(f)
+    snapshot.doc_keys, snapshot.doc_hashes = keys['keys'], keys['hashes']
+    snapshot.bm25 = BM25Index.load(os.path.join(path, 'bm25.npz'))
+
+    if manifest['embeddings']['kind'] == 'tfidf':
+        with open(os.path.join(path, 'vectorizer.pkl'), 'rb') as f:
+            snapshot.vectorizer = pickle.load(f)
+        snapshot.document_embeddings = sparse.load_npz(os.path.join(path, 'tfidf.npz')).tocsr()
+        snapshot.vector_index = SparseIndex().build(snapshot.document_embeddings)
+    else:
+        matrix_path = os.path.join(path, 'embeddings.npy')
+        scale_path = os.path.join(path, 'embeddings-scale.npy')
+        matrix = np.load(matrix_path, mmap_mode='r')
+        scale = np.load(scale_path, mmap_mode='r') if 'embeddings-scale.npy' in manifest['files'] else None
+        snapshot.embedding_store = EmbeddingStore(matrix, scale, matrix_path)
+        snapshot.document_embeddings = matrix
+        # Load the saved index if VECTOR_INDEX matches the bundle's; otherwise build one in
+        # memory rather than writing into the bundle
+        index = create_index()
+        prefix = os.path.join(path, 'embeddings')
+        if not isinstance(index, ExactIndex) and os.path.basename(index.filename(prefix)) not in manifest['files']:
+            print(f"⚠️  Bundle has no {index.kind} index with these parameters; building it in memory")
+            prefix = None
+        snapshot.vector_index = load_or_build_index(index, prefix, matrix, scale)
+    snapshot.bundle = manifest
+    return snapshot
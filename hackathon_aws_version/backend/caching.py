@@ -0,0 +1,249 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from atomic_files import temp_path
+
+
+def normalize_query(query: str) -> str:
+    """Case-, whitespace- and trailing-punctuation-insensitive form of a query, used in cache keys."""
+    return ' '.join(query.lower().split()).rstrip('?!. ')
+
+
+class FileCacheBackend:
+    """
+    Shared cache stand-in that stores NumPy arrays as one .npy file per key.
+    Point several processes (or replicas sharing a volume) at the same
+    directory and they reuse each other's entries; a networked store such as
+    Redis can replace it by implementing the same get/set methods.
+
+    The directory is bounded: every `max_entries // 10` writes, a process
+    deletes expired files and then the oldest ones beyond `max_entries`.
+    """
+
+    def __init__(self, directory: str, ttl_seconds: float, max_entries: int = 10000):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._prune_every = max(1, max_entries // 10)
+        self._writes = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.prune()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(key.encode('utf-8')).hexdigest() + '.npy')
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                return None
+            return np.load(path)
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key: str, value: np.ndarray):
+        path = self._path(key)
+        tmp = temp_path(path)
+        try:
+            with open(tmp, 'wb') as f:
+                np.save(f, np.asarray(value))
+            os.replace(tmp, path)
+        except OSError:
+            pass
+        with self._lock:
+            self._writes += 1
+            due = self._writes % self._prune_every == 0
+        if due:
+            self.prune()
+
+    def prune(self) -> int:
+        """Delete expired entries (and stale temp files), then the oldest beyond max_entries; returns files removed."""
+        now = time.time()
+        entries, expired = [], []
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    try:
+                        mtime = entry.stat().st_mtime
+                    except OSError:
+                        continue
+                    if entry.name.endswith('.npy'):
+                        (expired if now - mtime > self.ttl_seconds else entries).append((mtime, entry.path))
+                    elif '.tmp-' in entry.name and now - mtime > 60:
+                        expired.append((mtime, entry.path))
+        except OSError:
+            return 0
+        if len(entries) > self.max_entries:
+            entries.sort()
+            expired += entries[:len(entries) - self.max_entries]
+        removed = 0
+        for _, path in expired:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass  # Another process got there first
+        return removed
+
+
+class TTLCache:
+    """Thread-safe in-process LRU cache with a size bound, per-entry TTL and hit/miss counters."""
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 3600.0, backend=None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.backend = backend
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.backend_hits = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+        value = self.backend.get(key) if self.backend is not None else None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.backend_hits += 1
+            self.hits += 1
+        self._store(key, value)
+        return value
+
+    def set(self, key: str, value: Any):
+        self._store(key, value)
+        if self.backend is not None:
+            self.backend.set(key, value)
+
+    def _store(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "backend_hits": self.backend_hits,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "shared_backend": type(self.backend).__name__ if self.backend is not None else None
+            }
+
+
+def vector_similarity(a, b) -> float:
+    """Cosine similarity of two L2-normalized query vectors (dense arrays or sparse rows)."""
+    if hasattr(a, 'multiply'):
+        return float(a.multiply(b).sum())
+    return float(np.dot(a, b))
+
+
+class ResponseCache:
+    """
+    Semantic cache of chat responses.
+    Entries are grouped by a context key (retrieved document IDs plus the
+    generation parameters and model); within a group, a new question reuses a
+    response if its query vector is within `threshold` cosine similarity of
+    a cached question, or if the normalized text matches exactly.
+    """
+
+    def __init__(self, threshold: float = 0.95, max_entries: int = 512, ttl_seconds: float = 600.0):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: 'OrderedDict[int, tuple]' = OrderedDict()
+        self._by_key: Dict[tuple, list] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def lookup(self, key: tuple, query_vector, query_text: str) -> Optional[Dict]:
+        now = time.monotonic()
+        with self._lock:
+            best_id, best_score = None, self.threshold
+            for entry_id in list(self._by_key.get(key, [])):
+                _, vector, text, _, expires_at = self._entries[entry_id]
+                if expires_at <= now:
+                    self._evict(entry_id)
+                    continue
+                if text == query_text:
+                    best_id = entry_id
+                    break
+                if vector is not None and query_vector is not None:
+                    score = vector_similarity(vector, query_vector)
+                    if score >= best_score:
+                        best_id, best_score = entry_id, score
+
+            if best_id is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(best_id)
+            return self._entries[best_id][3]
+
+    def store(self, key: tuple, query_vector, query_text: str, response: Dict):
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (key, query_vector, query_text, response,
+                                       time.monotonic() + self.ttl_seconds)
+            self._by_key.setdefault(key, []).append(entry_id)
+            while len(self._entries) > self.max_entries:
+                self._evict(next(iter(self._entries)))
+
+    def _evict(self, entry_id: int):
+        key = self._entries.pop(entry_id)[0]
+        ids = self._by_key.get(key, [])
+        ids.remove(entry_id)
+        if not ids:
+            self._by_key.pop(key, None)
+
+    def clear(self):
+        """Invalidate everything, e.g. when the knowledge base is reloaded."""
+        with self._lock:
+            self._entries.clear()
+            self._by_key.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations
+            }
@@ -0,0 +1,143 @@
+import re
+from typing import Dict, Iterable, List, Tuple
+
+MARKDOWN_HEADING_RE = re.compile(r'^#{1,6}\s+(.+)$')
+RULE_RE = re.compile(r'^\s*([-*_]\s*){3,}$')
+BLOCK_SPLIT_RE = re.compile(r'\n\s*\n')
+
+STRATEGIES = ('headings', 'window', 'off')
+
+
+def is_heading(line: str) -> bool:
+    """
+    Heading lines: markdown `#` headings, or (since convert_md_to_json strips
+    the `#`s) short standalone lines without sentence punctuation, such as
+    "Frame Material" or "2. Our Top Picks for 2025".
+    """
+    line = line.strip()
+    if MARKDOWN_HEADING_RE.match(line):
+        return True
+    if not line or len(line) > 80 or len(line.split()) > 12:
+        return False
+    if line.startswith(('-', '*', '•', '|', '>')):
+        return False
+    return line[-1] not in '.,;:!?)"\''
+
+
+def split_sections(text: str) -> List[Tuple[str, List[str]]]:
+    """Split text into (heading, paragraphs) sections; text before the first heading gets heading ''."""
+    sections = [('', [])]
+    for block in BLOCK_SPLIT_RE.split(text):
+        block = block.strip()
+        if not block or RULE_RE.match(block):
+            continue
+        first, _, rest = block.partition('\n')
+        if is_heading(first):
+            heading = MARKDOWN_HEADING_RE.sub(r'\1', first.strip())
+            sections.append((heading, [rest.strip()] if rest.strip() else []))
+        else:
+            sections[-1][1].append(block)
+    return [(heading, paragraphs) for heading, paragraphs in sections if heading or paragraphs]
+
+
+def sliding_window(text: str, size: int, overlap: int) -> List[str]:
+    """Windows of at most `size` characters, cut at whitespace, each repeating ~`overlap` characters of the previous one."""
+    text = text.strip()
+    if len(text) <= size:
+        return [text] if text else []
+
+    windows = []
+    start = 0
+    while start < len(text):
+        end = min(start + size, len(text))
+        if end < len(text):
+            cut = text.rfind(' ', start + size // 2, end)
+            end = cut if cut > start else end
+        windows.append(text[start:end].strip())
+        if end >= len(text):
+            break
+        # Step back by the overlap, then forward to the next word boundary
+        next_start = max(end - overlap, start + 1)
+        boundary = text.find(' ', next_start, end)
+        start = boundary + 1 if boundary != -1 else end
+    return [window for window in windows if window]
+
+
+def _pack_sections(sections: List[Tuple[str, List[str]]], size: int, overlap: int) -> List[Tuple[str, str]]:
+    """
+    Pack whole sections into chunks of up to `size` characters, so small
+    neighbouring sections share a chunk and no chunk starts mid-section
+    unless the section itself is too long; long sections are split on
+    paragraphs, then with a sliding window, repeating the heading and
+    `overlap` characters of context in each continuation.
+    """
+    chunks: List[Tuple[str, str]] = []
+    current_heading, current = '', ''
+
+    def flush():
+        nonlocal current_heading, current
+        if current.strip():
+            chunks.append((current_heading, current.strip()))
+        current_heading, current = '', ''
+
+    for heading, paragraphs in sections:
+        section_text = '\n\n'.join(([heading] if heading else []) + paragraphs)
+        if current and len(current) + 2 + len(section_text) <= size:
+            current += '\n\n' + section_text
+            continue
+        flush()
+        if len(section_text) <= size:
+            current_heading, current = heading, section_text
+            continue
+
+        # Section longer than a chunk: split it, keeping the heading on every piece
+        prefix = f"{heading}\n\n" if heading else ''
+        body_size = max(size - len(prefix), size // 2)
+        part_size = max(body_size - overlap, body_size // 2)
+        parts = []  # (text, already overlaps the previous part)
+        for paragraph in paragraphs:
+            windows = sliding_window(paragraph, part_size, overlap)
+            parts.extend((window, i > 0) for i, window in enumerate(windows))
+        piece = ''
+        for part, overlapping in parts:
+            if piece and len(piece) + 2 + len(part) > body_size:
+                chunks.append((heading, prefix + piece))
+                tail = piece[-overlap:] if overlap and not overlapping else ''
+                piece = tail[tail.find(' ') + 1:] if ' ' in tail else ''
+            piece = f"{piece}\n\n{part}" if piece else part
+        if piece:
+            chunks.append((heading, prefix + piece))
+    flush()
+    return chunks
+
+
+def chunk_document(doc: Dict, parent_id: int, strategy: str = 'headings',
+                   size: int = 800, overlap: int = 150) -> List[Dict]:
+    """Split one post into index units with back-pointers to it (parent_id)."""
+    content = doc.get('content', '')
+    if strategy == 'off':
+        pieces = [('', content)]
+    elif strategy == 'window':
+        pieces = [('', window) for window in sliding_window(content, size, overlap)] or [('', content)]
+    else:
+        pieces = _pack_sections(split_sections(content), size, overlap) or [('', content)]
+
+    return [
+        {
+            'title': doc.get('title', ''),
+            'content': text,
+            'section': section,
+            'parent_id': parent_id,
+            'chunk_index': i
+        }
+        for i, (section, text) in enumerate(pieces)
+    ]
+
+
+def chunk_corpus(docs: Iterable[Dict], strategy: str = 'headings',
+                 size: int = 800, overlap: int = 150) -> List[Dict]:
+    """Chunks of every document, in document order."""
+    chunks = []
+    for parent_id, doc in enumerate(docs):
+        chunks.extend(chunk_document(doc, parent_id, strategy, size, overlap))
+    return chunks
@@ -0,0 +1,124 @@
+import re
+from typing import Dict, List, Set
+
+try:
+    import tiktoken  # Optional: pip install tiktoken
+except ImportError:
+    tiktoken = None
+
+from embeddings import estimate_tokens
+
+WORD_RE = re.compile(r"\w+")
+
+
+class TokenCounter:
+    """
+    Counts prompt tokens with tiktoken's cl100k_base encoding when available
+    (close to the Llama 3 tokenizer for English), else ~4 characters per token.
+    """
+
+    def __init__(self, encoding: str = 'cl100k_base'):
+        self.encoder = None
+        if tiktoken is not None:
+            try:
+                self.encoder = tiktoken.get_encoding(encoding)
+            except Exception as e:  # e.g. the encoding file can't be downloaded
+                print(f"tiktoken unavailable, estimating tokens: {e}")
+
+    @property
+    def name(self) -> str:
+        return self.encoder.name if self.encoder is not None else 'estimate'
+
+    def count(self, text: str) -> int:
+        if self.encoder is not None:
+            return len(self.encoder.encode(text, disallowed_special=()))
+        return estimate_tokens(text)
+
+    def truncate(self, text: str, tokens: int) -> str:
+        """Longest prefix of text within `tokens`, cut at a word boundary."""
+        if self.count(text) <= tokens:
+            return text
+        # Leave room for the ' ...' marker
+        if self.encoder is not None:
+            prefix = self.encoder.decode(self.encoder.encode(text, disallowed_special=())[:max(tokens - 2, 1)])
+        else:
+            prefix = text[:max(tokens - 1, 1) * 4]
+        cut = prefix.rfind(' ')
+        return (prefix[:cut] if cut > len(prefix) // 2 else prefix).rstrip() + ' ...'
+
+
+def shingles(text: str, n: int = 5) -> Set[tuple]:
+    """Word n-grams, for spotting passages that repeat text already in the context."""
+    words = WORD_RE.findall(text.lower())
+    if len(words) < n:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i:i + n]) for i in range(len(words) - n + 1)}
+
+
+class ContextPacker:
+    """
+    Fills a prompt token budget with retrieved passages: candidates are taken
+    greedily by relevance, passages mostly repeating text already selected
+    (chunk overlap, duplicated posts) are skipped, and each passage is capped
+    at `max_passage_tokens`. Selected passages are grouped back under their
+    source post, in retrieval order.
+    """
+
+    def __init__(self, budget_tokens: int = 1500, max_passage_tokens: int = 200,
+                 dedupe_threshold: float = 0.8, min_passage_tokens: int = 32,
+                 counter: TokenCounter = None):
+        self.budget_tokens = budget_tokens
+        self.max_passage_tokens = max_passage_tokens
+        self.dedupe_threshold = dedupe_threshold
+        self.min_passage_tokens = min_passage_tokens
+        self.counter = counter or TokenCounter()
+
+    def pack(self, docs: List[Dict], budget_tokens: int = None) -> Dict:
+        """
+        Returns {"docs": [{"doc", "passages"}], "tokens": context tokens used,
+        "budget", "dropped": passages that didn't fit, "deduplicated": passages skipped as repeats}.
+        """
+        budget = self.budget_tokens if budget_tokens is None else budget_tokens
+        candidates = []
+        for doc_rank, doc in enumerate(docs):
+            passages = doc.get('passages') or [{"content": doc.get('content', ''),
+                                                "score": doc.get('similarity_score', 0.0)}]
+            for position, passage in enumerate(passages):
+                candidates.append((passage.get('score', doc.get('similarity_score', 0.0)),
+                                   doc_rank, position, passage['content']))
+        # Most relevant first; ties keep retrieval order
+        candidates.sort(key=lambda c: (-c[0], c[1], c[2]))
+
+        selected: Dict[int, list] = {}
+        seen: Set[tuple] = set()
+        used = dropped = deduplicated = 0
+        for score, doc_rank, position, text in candidates:
+            grams = shingles(text)
+            if grams and len(grams & seen) >= self.dedupe_threshold * len(grams):
+                deduplicated += 1
+                continue
+
+            text = self.counter.truncate(text, self.max_passage_tokens)
+            tokens = self.counter.count(text)
+            remaining = budget - used
+            if tokens > remaining:
+                if remaining < self.min_passage_tokens:
+                    dropped += 1
+                    continue
+                text = self.counter.truncate(text, remaining)
+                tokens = self.counter.count(text)
+            selected.setdefault(doc_rank, []).append((position, text))
+            seen |= shingles(text)
+            used += tokens
+
+        packed_docs = [
+            {"doc": docs[doc_rank], "passages": [text for _, text in sorted(selected[doc_rank])]}
+            for doc_rank in sorted(selected)
+        ]
+        return {
+            "docs": packed_docs,
+            "tokens": used,
+            "budget": budget,
+            "dropped": dropped,
+            "deduplicated": deduplicated
+        }
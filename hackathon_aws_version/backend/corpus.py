@@ -0,0 +1,28 @@
+import json
+import os
+from typing import Dict, Iterator
+
+JSONL_EXTENSIONS = ('.jsonl', '.ndjson')
+
+
+def is_jsonl(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in JSONL_EXTENSIONS
+
+
+def iter_documents(path: str) -> Iterator[Dict]:
+    """
+    Posts in a corpus file, in order. JSON Lines files (one post per line)
+    are streamed, so only one line is parsed at a time; the original
+    {"blogs": [...]} JSON is still accepted but has to be parsed whole.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        if not is_jsonl(path):
+            yield from json.load(f).get('blogs', [])
+            return
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{path}:{line_number}: {e}") from e
@@ -0,0 +1,260 @@
+import glob
+import hashlib
+import json
+import mmap
+import os
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from atomic_files import publish, temp_path
+
+
+class TextBlob:
+    """
+    Strings stored back to back as UTF-8 in one file, memory-mapped, with
+    their byte offsets in an int64 array. Only the offsets are resident; a
+    string is decoded from the mapping when it is asked for, and processes
+    on the same node share the pages through the OS page cache.
+
+    Files are named by a hash of their contents, e.g.
+    `processed_blogs.docs-<digest>.bin`, so an unchanged corpus reuses the
+    file. Without a path prefix the blob is kept in memory instead. Blobs
+    belong in a node-local directory: superseded ones are deleted, which only
+    mappings on the same host survive.
+    """
+
+    def __init__(self, buffer, offsets: np.ndarray, path: Optional[str] = None):
+        self.buffer = buffer
+        self.offsets = offsets
+        self.path = path
+
+    @classmethod
+    def build(cls, texts: Iterable[str], prefix: Optional[str] = None) -> 'TextBlob':
+        offsets = array('q', [0])
+        digest = hashlib.sha256()
+        if prefix is None:
+            parts = []
+            for text in texts:
+                data = text.encode('utf-8')
+                parts.append(data)
+                offsets.append(offsets[-1] + len(data))
+            return cls(b''.join(parts), np.frombuffer(offsets, dtype=np.int64))
+
+        tmp_path = temp_path(prefix)
+        try:
+            with open(tmp_path, 'wb') as f:
+                for text in texts:
+                    data = text.encode('utf-8')
+                    f.write(data)
+                    digest.update(data)
+                    offsets.append(offsets[-1] + len(data))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        # Offsets go into the name too: the same bytes split differently are a different blob
+        digest.update(offsets.tobytes())
+        path = f"{prefix}-{digest.hexdigest()[:16]}.bin"
+        # If another worker already wrote this blob, map theirs
+        publish(tmp_path, path)
+        cls._remove_stale(prefix, keep=path)
+        return cls(cls._map(path), np.frombuffer(offsets, dtype=np.int64), path)
+
+    @classmethod
+    def open(cls, path: str, offsets: np.ndarray) -> 'TextBlob':
+        """Memory-map a blob written by save()."""
+        return cls(cls._map(path), offsets, path)
+
+    def save(self, path: str):
+        """Write the blob's bytes to path (offsets are saved by the owning store)."""
+        with open(path, 'wb') as f:
+            f.write(self.buffer)
+
+    @staticmethod
+    def _map(path: str):
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return b''  # mmap can't map an empty file
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @staticmethod
+    def _remove_stale(prefix: str, keep: str):
+        # Snapshots still serving from an old blob keep their mapping after the unlink
+        for path in glob.glob(f"{glob.escape(prefix)}-*.bin"):
+            if path != keep:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return self.buffer[int(self.offsets[i]):int(self.offsets[i + 1])].decode('utf-8')
+
+    def info(self) -> Dict:
+        return {
+            "path": self.path,
+            "bytes": int(self.offsets[-1]),
+            "resident_bytes": int(self.offsets.nbytes) + (0 if self.path else int(self.offsets[-1]))
+        }
+
+
+class DocumentRecord:
+    """Resident metadata of one post; its content stays in the text blob."""
+
+    FIELDS = ('title', 'category', 'tags', 'date', 'source_file', 'word_count', 'char_count')
+    __slots__ = FIELDS + ('extra',)
+
+    def __init__(self, doc: Dict):
+        for field in self.FIELDS:
+            if field in doc:
+                setattr(self, field, doc[field])
+        extra = {key: value for key, value in doc.items() if key not in self.FIELDS and key != 'content'}
+        self.extra = extra or None
+
+    def as_dict(self, content: str = None) -> Dict:
+        doc = {}
+        if hasattr(self, 'title'):
+            doc['title'] = self.title
+        if content is not None:
+            doc['content'] = content
+        for field in self.FIELDS[1:]:
+            if hasattr(self, field):
+                doc[field] = getattr(self, field)
+        if self.extra:
+            doc.update(self.extra)
+        return doc
+
+
+class DocumentStore:
+    """
+    The posts of one snapshot: a DocumentRecord per post plus a TextBlob of
+    their contents. `store[i]` returns a new dict with the content sliced
+    from the blob, so only posts that are actually returned get decoded.
+    """
+
+    def __init__(self, records: List[DocumentRecord], contents: TextBlob):
+        self.records = records
+        self.contents = contents
+
+    @classmethod
+    def build(cls, docs: Iterable[Dict], prefix: Optional[str] = None) -> 'DocumentStore':
+        """Stream docs into a store; each dict can be dropped once it has been read."""
+        records: List[DocumentRecord] = []
+
+        def contents() -> Iterator[str]:
+            for doc in docs:
+                records.append(DocumentRecord(doc))
+                yield doc.get('content', '')
+
+        blob = TextBlob.build(contents(), prefix)
+        return cls(records, blob)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, i: int) -> Dict:
+        return self.records[i].as_dict(self.contents[i])
+
+    def __iter__(self) -> Iterator[Dict]:
+        for i in range(len(self.records)):
+            yield self[i]
+
+    def save(self, prefix: str) -> List[str]:
+        """Write `<prefix>.bin` (contents), `.npz` (offsets) and `.json` (metadata); returns the paths."""
+        self.contents.save(f"{prefix}.bin")
+        np.savez(f"{prefix}.npz", offsets=self.contents.offsets)
+        with open(f"{prefix}.json", 'w', encoding='utf-8') as f:
+            json.dump([record.as_dict() for record in self.records], f, ensure_ascii=False, default=str)
+        return [f"{prefix}.bin", f"{prefix}.npz", f"{prefix}.json"]
+
+    @classmethod
+    def load(cls, prefix: str) -> 'DocumentStore':
+        with open(f"{prefix}.json", 'r', encoding='utf-8') as f:
+            records = [DocumentRecord(doc) for doc in json.load(f)]
+        offsets = np.load(f"{prefix}.npz")['offsets']
+        return cls(records, TextBlob.open(f"{prefix}.bin", offsets))
+
+    def title(self, i: int) -> str:
+        return getattr(self.records[i], 'title', '')
+
+    def info(self) -> Dict:
+        return dict(self.contents.info(), documents=len(self.records))
+
+
+class ChunkStore:
+    """
+    Chunks of one snapshot as array columns (parent post, position in the
+    post, section heading) plus a TextBlob of their texts; titles come from
+    the parent post. `chunks[i]` returns the same dict chunk_document made.
+    """
+
+    def __init__(self, parent_ids: np.ndarray, chunk_indexes: np.ndarray, sections: List[str],
+                 texts: TextBlob, documents: DocumentStore):
+        self.parent_ids = parent_ids
+        self.chunk_indexes = chunk_indexes
+        self.sections = sections
+        self.texts = texts
+        self.documents = documents
+
+    @classmethod
+    def build(cls, chunks: Iterable[Dict], documents: DocumentStore,
+              prefix: Optional[str] = None) -> 'ChunkStore':
+        parent_ids, chunk_indexes = array('i'), array('i')
+        sections: List[str] = []
+        interned: Dict[str, str] = {}  # Repeated headings ("Conclusion") share one string
+
+        def texts() -> Iterator[str]:
+            for chunk in chunks:
+                parent_ids.append(chunk['parent_id'])
+                chunk_indexes.append(chunk['chunk_index'])
+                sections.append(interned.setdefault(chunk['section'], chunk['section']))
+                yield chunk['content']
+
+        blob = TextBlob.build(texts(), prefix)
+        return cls(np.frombuffer(parent_ids, dtype=np.int32), np.frombuffer(chunk_indexes, dtype=np.int32),
+                   sections, blob, documents)
+
+    def __len__(self) -> int:
+        return len(self.sections)
+
+    def __getitem__(self, i: int) -> Dict:
+        parent = int(self.parent_ids[i])
+        return {
+            'title': self.documents.title(parent),
+            'content': self.texts[i],
+            'section': self.sections[i],
+            'parent_id': parent,
+            'chunk_index': int(self.chunk_indexes[i])
+        }
+
+    def __iter__(self) -> Iterator[Dict]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def save(self, prefix: str) -> List[str]:
+        """Write `<prefix>.bin` (texts), `.npz` (columns and offsets) and `.json` (sections); returns the paths."""
+        self.texts.save(f"{prefix}.bin")
+        np.savez(f"{prefix}.npz", offsets=self.texts.offsets,
+                 parent_ids=self.parent_ids, chunk_indexes=self.chunk_indexes)
+        with open(f"{prefix}.json", 'w', encoding='utf-8') as f:
+            json.dump(self.sections, f, ensure_ascii=False)
+        return [f"{prefix}.bin", f"{prefix}.npz", f"{prefix}.json"]
+
+    @classmethod
+    def load(cls, prefix: str, documents: DocumentStore) -> 'ChunkStore':
+        with open(f"{prefix}.json", 'r', encoding='utf-8') as f:
+            interned: Dict[str, str] = {}
+            sections = [interned.setdefault(section, section) for section in json.load(f)]
+        columns = np.load(f"{prefix}.npz")
+        return cls(columns['parent_ids'], columns['chunk_indexes'], sections,
+                   TextBlob.open(f"{prefix}.bin", columns['offsets']), documents)
+
+    def parent_id(self, i: int) -> int:
+        return int(self.parent_ids[i])
+
+    def info(self) -> Dict:
+        return dict(self.texts.info(), chunks=len(self))
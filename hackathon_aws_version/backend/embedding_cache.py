@@ -0,0 +1,89 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+
+def text_hash(text: str) -> str:
+    """Stable content hash used as the cache key for a text."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Persistent, content-addressed embedding cache stored in SQLite.
+    Rows are keyed by (embedding model, sha256 of the embedded text) so any
+    document whose text is unchanged is never sent to the embedding NIM again.
+    """
+
+    _LOOKUP_CHUNK = 500  # Stay well under SQLite's bound-parameter limit
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # timeout lets several replicas sharing a volume wait on each other's writes
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " model TEXT NOT NULL,"
+                " text_hash TEXT NOT NULL,"
+                " dim INTEGER NOT NULL,"
+                " vector BLOB NOT NULL,"
+                " PRIMARY KEY (model, text_hash)"
+                ") WITHOUT ROWID"
+            )
+
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Return cached float32 vectors in input order, None where missing."""
+        hashes = [text_hash(t) for t in texts]
+        found = {}
+        with self._lock:
+            for start in range(0, len(hashes), self._LOOKUP_CHUNK):
+                chunk = hashes[start:start + self._LOOKUP_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model] + chunk
+                )
+                for h, blob in rows:
+                    found[h] = np.frombuffer(blob, dtype=np.float32)
+
+        results = [found.get(h) for h in hashes]
+        hit_count = sum(1 for r in results if r is not None)
+        self.hits += hit_count
+        self.misses += len(results) - hit_count
+        return results
+
+    def put_many(self, model: str, texts: List[str], vectors: List) -> None:
+        """Store vectors for the given texts, replacing any existing rows."""
+        rows = []
+        for text, vec in zip(texts, vectors):
+            arr = np.asarray(vec, dtype=np.float32)
+            rows.append((model, text_hash(text), int(arr.shape[0]), arr.tobytes()))
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, dim, vector) VALUES (?, ?, ?, ?)",
+                rows
+            )
+
+    def count(self, model: str = None) -> int:
+        with self._lock:
+            if model:
+                return self._conn.execute("SELECT COUNT(*) FROM embeddings WHERE model = ?", (model,)).fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def stats(self) -> dict:
+        return {"path": self.path, "hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
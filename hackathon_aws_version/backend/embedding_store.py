@@ -0,0 +1,120 @@
+import glob
+import hashlib
+import os
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from atomic_files import publish, temp_path
+from embedding_cache import text_hash
+
+DTYPES = ('float32', 'float16', 'int8')
+
+
+def corpus_fingerprint(model: str, texts: Iterable[str]) -> str:
+    """Fingerprint of the embedded corpus: model plus every text, in order (streamed)."""
+    digest = hashlib.sha256(model.encode('utf-8'))
+    for text in texts:
+        digest.update(text_hash(text).encode('ascii'))
+    return digest.hexdigest()[:16]
+
+
+def _normalize(vec) -> np.ndarray:
+    arr = np.asarray(vec, dtype=np.float32)
+    norm = np.linalg.norm(arr)
+    return arr / norm if norm > 0 else arr
+
+
+class EmbeddingStore:
+    """
+    Contiguous, L2-normalized embedding matrix stored as a .npy file and
+    opened with np.memmap, so load is zero-copy and processes on the same
+    node share the pages through the OS page cache.
+
+    Files are named by corpus fingerprint and dtype, e.g.
+    `processed_blogs.emb-<fingerprint>-float16.npy`, so a file on disk always
+    matches the corpus it was built from. The int8 mode stores each row
+    quantized to [-127, 127] plus a float32 `-scale.npy` vector with the
+    inverse row norms, so `(row · query) * scale` is the cosine similarity.
+    """
+
+    def __init__(self, matrix: np.ndarray, scale: Optional[np.ndarray], path: str):
+        self.matrix = matrix
+        self.scale = scale
+        self.path = path
+
+    @property
+    def dtype(self) -> str:
+        return str(self.matrix.dtype)
+
+    @staticmethod
+    def paths(prefix: str, fingerprint: str, dtype: str):
+        base = f"{prefix}.emb-{fingerprint}-{dtype}"
+        return f"{base}.npy", f"{base}-scale.npy"
+
+    @classmethod
+    def open(cls, prefix: str, fingerprint: str, dtype: str = 'float32') -> Optional['EmbeddingStore']:
+        """Memory-map a previously built store, or return None if it doesn't exist."""
+        matrix_path, scale_path = cls.paths(prefix, fingerprint, dtype)
+        if not os.path.exists(matrix_path):
+            return None
+        matrix = np.load(matrix_path, mmap_mode='r')
+        scale = np.load(scale_path, mmap_mode='r') if dtype == 'int8' else None
+        return cls(matrix, scale, matrix_path)
+
+    @classmethod
+    def build(cls, prefix: str, fingerprint: str, vectors: List, dtype: str = 'float32',
+              remove_stale: bool = False) -> 'EmbeddingStore':
+        """
+        Write vectors row by row into a new memory-mapped store and open it.
+        Rows are normalized on the way in, so no full float64 copy is ever built.
+        `remove_stale` deletes stores for older versions of the corpus; only
+        safe when no other host maps files from this directory.
+        """
+        if dtype not in DTYPES:
+            raise ValueError(f"Unsupported embedding store dtype: {dtype}")
+        rows = len(vectors)
+        dim = len(vectors[0]) if rows else 0
+        matrix_path, scale_path = cls.paths(prefix, fingerprint, dtype)
+        tmp_matrix, tmp_scale = temp_path(matrix_path), temp_path(scale_path)
+
+        out = np.lib.format.open_memmap(tmp_matrix, mode='w+',
+                                        dtype=np.dtype(dtype), shape=(rows, dim))
+        scale = np.ones(rows, dtype=np.float32) if dtype == 'int8' else None
+        for i, vec in enumerate(vectors):
+            row = _normalize(vec)
+            if dtype == 'int8':
+                peak = float(np.abs(row).max()) or 1.0
+                quantized = np.round(row * (127.0 / peak)).astype(np.int8)
+                norm = float(np.linalg.norm(quantized.astype(np.float32)))
+                scale[i] = 1.0 / norm if norm > 0 else 0.0
+                out[i] = quantized
+            else:
+                out[i] = row
+        out.flush()
+        del out
+
+        # Publish atomically so concurrent readers never see a partial file. If another
+        # process (or replica on a shared volume) built this store meanwhile, open theirs
+        if scale is not None:
+            with open(tmp_scale, 'wb') as f:
+                np.save(f, scale)
+            publish(tmp_scale, scale_path)
+        publish(tmp_matrix, matrix_path)
+        if remove_stale:
+            cls._remove_stale(prefix, keep=(matrix_path, scale_path))
+        return cls.open(prefix, fingerprint, dtype)
+
+    @staticmethod
+    def _remove_stale(prefix: str, keep):
+        """Delete stores (and indexes built on them) for older versions of the corpus."""
+        current = tuple(os.path.splitext(path)[0] for path in keep)
+        for path in glob.glob(f"{glob.escape(prefix)}.emb-*"):
+            if not path.startswith(current) and '.tmp-' not in path:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def nbytes(self) -> int:
+        return int(self.matrix.nbytes + (self.scale.nbytes if self.scale is not None else 0))
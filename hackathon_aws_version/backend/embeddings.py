@@ -0,0 +1,191 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from openai import APIConnectionError, APIStatusError
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) used for batch budgeting."""
+    return max(1, len(text) // 4)
+
+
+def is_retryable(error: Exception) -> bool:
+    """Rate limits, server errors and connection failures are worth retrying."""
+    if isinstance(error, APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return isinstance(error, APIConnectionError)
+
+
+class AdaptiveThrottle:
+    """
+    Shared in-flight limiter with adaptive backoff (AIMD).
+    A throttled response halves the allowed concurrency and pushes back the
+    next send time for every worker; each window of successes adds one slot back.
+    """
+
+    def __init__(self, max_in_flight: int, base_delay: float = 0.5, max_delay: float = 30.0):
+        self.max_in_flight = max(1, max_in_flight)
+        self.limit = self.max_in_flight
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.delay = 0.0
+        self.in_flight = 0
+        self.throttled = 0
+        self._successes = 0
+        self._resume_at = 0.0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> float:
+        """Wait for a free slot and any active backoff; returns the send time."""
+        with self._cond:
+            while self.in_flight >= self.limit:
+                self._cond.wait()
+            self.in_flight += 1
+            wait = self._resume_at - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        return time.monotonic()
+
+    def release(self, sent_at: float, throttled: bool = False, retry_after: float = None):
+        with self._cond:
+            self.in_flight -= 1
+            if throttled:
+                self.throttled += 1
+                # Requests already in flight when we backed off don't count as a new signal
+                if sent_at >= self._last_decrease:
+                    self._last_decrease = time.monotonic()
+                    self.limit = max(1, self.limit // 2)
+                    self.delay = min(self.max_delay, max(self.base_delay, self.delay * 2))
+                    self._successes = 0
+                backoff = retry_after if retry_after else self.delay * random.uniform(0.5, 1.0)
+                self._resume_at = max(self._resume_at, time.monotonic() + backoff)
+            else:
+                self.delay /= 2
+                self._successes += 1
+                if self._successes >= self.limit and self.limit < self.max_in_flight:
+                    self.limit += 1
+                    self._successes = 0
+            self._cond.notify_all()
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Seconds requested by a Retry-After header, if the server sent one."""
+    response = getattr(error, 'response', None)
+    value = response.headers.get('retry-after') if response is not None else None
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+class NIMEmbeddingClient:
+    """
+    Batched, concurrent client for the NVIDIA embedding NIM.
+    Packs many texts into each OpenAI-compatible embeddings request, bounded by
+    a maximum batch size and an estimated token budget, and keeps up to
+    `concurrency` requests in flight at once.
+    """
+
+    def __init__(self, client, model: str, batch_size: int = None,
+                 max_batch_tokens: int = None, max_chars: int = 8000,
+                 concurrency: int = None, max_retries: int = None):
+        self.client = client
+        self.model = model
+        self.batch_size = batch_size or int(os.getenv('NVIDIA_EMBEDDING_BATCH_SIZE', '64'))
+        self.max_batch_tokens = max_batch_tokens or int(os.getenv('NVIDIA_EMBEDDING_MAX_BATCH_TOKENS', '32000'))
+        self.concurrency = concurrency or int(os.getenv('NVIDIA_EMBEDDING_CONCURRENCY', '8'))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv('NVIDIA_EMBEDDING_MAX_RETRIES', '5'))
+        self.max_chars = max_chars  # Truncate to avoid per-item token limits
+        self.dimension: Optional[int] = None  # Learned from the first successful response
+        self.throttle = AdaptiveThrottle(self.concurrency)
+
+    def make_batches(self, texts: List[str]) -> List[List[int]]:
+        """Group text indices into batches respecting batch size and token budget."""
+        batches = []
+        current, current_tokens = [], 0
+        for i, text in enumerate(texts):
+            tokens = estimate_tokens(text)
+            if current and (len(current) >= self.batch_size or
+                            current_tokens + tokens > self.max_batch_tokens):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts in concurrent batches, returning vectors in input order."""
+        truncated = [text[:self.max_chars] for text in texts]
+        results: List[Optional[List[float]]] = [None] * len(truncated)
+        batches = self.make_batches(truncated)
+
+        if self.concurrency <= 1 or len(batches) <= 1:
+            for batch in batches:
+                self._embed_batch(truncated, batch, results)
+        else:
+            # Each batch writes into its own slots of `results`, so completion order doesn't matter
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(batches))) as executor:
+                futures = [executor.submit(self._embed_batch, truncated, batch, results) for batch in batches]
+                for future in futures:
+                    future.result()
+
+        return self._fill_failures(results)
+
+    def _request(self, inputs: List[str]):
+        """Send one embeddings request, backing off and retrying on 429/5xx."""
+        for attempt in range(self.max_retries + 1):
+            sent_at = self.throttle.acquire()
+            try:
+                response = self.client.embeddings.create(model=self.model, input=inputs)
+            except Exception as e:
+                retryable = is_retryable(e)
+                self.throttle.release(sent_at, throttled=retryable, retry_after=_retry_after(e))
+                if not retryable or attempt == self.max_retries:
+                    raise
+                continue
+            self.throttle.release(sent_at)
+            return response
+
+    def _embed_batch(self, texts: List[str], indices: List[int], results: List):
+        """
+        Embed one batch. If a single item is rejected, split the batch in half
+        and retry each side; if the NIM is still throttling or failing (429/5xx)
+        after all retries, leave the whole batch failed rather than multiplying
+        requests against an overloaded service.
+        """
+        try:
+            response = self._request([texts[i] for i in indices])
+        except Exception as e:
+            if len(indices) == 1 or is_retryable(e):
+                print(f"Error getting embeddings for {len(indices)} text(s): {e}")
+                return
+            mid = len(indices) // 2
+            self._embed_batch(texts, indices[:mid], results)
+            self._embed_batch(texts, indices[mid:], results)
+            return
+
+        for item in sorted(response.data, key=lambda d: d.index):
+            results[indices[item.index]] = item.embedding
+            if self.dimension is None:
+                self.dimension = len(item.embedding)
+
+    def _fill_failures(self, results: List) -> List[List[float]]:
+        """Replace items that failed individually with zero vectors."""
+        dimension = self.dimension or 768  # Assuming 768-dim embeddings until we learn otherwise
+        return [vec if vec is not None else [0.0] * dimension for vec in results]
+
+    def stats(self) -> dict:
+        """Current concurrency settings and throttling counters."""
+        return {
+            "batch_size": self.batch_size,
+            "concurrency": self.concurrency,
+            "current_limit": self.throttle.limit,
+            "throttled_responses": self.throttle.throttled
+        }
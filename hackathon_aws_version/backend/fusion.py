@@ -0,0 +1,33 @@
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+Ranking = List[Tuple[int, float]]
+
+
+def reciprocal_rank_fusion(rankings: Dict[str, Ranking], k: int = 60,
+                           weights: Dict[str, float] = None) -> Ranking:
+    """
+    Fuse ranked lists with reciprocal rank fusion: score = sum(w / (k + rank)).
+    Only ranks matter, so retrievers with incomparable score scales mix cleanly.
+    """
+    fused = defaultdict(float)
+    for name, ranking in rankings.items():
+        weight = (weights or {}).get(name, 1.0)
+        for rank, (doc_id, _) in enumerate(ranking, 1):
+            fused[doc_id] += weight / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
+
+
+def weighted_score_fusion(rankings: Dict[str, Ranking], weights: Dict[str, float] = None) -> Ranking:
+    """Fuse by min-max normalizing each retriever's scores and summing them with weights."""
+    fused = defaultdict(float)
+    for name, ranking in rankings.items():
+        if not ranking:
+            continue
+        weight = (weights or {}).get(name, 1.0)
+        scores = [score for _, score in ranking]
+        low, high = min(scores), max(scores)
+        span = (high - low) or 1.0
+        for doc_id, score in ranking:
+            fused[doc_id] += weight * ((score - low) / span if high > low else 1.0)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
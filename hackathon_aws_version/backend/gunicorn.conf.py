@@ -0,0 +1,39 @@
+"""
+Gunicorn settings for the production entry points; every value can be
+overridden from the environment.
+    gunicorn -c gunicorn.conf.py wsgi:app                                   # Flask
+    gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker asgi:app  # async
+"""
+
+import os
+import sys
+import tempfile
+
+bind = os.getenv('BIND', '0.0.0.0:5000')
+
+# One process per core; threads let each worker overlap requests waiting on NIM
+workers = int(os.getenv('WEB_CONCURRENCY', str(os.cpu_count() or 1)))
+threads = int(os.getenv('GUNICORN_THREADS', '8'))
+if workers > 1:
+    # /reload lands on one worker; the others follow it through this directory (read at app load)
+    os.environ.setdefault('RELOAD_STATE_DIR', os.path.join(tempfile.gettempdir(), 'rag-reload'))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+
+# LLM calls can take tens of seconds
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+# Load the knowledge base and indexes once in the master before forking
+preload_app = True
+
+accesslog = '-'
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    # Clients, connection pools and thread pools don't survive fork()
+    for name in ('wsgi', 'asgi'):
+        module = sys.modules.get(name)
+        if module is not None:
+            module.rag_engine.reset_after_fork()
@@ -0,0 +1,160 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List
+
+
+class BatchStats:
+    """Counters shared by the sync and async micro-batchers."""
+
+    def __init__(self, max_batch: int, max_wait_ms: float):
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+        self.wait_ms_total = 0.0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def record(self, size: int, waits_ms: List[float]):
+        with self._lock:
+            self.batches += 1
+            self.items += size
+            self.largest_batch = max(self.largest_batch, size)
+            self.wait_ms_total += sum(waits_ms)
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def as_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "max_batch": self.max_batch,
+                "max_wait_ms": self.max_wait_ms,
+                "batches": self.batches,
+                "items": self.items,
+                "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+                "largest_batch": self.largest_batch,
+                "mean_queue_wait_ms": round(self.wait_ms_total / self.items, 3) if self.items else 0.0,
+                "errors": self.errors
+            }
+
+
+class MicroBatcher:
+    """
+    Collects items submitted from many threads into batches: a batch is sent
+    when it reaches `max_batch` items or `max_wait_ms` after its first item
+    arrived. `fn` maps a list of items to a list of results in the same
+    order; each caller blocks until its own result is ready. Up to
+    `concurrency` batches run at once; while all of them are busy, new items
+    queue up and go out together in the next batch.
+    """
+
+    def __init__(self, fn: Callable[[List[Any]], List[Any]], max_batch: int = 32,
+                 max_wait_ms: float = 5.0, concurrency: int = 4):
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.concurrency = concurrency
+        self.stats = BatchStats(max_batch, max_wait_ms)
+        self._queue: 'queue.Queue[tuple]' = queue.Queue()
+        self._executor = None
+        self._slots = threading.Semaphore(concurrency)
+        self._collector = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, item: Any, timeout: float = None) -> Any:
+        """Queue one item and wait for its result (re-raises the batch's exception)."""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((item, future, time.monotonic()))
+        return future.result(timeout=timeout)
+
+    def _ensure_started(self):
+        # Started on first use, so a batcher created before fork() gets its threads in the worker
+        if self._collector is not None:
+            return
+        with self._start_lock:
+            if self._collector is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='microbatch')
+                self._collector = threading.Thread(target=self._collect, name='microbatch-collector', daemon=True)
+                self._collector.start()
+
+    def _collect(self):
+        while True:
+            self._slots.acquire()  # Wait for a free slot before forming the next batch
+            batch = [self._queue.get()]
+            deadline = batch[0][2] + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    # Past the deadline, still take whatever is already queued
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._executor.submit(self._run, batch)
+
+    def _run(self, batch: List[tuple]):
+        started = time.monotonic()
+        self.stats.record(len(batch), [(started - queued_at) * 1000.0 for _, _, queued_at in batch])
+        try:
+            results = self.fn([item for item, _, _ in batch])
+        except Exception as e:
+            self.stats.record_error()
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+        finally:
+            self._slots.release()
+        for (_, future, _), result in zip(batch, results):
+            future.set_result(result)
+
+
+class AsyncMicroBatcher:
+    """asyncio version of MicroBatcher for coroutines running on one event loop."""
+
+    def __init__(self, fn: Callable[[List[Any]], Awaitable[List[Any]]], max_batch: int = 32,
+                 max_wait_ms: float = 5.0):
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.stats = BatchStats(max_batch, max_wait_ms)
+        self._pending: List[tuple] = []
+        self._timer = None
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future, time.monotonic()))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.ensure_future(self._run(batch))
+
+    async def _run(self, batch: List[tuple]):
+        started = time.monotonic()
+        self.stats.record(len(batch), [(started - queued_at) * 1000.0 for _, _, queued_at in batch])
+        try:
+            results = await self.fn([item for item, _, _ in batch])
+        except Exception as e:
+            self.stats.record_error()
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():  # The caller may have been cancelled
+                future.set_result(result)
@@ -1,11 +1,34 @@
 import os
-import json
+import asyncio
+import tempfile
+import threading
+import time
 import numpy as np
-from typing import List, Dict, Tuple
-from openai import OpenAI
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import List, Dict, Tuple, Optional, Iterable, Iterator
+from openai import AsyncOpenAI, OpenAI
 import requests
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from embeddings import NIMEmbeddingClient
+from embedding_cache import EmbeddingCache
+from embedding_store import EmbeddingStore, corpus_fingerprint
+from retrieval import normalize_rows
+from bm25 import BM25Index
+from vector_index import SparseIndex, create_index, load_or_build_index
+from fusion import reciprocal_rank_fusion, weighted_score_fusion
+from caching import FileCacheBackend, ResponseCache, TTLCache, normalize_query
+from singleflight import AsyncSingleFlight, SingleFlight
+from microbatch import AsyncMicroBatcher, MicroBatcher
+from chunking import STRATEGIES, chunk_document
+from context_packer import ContextPacker
+from snapshot import DocumentDiff, IndexSnapshot
+from document_store import ChunkStore
+from reload_jobs import ReloadJobs
+from corpus import iter_documents
+from bundle import is_bundle, read_bundle, read_manifest, write_bundle
+
+# Corpus file relative to the backend directory (the container sets KNOWLEDGE_BASE_PATH)
+DEFAULT_KNOWLEDGE_BASE_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'processed_blogs.json')
 
 class NVIDIARAGEngine:
     """
@@ -19,167 +42,760 @@ class NVIDIARAGEngine:
             base_url=os.getenv('NVIDIA_NIM_BASE_URL', 'https://integrate.api.nvidia.com/v1'),
             api_key=os.getenv('NVIDIA_API_KEY')
         )
+        self._async_llm_client = None  # Created on first use inside the serving event loop
         
         # Model configurations for hackathon requirements
         self.llm_model = os.getenv('NVIDIA_LLM_MODEL', 'meta/llama-3.1-nemotron-nano-8b-instruct')
         self.embedding_model = os.getenv('NVIDIA_EMBEDDING_MODEL', 'nvidia/nv-embedqa-e5-v5')
+        # Retries and backoff are the embedder's own (and its throttle must see every 429)
+        self.embedder = NIMEmbeddingClient(self.llm_client.with_options(max_retries=0), self.embedding_model)
         
-        # Knowledge base and embeddings
-        self.knowledge_base = []
-        self.document_embeddings = None
-        self.vectorizer = None
+        # Persistent embedding cache so unchanged documents are never re-embedded
+        cache_path = os.getenv('EMBEDDING_CACHE_PATH',
+                               os.path.join(os.path.dirname(__file__), 'cache', 'embeddings.sqlite'))
+        self.embedding_cache = None
+        if cache_path:
+            try:
+                self.embedding_cache = EmbeddingCache(cache_path)
+            except Exception as e:
+                print(f"Embedding cache disabled: {e}")
         
-    def load_knowledge_base(self, data_path: str = None) -> int:
-        """Load knowledge base from JSON file."""
-        if not data_path:
-            # Default path relative to backend directory
-            data_path = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'processed_blogs.json')
+        # In-process LRU of query embeddings, optionally backed by a shared store
+        query_cache_ttl = float(os.getenv('QUERY_EMBEDDING_CACHE_TTL', '3600'))
+        query_cache_dir = os.getenv('QUERY_EMBEDDING_CACHE_DIR')
+        self.query_embedding_cache = TTLCache(
+            max_size=int(os.getenv('QUERY_EMBEDDING_CACHE_SIZE', '1024')),
+            ttl_seconds=query_cache_ttl,
+            backend=FileCacheBackend(
+                query_cache_dir, query_cache_ttl,
+                max_entries=int(os.getenv('QUERY_EMBEDDING_CACHE_DIR_MAX_ENTRIES', '10000'))
+            ) if query_cache_dir else None
+        )
         
+        # Semantic cache of LLM responses for near-duplicate questions
+        self.response_cache = None
+        if os.getenv('RESPONSE_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes'):
+            self.response_cache = ResponseCache(
+                threshold=float(os.getenv('RESPONSE_CACHE_THRESHOLD', '0.95')),
+                max_entries=int(os.getenv('RESPONSE_CACHE_SIZE', '512')),
+                ttl_seconds=float(os.getenv('RESPONSE_CACHE_TTL', '600'))
+            )
+        
+        # Micro-batching of query embeddings: queries arriving within the window share one request
+        self.query_batch_window_ms = float(os.getenv('QUERY_EMBEDDING_BATCH_WINDOW_MS', '0'))
+        self.query_batch_size = int(os.getenv('QUERY_EMBEDDING_MAX_BATCH', '32'))
+        self._create_query_batchers()
+        
+        # Identical questions arriving together share one retrieval + LLM call
+        self.coalesce_requests = os.getenv('REQUEST_COALESCING', 'true').lower() in ('1', 'true', 'yes')
+        self.chat_flight = SingleFlight()
+        self.achat_flight = AsyncSingleFlight()
+        
+        # Posts are split into chunks, which are what gets embedded and searched
+        self.chunking = os.getenv('CHUNKING', 'headings').lower()
+        if self.chunking not in STRATEGIES:
+            print(f"Unknown CHUNKING '{self.chunking}', using headings")
+            self.chunking = 'headings'
+        self.chunk_size = int(os.getenv('CHUNK_SIZE', '800'))
+        self.chunk_overlap = int(os.getenv('CHUNK_OVERLAP', '150'))
+        self.chunks_per_post = int(os.getenv('CHUNKS_PER_POST', '1'))
+        self.chunk_overfetch = int(os.getenv('CHUNK_OVERFETCH', '5'))
+        
+        # Retrieved passages are packed into a token budget for the prompt
+        self.llm_context_window = int(os.getenv('LLM_CONTEXT_WINDOW', '8192'))
+        self.context_packer = ContextPacker(
+            budget_tokens=int(os.getenv('CONTEXT_TOKEN_BUDGET', '1500')),
+            max_passage_tokens=int(os.getenv('CONTEXT_PASSAGE_TOKENS', '200')),
+            dedupe_threshold=float(os.getenv('CONTEXT_DEDUPE_THRESHOLD', '0.8'))
+        )
+        
+        # Knowledge base, chunks, embeddings and indexes live in one immutable
+        # snapshot; a reload builds the next one aside and swaps it in
+        self.snapshot = IndexSnapshot()
+        self.last_reload = None
+        self._reload_lock = threading.Lock()
+        # Shared by every worker (and replica) so reloads reach all of them; see ReloadJobs
+        self.reload_jobs = ReloadJobs(self.reload_knowledge_base, state_dir=os.getenv('RELOAD_STATE_DIR') or None)
+        self.embedding_store_dtype = os.getenv('EMBEDDING_STORE_DTYPE', 'float32')
+        # Share of chunks allowed to end up without an embedding before a load/reload fails
+        self.embedding_max_failed_fraction = float(os.getenv('EMBEDDING_MAX_FAILED_FRACTION', '0.01'))
+        
+        # Retrieval mode: 'auto' uses one retriever, 'hybrid' fuses dense + BM25
+        self.retrieval_mode = os.getenv('RETRIEVAL_MODE', 'auto').lower()
+        self.hybrid_fusion = os.getenv('HYBRID_FUSION', 'rrf').lower()
+        self.hybrid_weights = {
+            'dense': float(os.getenv('HYBRID_DENSE_WEIGHT', '1.0')),
+            'lexical': float(os.getenv('HYBRID_LEXICAL_WEIGHT', '1.0'))
+        }
+        self.retriever_budgets = {
+            'dense': float(os.getenv('HYBRID_DENSE_BUDGET_MS', '1500')) / 1000.0
+        }
+        # dense: missed the budget; dense_skipped: not started because every pool slot was busy
+        self.retriever_timeouts = {'dense': 0, 'dense_skipped': 0}
+        self._retrieval_executor = None  # Created lazily on first hybrid query
+        self._dense_slots = None
+        
+    # Read-only views of the live snapshot, for callers outside the retrieval path
+    knowledge_base = property(lambda self: self.snapshot.knowledge_base)
+    chunks = property(lambda self: self.snapshot.chunks)
+    document_embeddings = property(lambda self: self.snapshot.document_embeddings)
+    embedding_store = property(lambda self: self.snapshot.embedding_store)
+    vector_index = property(lambda self: self.snapshot.vector_index)
+    vectorizer = property(lambda self: self.snapshot.vectorizer)
+    bm25 = property(lambda self: self.snapshot.bm25)
+    data_path = property(lambda self: self.snapshot.data_path)
+    
+    def load_knowledge_base(self, data_path: str = None) -> int:
+        """Load knowledge base from a JSON or JSON Lines file."""
         try:
-            with open(data_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self.knowledge_base = data.get('blogs', [])
-            
-            # Pre-compute embeddings for retrieval
-            self._compute_document_embeddings()
-            return len(self.knowledge_base)
+            return self.reload_knowledge_base(data_path)['documents']
         except Exception as e:
             print(f"Error loading knowledge base: {e}")
             return 0
     
-    def _compute_document_embeddings(self):
-        """Compute embeddings for all documents using NVIDIA embedding NIM."""
-        if not self.knowledge_base:
+    def reload_knowledge_base(self, data_path: str = None) -> Dict:
+        """
+        Load the knowledge base into a new snapshot and publish it. Posts are
+        diffed against the live snapshot by stable key and content hash, and
+        only added or changed posts are re-chunked and re-embedded. Queries
+        keep using the old snapshot until the new one is complete; on error
+        the exception propagates and the old snapshot stays live.
+        """
+        if not data_path:
+            # A prebuilt bundle wins; otherwise the corpus file
+            data_path = (os.getenv('KNOWLEDGE_BASE_BUNDLE') or os.getenv('KNOWLEDGE_BASE_PATH')
+                         or DEFAULT_KNOWLEDGE_BASE_PATH)
+        if is_bundle(data_path):
+            return self.load_bundle(data_path)
+        
+        start = time.monotonic()
+        
+        # One build at a time; queries don't take the lock
+        with self._reload_lock:
+            previous = self.snapshot
+            # Posts are streamed from the file into the snapshot's document store
+            snapshot = IndexSnapshot(previous.version + 1, data_path, iter_documents(data_path),
+                                     self._text_store_prefix(data_path))
+            diff = DocumentDiff(previous, snapshot)
+            reused_chunks = self._build_snapshot(snapshot, previous, diff)
+            
+            # Publish: a single reference assignment, atomic for concurrent readers
+            self.snapshot = snapshot
+            # Cached responses refer to the old documents
+            if self.response_cache is not None:
+                self.response_cache.clear()
+        
+        stats = dict(diff.counts(),
+                     version=snapshot.version,
+                     documents=len(snapshot.knowledge_base),
+                     chunks=len(snapshot.chunks),
+                     reused_chunks=reused_chunks,
+                     seconds=round(time.monotonic() - start, 3))
+        self.last_reload = stats
+        print(f"🔁 Knowledge base v{snapshot.version}: {stats['added']} added, {stats['changed']} changed, "
+              f"{stats['removed']} removed, {stats['unchanged']} unchanged")
+        return stats
+    
+    def load_bundle(self, path: str, verify: bool = None) -> Dict:
+        """
+        Publish a bundle written by save_bundle (see build_bundle.py) as the
+        live snapshot. Nothing is chunked, embedded or fitted: texts and the
+        embedding matrix are memory-mapped and the saved indexes loaded, so
+        this takes milliseconds. With verify (or BUNDLE_VERIFY=true) every
+        file's SHA-256 is checked first, which reads the whole bundle.
+        """
+        start = time.monotonic()
+        if verify is None:
+            verify = os.getenv('BUNDLE_VERIFY', 'false').lower() in ('1', 'true', 'yes')
+        # Resolve the bundle symlink once, so every file comes from the same version even if
+        # a new bundle is switched in while this one loads
+        path = os.path.realpath(path)
+        manifest = read_manifest(path, verify)
+        embeddings = manifest['embeddings']
+        if embeddings['kind'] == 'nim':
+            # Query vectors must come from the model the documents were embedded with
+            if embeddings['model'] != self.embedding_model:
+                raise ValueError(f"Bundle was embedded with {embeddings['model']}, "
+                                 f"but NVIDIA_EMBEDDING_MODEL is {self.embedding_model}")
+            if not self._has_real_api_key():
+                print("⚠️  Bundle has NIM embeddings but no NVIDIA_API_KEY is set; queries can't be embedded")
+        
+        with self._reload_lock:
+            previous = self.snapshot
+            snapshot = read_bundle(path, manifest, previous.version + 1)
+            diff = DocumentDiff(previous, snapshot)
+            # Later reloads from a corpus file chunk the same way the bundle did
+            settings = manifest['settings']
+            self.chunking = settings['chunking']
+            self.chunk_size = settings['chunk_size']
+            self.chunk_overlap = settings['chunk_overlap']
+            
+            self.snapshot = snapshot
+            if self.response_cache is not None:
+                self.response_cache.clear()
+        
+        stats = dict(diff.counts(),
+                     version=snapshot.version,
+                     bundle=manifest['version'],
+                     documents=len(snapshot.knowledge_base),
+                     chunks=len(snapshot.chunks),
+                     reused_chunks=0,
+                     seconds=round(time.monotonic() - start, 3))
+        self.last_reload = stats
+        print(f"📦 Loaded bundle {manifest['version']} ({stats['documents']} documents, "
+              f"{embeddings['kind']} embeddings) in {stats['seconds'] * 1000:.0f}ms: {path}")
+        return stats
+    
+    def save_bundle(self, path: str) -> Dict:
+        """Write the live snapshot as a bundle directory for load_bundle; returns its manifest."""
+        return write_bundle(self.snapshot, path, {
+            "embedding_model": self.embedding_model,
+            "chunking": self.chunking,
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlap
+        })
+    
+    def _build_snapshot(self, snapshot: IndexSnapshot, previous: IndexSnapshot, diff: DocumentDiff) -> int:
+        """Fill in chunks, BM25 and embeddings, reusing unchanged posts' chunks and vectors; returns chunks reused."""
+        previous_rows = previous.chunk_rows() if diff.reused else {}
+        reused_rows = {}  # Chunk row in the new snapshot -> row in the previous one
+        
+        def chunks():
+            row = 0
+            for parent_id, doc in enumerate(snapshot.knowledge_base):
+                old_parent = diff.reused.get(parent_id)
+                if old_parent is None:
+                    new_chunks = chunk_document(doc, parent_id, self.chunking,
+                                                self.chunk_size, self.chunk_overlap)
+                else:
+                    new_chunks = []
+                    for old_row in previous_rows.get(old_parent, []):
+                        reused_rows[row + len(new_chunks)] = old_row
+                        new_chunks.append(dict(previous.chunks[old_row], parent_id=parent_id))
+                row += len(new_chunks)
+                yield from new_chunks
+        
+        snapshot.chunks = ChunkStore.build(
+            chunks(), snapshot.knowledge_base,
+            f"{snapshot.text_prefix}.chunks" if snapshot.text_prefix else None)
+        
+        # Inverted index for keyword retrieval, available in every mode
+        snapshot.bm25 = BM25Index(
+            k1=float(os.getenv('BM25_K1', '1.2')),
+            b=float(os.getenv('BM25_B', '0.75')),
+            title_weight=float(os.getenv('BM25_TITLE_WEIGHT', '3.0'))
+        ).build(snapshot.chunks)
+        
+        # Pre-compute embeddings for retrieval
+        self._compute_document_embeddings(snapshot, reused_rows, previous)
+        return len(reused_rows)
+    
+    def _compute_document_embeddings(self, snapshot: IndexSnapshot, reused_rows: Dict[int, int] = None,
+                                     previous: IndexSnapshot = None):
+        """Compute embeddings for all chunks using NVIDIA embedding NIM."""
+        if not snapshot.chunks:
             return
         
-        # Prepare document texts for embedding
-        documents = []
-        for doc in self.knowledge_base:
-            # Combine title and content for better retrieval
-            text = f"{doc.get('title', '')} {doc.get('content', '')}"
-            documents.append(text)
+        units = f"{len(snapshot.chunks)} chunks of {len(snapshot.knowledge_base)} documents"
         
         # Check if we have a real API key or if we're in test mode
-        api_key = os.getenv('NVIDIA_API_KEY', '')
-        if api_key and api_key != 'fake-key-for-testing' and 'fake' not in api_key.lower():
+        if self._has_real_api_key():
             try:
-                # Use NVIDIA embedding NIM
-                embeddings = self._get_embeddings(documents)
-                self.document_embeddings = np.array(embeddings)
-                print(f"✅ Using NVIDIA embeddings for {len(documents)} documents")
+                self._load_dense_embeddings(snapshot, reused_rows, previous)
+                print(f"✅ Using NVIDIA embeddings for {units}")
                 return
             except Exception as e:
                 print(f"Error computing embeddings with NVIDIA NIM: {e}")
+                if previous is not None and previous.vectorizer is None and previous.document_embeddings is not None:
+                    # A working dense index is live: fail the reload and keep it serving
+                    raise
         
         # Fallback to TF-IDF if no API key or embedding service fails
-        print(f"🔄 Using TF-IDF fallback for {len(documents)} documents")
-        self._compute_tfidf_embeddings(documents)
+        print(f"🔄 Using TF-IDF fallback for {units}")
+        self._compute_tfidf_embeddings(snapshot, self._chunk_texts(snapshot))
     
-    def _get_embeddings(self, texts: List[str]) -> List[List[float]]:
-        """Get embeddings from NVIDIA embedding NIM."""
-        # Note: This uses the OpenAI-compatible embeddings endpoint
-        embeddings = []
+    def _chunk_texts(self, snapshot: IndexSnapshot) -> Iterator[str]:
+        """
+        Text embedded for each chunk, streamed from the chunk store: the whole
+        corpus is never held as one list of strings.
+        """
+        for i in range(len(snapshot.chunks)):
+            yield self._chunk_text(snapshot, i)
+    
+    def _chunk_text(self, snapshot: IndexSnapshot, row: int) -> str:
+        # Combine post title and chunk text for better retrieval
+        chunk = snapshot.chunks[row]
+        return f"{chunk.get('title', '')} {chunk.get('content', '')}"
+    
+    def _embedding_store_prefix(self, data_path: str) -> str:
+        """Path prefix for binary embedding stores, next to the knowledge base by default."""
+        store_dir = os.getenv('EMBEDDING_STORE_DIR') or os.path.dirname(os.path.abspath(data_path))
+        name = os.path.splitext(os.path.basename(data_path))[0]
+        return os.path.join(store_dir, name)
+    
+    def _text_store_prefix(self, data_path: str) -> Optional[str]:
+        """
+        Path prefix for the snapshot's memory-mapped text blobs, or None to
+        keep texts in memory (DOCUMENT_STORE=memory, or an unwritable directory).
+        Blobs go to DOCUMENT_STORE_DIR, by default under the system temp
+        directory: shared by the workers of one pod, never by other hosts.
+        """
+        if os.getenv('DOCUMENT_STORE', 'mmap').lower() != 'mmap':
+            return None
+        store_dir = os.getenv('DOCUMENT_STORE_DIR') or os.path.join(tempfile.gettempdir(), 'rag-documents')
+        try:
+            os.makedirs(store_dir, exist_ok=True)
+        except OSError:
+            pass
+        if not os.access(store_dir, os.W_OK):
+            print(f"⚠️  {store_dir} is not writable; keeping document texts in memory")
+            return None
+        name = os.path.splitext(os.path.basename(data_path))[0]
+        return os.path.join(store_dir, name)
+    
+    def _load_dense_embeddings(self, snapshot: IndexSnapshot, reused_rows: Dict[int, int] = None,
+                               previous: IndexSnapshot = None):
+        """
+        Memory-map a matching binary embedding store, building it if needed.
+        Only the texts of chunks that actually need embedding are read into a list.
+        """
+        rows = len(snapshot.chunks)
+        max_chars = self.embedder.max_chars
+        fingerprint = corpus_fingerprint(self.embedding_model,
+                                         (text[:max_chars] for text in self._chunk_texts(snapshot)))
+        dtype = self.embedding_store_dtype
         
-        for text in texts:
-            try:
-                response = self.llm_client.embeddings.create(
-                    model=self.embedding_model,
-                    input=text[:8000]  # Truncate to avoid token limits
-                )
-                embeddings.append(response.data[0].embedding)
-            except Exception as e:
-                print(f"Error getting embedding: {e}")
-                # Return zero vector as fallback
-                embeddings.append([0.0] * 768)  # Assuming 768-dim embeddings
+        prefix = self._embedding_store_prefix(snapshot.data_path) if snapshot.data_path else None
+        store = EmbeddingStore.open(prefix, fingerprint, dtype) if prefix else None
+        
+        if store is not None:
+            print(f"🗺️  Memory-mapped {dtype} embedding store: {store.path}")
+        else:
+            embeddings = self._reused_embeddings(rows, reused_rows, previous)
+            missing = [i for i, vec in enumerate(embeddings) if vec is None]
+            # Use NVIDIA embedding NIM (only for documents missing from the cache)
+            texts = [self._chunk_text(snapshot, i)[:max_chars] for i in missing]
+            for i, vec in zip(missing, self._get_cached_embeddings(texts)):
+                embeddings[i] = vec
+            # The embedder returns zero vectors for texts it couldn't embed rather than raising;
+            # beyond a few rejected items that means the NIM is down, so don't build an index on it
+            failed = sum(1 for i in missing if not np.any(embeddings[i]))
+            if failed > self.embedding_max_failed_fraction * rows:
+                raise RuntimeError(f"{failed} of {len(missing)} chunk embeddings failed")
+            # Don't persist a store containing zero-vector fallbacks; retry them next load
+            if prefix and all(np.any(vec) for vec in embeddings):
+                try:
+                    # Older stores are kept unless opted in: on a shared volume other
+                    # replicas may still have them mapped
+                    remove_stale = os.getenv('EMBEDDING_STORE_GC', 'false').lower() == 'true'
+                    store = EmbeddingStore.build(prefix, fingerprint, embeddings, dtype, remove_stale)
+                    print(f"💾 Saved {dtype} embedding store: {store.path}")
+                except OSError as e:
+                    print(f"Could not write embedding store, keeping embeddings in memory: {e}")
+        
+        snapshot.embedding_store = store
+        snapshot.vectorizer = None
+        if store is not None:
+            snapshot.document_embeddings = store.matrix
+        else:
+            snapshot.document_embeddings = normalize_rows(embeddings)
+        
+        # Saved indexes sit next to the store they were built from
+        index_prefix = os.path.splitext(store.path)[0] if store else None
+        scale = store.scale if store else None
+        snapshot.vector_index = load_or_build_index(create_index(), index_prefix, snapshot.document_embeddings, scale)
+    
+    def _reused_embeddings(self, rows: int, reused_rows: Dict[int, int] = None,
+                           previous: IndexSnapshot = None) -> List[Optional[np.ndarray]]:
+        """
+        Vectors of unchanged chunks copied from the previous dense snapshot,
+        None where a chunk still needs embedding. Rows there are already
+        normalized (int8 rows up to their scale), which the store build redoes anyway.
+        """
+        embeddings: List[Optional[np.ndarray]] = [None] * rows
+        if not reused_rows or previous is None or previous.vectorizer is not None \
+                or previous.document_embeddings is None:
+            return embeddings
+        for row, old_row in reused_rows.items():
+            vec = np.asarray(previous.document_embeddings[old_row], dtype=np.float32)
+            if np.any(vec):  # Zero-vector fallbacks get another try
+                embeddings[row] = vec
+        return embeddings
+    
+    def _get_cached_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Get document embeddings, embedding only texts not already in the cache."""
+        if self.embedding_cache is None:
+            return self._get_embeddings(texts)
+        
+        # Cache on exactly what gets embedded so truncated texts share a key
+        texts = [text[:self.embedder.max_chars] for text in texts]
+        embeddings = self.embedding_cache.get_many(self.embedding_model, texts)
+        missing = [i for i, vec in enumerate(embeddings) if vec is None]
+        
+        if missing:
+            fresh = self._get_embeddings([texts[i] for i in missing])
+            to_store = []
+            for i, vec in zip(missing, fresh):
+                embeddings[i] = vec
+                if any(vec):  # Never cache zero-vector fallbacks
+                    to_store.append(i)
+            self.embedding_cache.put_many(self.embedding_model,
+                                          [texts[i] for i in to_store],
+                                          [embeddings[i] for i in to_store])
         
+        print(f"📦 Embedding cache: {len(texts) - len(missing)} hits, {len(missing)} embedded")
         return embeddings
     
-    def _compute_tfidf_embeddings(self, documents: List[str]):
-        """Fallback TF-IDF embeddings if NVIDIA embedding service fails."""
-        self.vectorizer = TfidfVectorizer(
-            max_features=1000,
+    def _get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Get embeddings from NVIDIA embedding NIM in batched requests."""
+        # Note: This uses the OpenAI-compatible embeddings endpoint
+        return self.embedder.embed(texts)
+    
+    def _compute_tfidf_embeddings(self, snapshot: IndexSnapshot, documents: Iterable[str]):
+        """
+        Fallback TF-IDF embeddings if NVIDIA embedding service fails. The
+        vocabulary and IDF weights depend on the whole corpus, so these are
+        always refit in full (cheap: no network calls).
+        """
+        # Memory scales with non-zeros, not docs x features, so the vocabulary can be large
+        max_features = int(os.getenv('TFIDF_MAX_FEATURES', '1000')) or None
+        ngram_range = tuple(int(n) for n in os.getenv('TFIDF_NGRAM_RANGE', '1,2').split(','))
+        snapshot.vectorizer = TfidfVectorizer(
+            max_features=max_features,
             stop_words='english',
-            ngram_range=(1, 2)
+            ngram_range=ngram_range,
+            dtype=np.float32
         )
-        self.document_embeddings = self.vectorizer.fit_transform(documents).toarray()    
+        snapshot.embedding_store = None
+        # Keep the L2-normalized TF-IDF rows in CSR form; never densify
+        snapshot.document_embeddings = snapshot.vectorizer.fit_transform(documents).tocsr()
+        snapshot.vector_index = SparseIndex().build(snapshot.document_embeddings)
 
-    def retrieve_relevant_context(self, query: str, top_k: int = 3) -> List[Dict]:
+    def _has_real_api_key(self) -> bool:
+        api_key = os.getenv('NVIDIA_API_KEY', '')
+        return bool(api_key) and api_key != 'fake-key-for-testing' and 'fake' not in api_key.lower()
+    
+    def reset_after_fork(self):
+        """
+        Give a forked worker its own network clients, SQLite connection and
+        thread pools. The knowledge base, indexes and embedding matrix loaded
+        in the parent stay shared copy-on-write.
+        """
+        self.llm_client = OpenAI(
+            base_url=os.getenv('NVIDIA_NIM_BASE_URL', 'https://integrate.api.nvidia.com/v1'),
+            api_key=os.getenv('NVIDIA_API_KEY')
+        )
+        self.embedder = NIMEmbeddingClient(self.llm_client.with_options(max_retries=0), self.embedding_model)
+        self._async_llm_client = None
+        self._retrieval_executor = None
+        self._dense_slots = None
+        self.chat_flight = SingleFlight()
+        self.achat_flight = AsyncSingleFlight()
+        self._create_query_batchers()
+        self._reload_lock = threading.Lock()
+        self.reload_jobs = ReloadJobs(self.reload_knowledge_base, state_dir=os.getenv('RELOAD_STATE_DIR') or None)
+        # Pick up reloads that other workers run
+        self.reload_jobs.watch(float(os.getenv('RELOAD_POLL_SECONDS', '5')))
+        if self.embedding_cache is not None:
+            # SQLite connections must not be shared across processes
+            self.embedding_cache = EmbeddingCache(self.embedding_cache.path)
+    
+    def _create_query_batchers(self):
+        """Sync and async query-embedding batchers, or None when the batch window is 0 (off)."""
+        self.query_batcher = self.aquery_batcher = None
+        if self.query_batch_window_ms > 0:
+            self.query_batcher = MicroBatcher(self._get_embeddings, max_batch=self.query_batch_size,
+                                              max_wait_ms=self.query_batch_window_ms,
+                                              concurrency=self.embedder.concurrency)
+            self.aquery_batcher = AsyncMicroBatcher(self._aget_embeddings, max_batch=self.query_batch_size,
+                                                    max_wait_ms=self.query_batch_window_ms)
+    
+    @property
+    def async_llm_client(self) -> AsyncOpenAI:
+        """AsyncOpenAI client for the async serving path (same endpoint and key as llm_client)."""
+        if self._async_llm_client is None:
+            self._async_llm_client = AsyncOpenAI(
+                base_url=os.getenv('NVIDIA_NIM_BASE_URL', 'https://integrate.api.nvidia.com/v1'),
+                api_key=os.getenv('NVIDIA_API_KEY')
+            )
+        return self._async_llm_client
+    
+    def _needs_query_embedding(self, snapshot: IndexSnapshot = None) -> bool:
+        """True when dense retrieval needs a query embedding from the embedding NIM."""
+        snapshot = snapshot or self.snapshot
+        return snapshot.vectorizer is None and snapshot.vector_index is not None and self._has_real_api_key()
+    
+    def retrieve_relevant_context(self, query: str, top_k: int = 3,
+                                  query_embedding: np.ndarray = None) -> List[Dict]:
         """Retrieve most relevant documents using semantic similarity."""
-        if not self.knowledge_base or self.document_embeddings is None:
-            return []
+        context_docs, _ = self._retrieve(self.snapshot, query, top_k, query_embedding)
+        return context_docs
+    
+    def _retrieve(self, snapshot: IndexSnapshot, query: str, top_k: int,
+                  query_embedding: np.ndarray = None) -> Tuple[List[Dict], Optional[np.ndarray]]:
+        """
+        Retrieval against one snapshot, so a concurrent reload can't mix two index versions.
+        Returns the documents plus the dense query embedding used (None if none was needed,
+        it failed, or it missed the hybrid budget).
+        """
+        if not snapshot.knowledge_base or snapshot.document_embeddings is None:
+            return [], None
+        
+        if self.retrieval_mode == 'hybrid':
+            return self._hybrid_retrieval(snapshot, query, top_k, query_embedding)
         
         try:
-            # Get query embedding
-            if self.vectorizer is not None:
-                # Using TF-IDF fallback
-                query_embedding = self.vectorizer.transform([query]).toarray()[0]
-            else:
-                # Using NVIDIA embeddings - check if we have real API key
-                api_key = os.getenv('NVIDIA_API_KEY', '')
-                if api_key and api_key != 'fake-key-for-testing' and 'fake' not in api_key.lower():
-                    query_embeddings = self._get_embeddings([query])
-                    query_embedding = np.array(query_embeddings[0])
-                else:
-                    # Fall back to keyword search if no real API key
-                    return self._keyword_retrieval(query, top_k)
-            
-            # Compute similarities
-            similarities = cosine_similarity([query_embedding], self.document_embeddings)[0]
-            
-            # Get top-k most similar documents
-            top_indices = np.argsort(similarities)[-top_k:][::-1]
+            ranking, query_embedding = self._dense_ranking(snapshot, query, self._candidate_count(top_k),
+                                                           query_embedding)
+            if ranking is None:
+                # Fall back to keyword search if no real API key
+                return self._keyword_retrieval(snapshot, query, top_k), None
             
-            relevant_docs = []
-            for idx in top_indices:
-                if similarities[idx] > 0.05:  # Lower threshold for TF-IDF
-                    doc = self.knowledge_base[idx].copy()
-                    doc['similarity_score'] = float(similarities[idx])
-                    relevant_docs.append(doc)
-            
-            return relevant_docs
+            # Lower threshold for TF-IDF
+            ranking = [(idx, score) for idx, score in ranking if score > 0.05]
+            return self._docs_from_ranking(snapshot, ranking, top_k), query_embedding
             
         except Exception as e:
             print(f"Error in retrieval: {e}")
             # Fallback to keyword-based retrieval
-            return self._keyword_retrieval(query, top_k)
+            return self._keyword_retrieval(snapshot, query, top_k), None
     
-    def _keyword_retrieval(self, query: str, top_k: int = 3) -> List[Dict]:
-        """Fallback keyword-based retrieval."""
-        query_lower = query.lower()
-        scored_docs = []
+    def _dense_ranking(self, snapshot: IndexSnapshot, query: str, top_k: int,
+                       query_embedding: np.ndarray = None
+                       ) -> Tuple[Optional[List[Tuple[int, float]]], Optional[np.ndarray]]:
+        """
+        Rank documents by vector similarity, plus the dense query embedding used;
+        (None, None) when no dense retriever is available.
+        """
+        if snapshot.vector_index is None:
+            return None, None
         
-        for doc in self.knowledge_base:
-            score = 0
-            content = doc.get('content', '').lower()
-            title = doc.get('title', '').lower()
-            
-            for word in query_lower.split():
-                if len(word) > 3:
-                    score += content.count(word) * 1
-                    score += title.count(word) * 3
-            
-            if score > 0:
-                doc_copy = doc.copy()
-                doc_copy['similarity_score'] = score
-                scored_docs.append((score, doc_copy))
+        # Get query embedding
+        if snapshot.vectorizer is not None:
+            # Using TF-IDF fallback (sparse 1 x vocabulary row)
+            query_vector, query_embedding = snapshot.vectorizer.transform([query]), None
+        else:
+            if query_embedding is None:
+                # Not pre-computed by the caller (the async path embeds the query itself)
+                if not self._has_real_api_key():
+                    return None, None
+                query_embedding = self._embed_query(query)
+            query_vector = query_embedding
         
-        scored_docs.sort(reverse=True, key=lambda x: x[0])
-        return [doc for _, doc in scored_docs[:top_k]]
+        # Rows are normalized at load time, so exact search is one matrix-vector
+        # product plus argpartition; ANN indexes probe only part of the corpus
+        top_indices, top_scores = snapshot.vector_index.search(query_vector, top_k)
+        return [(int(idx), float(score)) for idx, score in zip(top_indices, top_scores)], query_embedding
     
-    def generate_response(self, query: str, context_docs: List[Dict], 
-                         temperature: float = 0.7, max_tokens: int = 1024) -> Tuple[str, Dict]:
-        """Generate response using NVIDIA LLM NIM with retrieved context."""
+    def _embed_query(self, query: str) -> np.ndarray:
+        """Embed a query, reusing cached embeddings for repeated questions."""
+        key = f"{self.embedding_model}\n{normalize_query(query)}"
+        cached = self.query_embedding_cache.get(key)
+        if cached is not None:
+            return cached
         
-        # Build context from retrieved documents
-        context_parts = []
-        for i, doc in enumerate(context_docs, 1):
-            title = doc.get('title', 'Unknown')
-            content = doc.get('content', '')[:800]  # Limit content length
-            score = doc.get('similarity_score', 0)
-            context_parts.append(f"[Source {i}] {title}\nRelevance: {score:.3f}\nContent: {content}")
+        if self.query_batcher is not None:
+            embedding = self.query_batcher.submit(query)
+        else:
+            embedding = self._get_embeddings([query])[0]
+        query_embedding = np.asarray(embedding, dtype=np.float32)
+        if np.any(query_embedding):  # Don't cache zero-vector fallbacks
+            self.query_embedding_cache.set(key, query_embedding)
+        return query_embedding
+    
+    async def _aembed_query(self, query: str, snapshot: IndexSnapshot = None) -> Optional[np.ndarray]:
+        """Async counterpart of _embed_query; None when retrieval doesn't need an embedding."""
+        if not self._needs_query_embedding(snapshot):
+            return None
+        key = f"{self.embedding_model}\n{normalize_query(query)}"
+        cached = self.query_embedding_cache.get(key)
+        if cached is not None:
+            return cached
         
-        context = "\n\n".join(context_parts)
+        if self.aquery_batcher is not None:
+            embedding = await self.aquery_batcher.submit(query)
+        else:
+            embedding = (await self._aget_embeddings([query]))[0]
+        query_embedding = np.asarray(embedding, dtype=np.float32)
+        if np.any(query_embedding):
+            self.query_embedding_cache.set(key, query_embedding)
+        return query_embedding
+    
+    async def _aget_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """One embeddings request through the async client, vectors in input order."""
+        response = await self.async_llm_client.embeddings.create(
+            model=self.embedding_model,
+            input=[text[:self.embedder.max_chars] for text in texts]
+        )
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+    
+    def _query_vector(self, snapshot: IndexSnapshot, query: str, query_embedding: np.ndarray = None):
+        """Normalized query vector for the semantic response cache, if there is one to compare."""
+        if snapshot.vectorizer is not None:
+            return snapshot.vectorizer.transform([query])
+        if query_embedding is None:
+            return None
+        norm = np.linalg.norm(query_embedding)
+        return query_embedding / norm if norm > 0 else None
+    
+    def _lexical_ranking(self, snapshot: IndexSnapshot, query: str, top_k: int) -> List[Tuple[int, float]]:
+        return snapshot.bm25.search(query, top_k) if snapshot.bm25 is not None else []
+    
+    def _hybrid_retrieval(self, snapshot: IndexSnapshot, query: str, top_k: int = 3,
+                          query_embedding: np.ndarray = None) -> Tuple[List[Dict], Optional[np.ndarray]]:
+        """
+        Run dense and BM25 retrieval side by side and fuse the rankings.
+        Dense retrieval (which may call the embedding NIM) runs on the pool
+        within its latency budget and is left out of the fusion if it misses
+        it. BM25 runs on the calling thread, so it never queues behind hung
+        embedding calls; when every pool slot is still busy with those, dense
+        isn't started at all and the query is answered from BM25 alone.
+        """
+        if self._retrieval_executor is None:
+            workers = int(os.getenv('HYBRID_WORKERS', '8'))
+            self._dense_slots = threading.BoundedSemaphore(workers)
+            self._retrieval_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='retriever')
         
+        # Over-fetch candidates so fusion has something to re-rank
+        candidates = self._hybrid_candidates(top_k)
+        start = time.monotonic()
+        dense = None
+        if self._dense_slots.acquire(blocking=False):
+            try:
+                dense = self._retrieval_executor.submit(self._dense_ranking_slot, snapshot, query, candidates,
+                                                        query_embedding)
+            except Exception:
+                self._dense_slots.release()
+                raise
+        else:
+            self.retriever_timeouts['dense_skipped'] += 1
+            print("⏱️  dense retriever busy; answering from BM25 alone")
+        
+        lexical = []
+        try:
+            lexical = self._lexical_ranking(snapshot, query, candidates)
+        except Exception as e:
+            print(f"Error in lexical retrieval: {e}")
+        
+        rankings = {}
+        used_embedding = None
+        if dense is not None:
+            remaining = self.retriever_budgets['dense'] - (time.monotonic() - start)
+            try:
+                ranking, used_embedding = dense.result(timeout=max(0.0, remaining))
+                if ranking:
+                    rankings['dense'] = ranking
+            except FutureTimeoutError:
+                self.retriever_timeouts['dense'] += 1
+                print(f"⏱️  dense retriever exceeded its {self.retriever_budgets['dense'] * 1000:.0f}ms budget")
+            except Exception as e:
+                print(f"Error in dense retrieval: {e}")
+        if lexical:
+            rankings['lexical'] = lexical
+        
+        return self._fuse_rankings(snapshot, rankings, top_k), used_embedding
+    
+    def _dense_ranking_slot(self, *args) -> Tuple[Optional[List[Tuple[int, float]]], Optional[np.ndarray]]:
+        """_dense_ranking on a pool thread, freeing its slot when done (even after the caller gave up)."""
+        try:
+            return self._dense_ranking(*args)
+        finally:
+            self._dense_slots.release()
+    
+    def _fuse_rankings(self, snapshot: IndexSnapshot, rankings: Dict[str, List[Tuple[int, float]]],
+                       top_k: int) -> List[Dict]:
+        if self.hybrid_fusion == 'weighted':
+            fused = weighted_score_fusion(rankings, self.hybrid_weights)
+        else:
+            fused = reciprocal_rank_fusion(rankings, weights=self.hybrid_weights)
+        return self._docs_from_ranking(snapshot, fused, top_k)
+    
+    async def aretrieve_relevant_context(self, query: str, top_k: int = 3) -> List[Dict]:
+        """Async retrieval: the query embedding is awaited, ranking runs on a worker thread."""
+        context_docs, _ = await self._aretrieve(self.snapshot, query, top_k)
+        return context_docs
+    
+    async def _aretrieve(self, snapshot: IndexSnapshot, query: str,
+                         top_k: int) -> Tuple[List[Dict], Optional[np.ndarray]]:
+        """Retrieved documents plus the query embedding used (None if none was needed or it failed)."""
+        if not snapshot.knowledge_base or snapshot.document_embeddings is None:
+            return [], None
+        
+        try:
+            if self.retrieval_mode == 'hybrid':
+                query_embedding = await asyncio.wait_for(self._aembed_query(query, snapshot),
+                                                         timeout=self.retriever_budgets['dense'])
+            else:
+                query_embedding = await self._aembed_query(query, snapshot)
+        except asyncio.TimeoutError:
+            self.retriever_timeouts['dense'] += 1
+            print(f"⏱️  dense retriever exceeded its {self.retriever_budgets['dense'] * 1000:.0f}ms budget")
+            return await asyncio.to_thread(self._lexical_only_retrieval, snapshot, query, top_k), None
+        except Exception as e:
+            print(f"Error in retrieval: {e}")
+            return await asyncio.to_thread(self._lexical_only_retrieval, snapshot, query, top_k), None
+        
+        # Index search and BM25 are CPU-bound; keep them off the event loop
+        context_docs, _ = await asyncio.to_thread(self._retrieve, snapshot, query, top_k, query_embedding)
+        return context_docs, query_embedding
+    
+    def _lexical_only_retrieval(self, snapshot: IndexSnapshot, query: str, top_k: int) -> List[Dict]:
+        """Retrieval when the query embedding is unavailable: fused BM25 alone in hybrid mode, keyword otherwise."""
+        if self.retrieval_mode == 'hybrid':
+            ranking = self._lexical_ranking(snapshot, query, self._hybrid_candidates(top_k))
+            return self._fuse_rankings(snapshot, {'lexical': ranking} if ranking else {}, top_k)
+        return self._keyword_retrieval(snapshot, query, top_k)
+    
+    def _candidate_count(self, top_k: int) -> int:
+        """Chunks to fetch so that, collapsed per post, there are still top_k posts."""
+        return top_k if self.chunking == 'off' else top_k * self.chunk_overfetch
+    
+    def _hybrid_candidates(self, top_k: int) -> int:
+        return max(self._candidate_count(top_k) * 4, 20)
+    
+    def _docs_from_ranking(self, snapshot: IndexSnapshot, ranking: List[Tuple[int, float]],
+                           top_k: int) -> List[Dict]:
+        """
+        Collapse ranked chunks into their posts, best post first, reading each
+        post from the document store with its best chunk's score and up to
+        `chunks_per_post` matching passages.
+        """
+        docs = {}
+        for idx, score in ranking:
+            # Texts are only read from the store for the posts and passages returned
+            parent = snapshot.chunks.parent_id(idx)
+            doc = docs.get(parent)
+            if doc is None:
+                if len(docs) >= top_k:
+                    continue
+                doc = docs[parent] = snapshot.knowledge_base[parent]
+                doc['doc_id'] = int(parent)
+                doc['similarity_score'] = float(score)
+                if self.chunking != 'off':
+                    doc['passages'] = []
+            passages = doc.get('passages')
+            if passages is not None and len(passages) < self.chunks_per_post:
+                chunk = snapshot.chunks[idx]
+                passages.append({
+                    "chunk_id": int(idx),
+                    "section": chunk['section'],
+                    "content": chunk['content'],
+                    "score": float(score)
+                })
+        return list(docs.values())
+    
+    def _keyword_retrieval(self, snapshot: IndexSnapshot, query: str, top_k: int = 3) -> List[Dict]:
+        """Fallback keyword-based retrieval using the BM25 inverted index."""
+        ranking = self._lexical_ranking(snapshot, query, self._candidate_count(top_k))
+        return self._docs_from_ranking(snapshot, ranking, top_k)
+    
+    def _build_messages(self, query: str, context_docs: List[Dict],
+                        max_tokens: int = 1024) -> Tuple[List[Dict], Dict]:
+        """
+        Build the chat messages (system prompt + context + question) for the LLM.
+        Also returns the packing result: the documents that made it into the
+        context, context tokens used and estimated prompt tokens.
+        """
         # Build the system prompt for the hackathon bot
         system_prompt = """You are an expert AI coach specializing in BMX, fitness, and product knowledge. 
         You have access to a curated knowledge base of expert articles and reviews.
@@ -191,6 +807,24 @@ class NVIDIARAGEngine:
         - Reference specific sources when making claims
         - Keep responses engaging and helpful"""
         
+        # Context budget: the configured budget, capped by what the model's window
+        # leaves after the answer (max_tokens), the prompt scaffolding and source headers
+        counter = self.context_packer.counter
+        overhead = counter.count(system_prompt) + counter.count(query) + 40 + 24 * len(context_docs)
+        budget = min(self.context_packer.budget_tokens, self.llm_context_window - max_tokens - overhead)
+        packed = self.context_packer.pack(context_docs, max(budget, 0))
+        
+        # Build context from the packed passages, most relevant documents first
+        context_parts = []
+        for i, item in enumerate(packed['docs'], 1):
+            doc = item['doc']
+            title = doc.get('title', 'Unknown')
+            content = "\n...\n".join(item['passages'])
+            score = doc.get('similarity_score', 0)
+            context_parts.append(f"[Source {i}] {title}\nRelevance: {score:.3f}\nContent: {content}")
+        
+        context = "\n\n".join(context_parts)
+        
         # Build the user message with context
         user_message = f"""Context from knowledge base:
 {context}
@@ -199,10 +833,16 @@ User Question: {query}
 
 Please provide a helpful response based on the context above."""
         
-        messages = [
+        packed['prompt_tokens'] = counter.count(system_prompt) + counter.count(user_message)
+        return [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_message}
-        ]
+        ], packed
+    
+    def generate_response(self, query: str, context_docs: List[Dict], 
+                         temperature: float = 0.7, max_tokens: int = 1024) -> Tuple[str, Dict]:
+        """Generate response using NVIDIA LLM NIM with retrieved context."""
+        messages, packed = self._build_messages(query, context_docs, max_tokens)
         
         try:
             # Call NVIDIA LLM NIM (llama-3.1-nemotron-nano-8B-v1)
@@ -214,27 +854,123 @@ Please provide a helpful response based on the context above."""
                 top_p=0.9
             )
             
-            response_text = completion.choices[0].message.content
+            return self._completion_result(completion, packed)
             
-            # Prepare metadata
-            metadata = {
-                "model": completion.model,
-                "sources": [doc.get('title', 'Unknown') for doc in context_docs],
-                "context_count": len(context_docs),
-                "total_tokens": getattr(completion.usage, 'total_tokens', 0) if hasattr(completion, 'usage') else 0
-            }
+        except Exception as e:
+            return self._error_result(e)
+    
+    async def agenerate_response(self, query: str, context_docs: List[Dict],
+                                 temperature: float = 0.7, max_tokens: int = 1024) -> Tuple[str, Dict]:
+        """Async generate_response: awaits the LLM NIM without holding a thread."""
+        messages, packed = self._build_messages(query, context_docs, max_tokens)
+        
+        try:
+            completion = await self.async_llm_client.chat.completions.create(
+                model=self.llm_model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                top_p=0.9
+            )
+            return self._completion_result(completion, packed)
+        
+        except Exception as e:
+            return self._error_result(e)
+    
+    def _completion_result(self, completion, packed: Dict) -> Tuple[str, Dict]:
+        response_text = completion.choices[0].message.content
+        usage = getattr(completion, 'usage', None)
+        
+        # Prepare metadata
+        metadata = {
+            "model": completion.model,
+            "sources": [item['doc'].get('title', 'Unknown') for item in packed['docs']],
+            "context_count": len(packed['docs']),
+            "context_tokens": packed['tokens'],
+            "prompt_tokens": getattr(usage, 'prompt_tokens', 0) if usage else packed['prompt_tokens'],
+            "total_tokens": getattr(usage, 'total_tokens', 0) if usage else 0
+        }
+        
+        return response_text, metadata
+    
+    def _error_result(self, e: Exception) -> Tuple[str, Dict]:
+        error_msg = f"I apologize, but I encountered an error while processing your request: {str(e)}"
+        metadata = {
+            "model": "error",
+            "sources": [],
+            "context_count": 0,
+            "error": str(e)
+        }
+        return error_msg, metadata
+    
+    def generate_response_stream(self, query: str, context_docs: List[Dict],
+                                 temperature: float = 0.7, max_tokens: int = 1024) -> Iterator[Dict]:
+        """
+        Stream the LLM response as events: {"type": "token", "content": ...} for
+        each delta, then one {"type": "done", ...} with sources and token usage
+        (or {"type": "error", ...} if the call fails).
+        """
+        messages, packed = self._build_messages(query, context_docs, max_tokens)
+        sources = [item['doc'].get('title', 'Unknown') for item in packed['docs']]
+        
+        try:
+            stream = self.llm_client.chat.completions.create(
+                model=self.llm_model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                top_p=0.9,
+                stream=True,
+                stream_options={"include_usage": True}
+            )
             
-            return response_text, metadata
+            model, usage = self.llm_model, None
+            for chunk in stream:
+                model = getattr(chunk, 'model', None) or model
+                if getattr(chunk, 'usage', None):
+                    usage = chunk.usage
+                for choice in chunk.choices:
+                    content = getattr(choice.delta, 'content', None)
+                    if content:
+                        yield {"type": "token", "content": content}
             
+            yield {
+                "type": "done",
+                "model": model,
+                "sources": sources,
+                "context_count": len(packed['docs']),
+                "context_tokens": packed['tokens'],
+                "prompt_tokens": getattr(usage, 'prompt_tokens', 0) if usage else packed['prompt_tokens'],
+                "completion_tokens": getattr(usage, 'completion_tokens', 0) if usage else 0,
+                "total_tokens": getattr(usage, 'total_tokens', 0) if usage else 0
+            }
+        
         except Exception as e:
-            error_msg = f"I apologize, but I encountered an error while processing your request: {str(e)}"
-            metadata = {
-                "model": "error",
-                "sources": [],
-                "context_count": 0,
-                "error": str(e)
+            yield {
+                "type": "error",
+                "error": str(e),
+                "reply": f"I apologize, but I encountered an error while processing your request: {str(e)}"
             }
-            return error_msg, metadata
+    
+    def _response_cache_entry(self, snapshot: IndexSnapshot, query: str, context_docs: List[Dict],
+                              temperature: float, max_tokens: int,
+                              query_embedding: np.ndarray = None) -> Optional[Tuple]:
+        """
+        (key, query vector, normalized text) for the response cache, or None if it is
+        disabled or retrieval produced no query embedding: embedding the query here would
+        block the request without the retrieval latency budget, so the lookup is skipped.
+        """
+        if self.response_cache is None:
+            return None
+        if query_embedding is None and self._needs_query_embedding(snapshot):
+            return None
+        sources = tuple(
+            (doc.get('doc_id'), tuple(passage['chunk_id'] for passage in doc.get('passages', [])))
+            for doc in context_docs
+        )
+        # Chunk ids are only meaningful within one snapshot
+        cache_key = (snapshot.version, sources, temperature, max_tokens, self.llm_model)
+        return cache_key, self._query_vector(snapshot, query, query_embedding), normalize_query(query)
     
     def chat(self, query: str, **kwargs) -> Dict:
         """Main chat interface combining retrieval and generation."""
@@ -244,30 +980,171 @@ Please provide a helpful response based on the context above."""
         temperature = kwargs.get('temperature', 0.7)
         max_tokens = kwargs.get('max_tokens', 1024)
         
+        if not self.coalesce_requests:
+            return self._chat(query, top_k, temperature, max_tokens)
+        
+        # Concurrent identical requests wait for the first one instead of calling NIM again
+        key = (normalize_query(query), top_k, temperature, max_tokens)
+        result, shared = self.chat_flight.do(key, lambda: self._chat(query, top_k, temperature, max_tokens))
+        return dict(result) if shared else result
+    
+    def _chat(self, query: str, top_k: int, temperature: float, max_tokens: int) -> Dict:
         # Retrieve relevant context
-        context_docs = self.retrieve_relevant_context(query, top_k=top_k)
+        snapshot = self.snapshot
+        context_docs, query_embedding = self._retrieve(snapshot, query, top_k)
+        
+        # Reuse a response to a near-identical question over the same sources
+        cache_entry = self._response_cache_entry(snapshot, query, context_docs, temperature, max_tokens,
+                                                 query_embedding)
+        if cache_entry is not None:
+            cached = self.response_cache.lookup(*cache_entry)
+            if cached is not None:
+                return dict(cached, cached=True)
         
         # Generate response
         response_text, metadata = self.generate_response(
             query, context_docs, temperature=temperature, max_tokens=max_tokens
         )
         
+        result = self._chat_result(response_text, metadata)
+        if cache_entry is not None and not result["error"]:
+            self.response_cache.store(*cache_entry, result)
+        return result
+    
+    async def achat(self, query: str, **kwargs) -> Dict:
+        """Async chat(): same pipeline and response, for the ASGI serving path."""
+        top_k = kwargs.get('top_k', 3)
+        temperature = kwargs.get('temperature', 0.7)
+        max_tokens = kwargs.get('max_tokens', 1024)
+        
+        if not self.coalesce_requests:
+            return await self._achat(query, top_k, temperature, max_tokens)
+        
+        key = (normalize_query(query), top_k, temperature, max_tokens)
+        result, shared = await self.achat_flight.do(key, lambda: self._achat(query, top_k, temperature, max_tokens))
+        return dict(result) if shared else result
+    
+    async def _achat(self, query: str, top_k: int, temperature: float, max_tokens: int) -> Dict:
+        snapshot = self.snapshot
+        context_docs, query_embedding = await self._aretrieve(snapshot, query, top_k)
+        
+        cache_entry = self._response_cache_entry(snapshot, query, context_docs, temperature, max_tokens,
+                                                 query_embedding)
+        if cache_entry is not None:
+            cached = self.response_cache.lookup(*cache_entry)
+            if cached is not None:
+                return dict(cached, cached=True)
+        
+        response_text, metadata = await self.agenerate_response(
+            query, context_docs, temperature=temperature, max_tokens=max_tokens
+        )
+        
+        result = self._chat_result(response_text, metadata)
+        if cache_entry is not None and not result["error"]:
+            self.response_cache.store(*cache_entry, result)
+        return result
+    
+    def _chat_result(self, response_text: str, metadata: Dict) -> Dict:
         return {
             "reply": response_text,
             "sources": metadata.get("sources", []),
             "context_count": metadata.get("context_count", 0),
             "model": metadata.get("model", "unknown"),
+            "context_tokens": metadata.get("context_tokens", 0),
+            "prompt_tokens": metadata.get("prompt_tokens", 0),
             "total_tokens": metadata.get("total_tokens", 0),
-            "error": metadata.get("error")
+            "error": metadata.get("error"),
+            "cached": False
         }
     
+    def chat_stream(self, query: str, **kwargs) -> Iterator[Dict]:
+        """Streaming variant of chat(): token events followed by a final done/error event."""
+        top_k = kwargs.get('top_k', 3)
+        temperature = kwargs.get('temperature', 0.7)
+        max_tokens = kwargs.get('max_tokens', 1024)
+        
+        snapshot = self.snapshot
+        context_docs, query_embedding = self._retrieve(snapshot, query, top_k)
+        
+        cache_entry = self._response_cache_entry(snapshot, query, context_docs, temperature, max_tokens,
+                                                 query_embedding)
+        if cache_entry is not None:
+            cached = self.response_cache.lookup(*cache_entry)
+            if cached is not None:
+                yield {"type": "token", "content": cached["reply"]}
+                yield dict(cached, type="done", cached=True)
+                return
+        
+        reply_parts = []
+        for event in self.generate_response_stream(query, context_docs,
+                                                   temperature=temperature, max_tokens=max_tokens):
+            if event["type"] == "token":
+                reply_parts.append(event["content"])
+            elif event["type"] == "done":
+                event["cached"] = False
+                if cache_entry is not None:
+                    result = {key: value for key, value in event.items() if key != "type"}
+                    result.update(reply="".join(reply_parts), error=None)
+                    self.response_cache.store(*cache_entry, result)
+            yield event
+    
     def health_check(self) -> Dict:
         """Health check for the RAG system."""
+        snapshot = self.snapshot
+        jobs = self.reload_jobs.jobs()
         return {
-            "status": "healthy" if self.knowledge_base else "no_knowledge_base",
-            "knowledge_base_loaded": len(self.knowledge_base) > 0,
-            "documents": len(self.knowledge_base),
-            "embeddings_computed": self.document_embeddings is not None,
+            "status": "healthy" if snapshot.knowledge_base else "no_knowledge_base",
+            "knowledge_base_loaded": len(snapshot.knowledge_base) > 0,
+            "documents": len(snapshot.knowledge_base),
+            "embeddings_computed": snapshot.document_embeddings is not None,
+            "snapshot": {
+                "version": snapshot.version,
+                "loaded_at": snapshot.created_at,
+                "last_reload": self.last_reload,
+                "bundle": {
+                    "path": snapshot.data_path,
+                    "version": snapshot.bundle['version'],
+                    "created_at": snapshot.bundle['created_at']
+                } if snapshot.bundle else None,
+                "reload_job": jobs[0].as_dict() if jobs else None
+            },
+            "context_packer": {
+                "budget_tokens": self.context_packer.budget_tokens,
+                "max_passage_tokens": self.context_packer.max_passage_tokens,
+                "llm_context_window": self.llm_context_window,
+                "tokenizer": self.context_packer.counter.name
+            },
+            "document_store": {
+                "documents": snapshot.knowledge_base.info(),
+                "chunks": snapshot.chunks.info()
+            },
+            "chunks": {
+                "strategy": self.chunking,
+                "count": len(snapshot.chunks),
+                "size": self.chunk_size,
+                "overlap": self.chunk_overlap
+            },
+            "embedding_store": {
+                "path": snapshot.embedding_store.path,
+                "dtype": snapshot.embedding_store.dtype,
+                "bytes": snapshot.embedding_store.nbytes()
+            } if snapshot.embedding_store else None,
+            "vector_index": snapshot.vector_index.info() if snapshot.vector_index else None,
+            "bm25": snapshot.bm25.stats() if snapshot.bm25 else None,
+            "retrieval_mode": self.retrieval_mode,
+            "retriever_timeouts": dict(self.retriever_timeouts),
+            "query_embedding_cache": self.query_embedding_cache.stats(),
+            "query_embedding_batching": {
+                "sync": self.query_batcher.stats.as_dict(),
+                "async": self.aquery_batcher.stats.as_dict()
+            } if self.query_batcher else None,
+            "response_cache": self.response_cache.stats() if self.response_cache else None,
+            "request_coalescing": {
+                "sync": self.chat_flight.stats(),
+                "async": self.achat_flight.stats()
+            } if self.coalesce_requests else None,
             "llm_model": self.llm_model,
-            "embedding_model": self.embedding_model
+            "embedding_model": self.embedding_model,
+            "embedding_client": self.embedder.stats(),
+            "embedding_cache": self.embedding_cache.stats() if self.embedding_cache else None
         }
\ No newline at end of file
@@ -0,0 +1,214 @@
+import glob
+import json
+import os
+import queue
+import re
+import socket
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from atomic_files import temp_path
+
+JOB_ID_RE = re.compile(r'[0-9a-f]{32}')
+GENERATION = 'generation.json'
+
+
+class ReloadJob:
+    """One requested knowledge base reload and its outcome."""
+
+    __slots__ = ('id', 'data_path', 'status', 'submitted_at', 'started_at', 'finished_at',
+                 'result', 'error', 'done', 'worker', 'follows')
+
+    def __init__(self, data_path: str = None, follows: str = None):
+        self.id = uuid.uuid4().hex
+        self.data_path = data_path
+        self.status = 'queued'  # queued -> running -> succeeded | failed
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+        self.worker = f"{socket.gethostname()}:{os.getpid()}"
+        self.follows = follows  # Job id of the reload (in another worker) this one repeats
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> 'ReloadJob':
+        """A job as another worker recorded it; read-only here."""
+        job = cls(state.get('data_path'))
+        for field in ('status', 'submitted_at', 'started_at', 'finished_at', 'result', 'error', 'worker'):
+            setattr(job, field, state.get(field))
+        job.id = state['job_id']
+        if job.status in ('succeeded', 'failed'):
+            job.done.set()
+        return job
+
+    def wait(self, timeout: float = None) -> bool:
+        return self.done.wait(timeout)
+
+    def as_dict(self) -> Dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "data_path": self.data_path,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+            "worker": self.worker,
+            "follows": self.follows
+        }
+
+
+class ReloadJobs:
+    """
+    Runs reloads on one background thread, in submission order, so the
+    request asking for a reload returns at once with a job id to poll.
+    `reload_fn(data_path)` builds and publishes the new index; if it raises,
+    the job is marked failed and whatever it replaces keeps serving. A reload
+    submitted while another for the same path is still queued joins that job.
+
+    With a `state_dir` shared by every worker (and replica), jobs are also
+    recorded there as `<job_id>.json`, so any worker can report on them, and
+    each successful reload writes a generation stamp. Workers running watch()
+    poll the stamp and repeat a reload made elsewhere in their own process.
+    """
+
+    def __init__(self, reload_fn: Callable[[Optional[str]], Dict], history: int = 20,
+                 state_dir: str = None):
+        self.reload_fn = reload_fn
+        self.history = history
+        self.state_dir = state_dir
+        self._jobs: 'OrderedDict[str, ReloadJob]' = OrderedDict()
+        self._queue: 'queue.Queue[ReloadJob]' = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._watcher = None
+        if state_dir:
+            os.makedirs(state_dir, exist_ok=True)
+        # Reloads stamped before this process loaded its index are already in it
+        stamp = self._read_state(GENERATION)
+        self._seen_generation = stamp.get('job_id') if stamp else None
+
+    def submit(self, data_path: str = None, follows: str = None) -> ReloadJob:
+        with self._lock:
+            for job in self._jobs.values():
+                if job.status == 'queued' and job.data_path == data_path:
+                    return job
+            job = ReloadJob(data_path, follows)
+            self._jobs[job.id] = job
+            self._trim()
+            # Started on first use, so jobs created after fork() get a thread in the worker
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='kb-reload', daemon=True)
+                self._worker.start()
+        self._persist(job)
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[ReloadJob]:
+        """A job of this worker or, with a state_dir, of any worker; None if unknown."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None and JOB_ID_RE.fullmatch(job_id):
+            state = self._read_state(f"{job_id}.json")
+            job = ReloadJob.from_dict(state) if state else None
+        return job
+
+    def unknown_job_message(self, job_id: str) -> str:
+        if self.state_dir:
+            return f"Unknown reload job {job_id}"
+        # Without shared state another worker may well have it
+        return (f"Unknown reload job {job_id} in worker {os.getpid()}: jobs are only tracked by the worker "
+                f"that ran them unless RELOAD_STATE_DIR is set")
+
+    def watch(self, interval: float = 5.0):
+        """Start polling the shared generation stamp (once per worker, after fork)."""
+        if not self.state_dir or self._watcher is not None:
+            return
+        self._watcher = threading.Thread(target=self._watch, args=(interval,), name='kb-reload-watch',
+                                         daemon=True)
+        self._watcher.start()
+
+    def _watch(self, interval: float):
+        while True:
+            time.sleep(interval)
+            stamp = self._read_state(GENERATION)
+            if stamp and stamp.get('job_id') != self._seen_generation:
+                self._seen_generation = stamp['job_id']
+                print(f"🔄 Knowledge base reloaded by {stamp.get('worker')}; reloading this worker")
+                self.submit(stamp.get('data_path'), follows=stamp['job_id'])
+
+    def jobs(self) -> List[ReloadJob]:
+        """Known jobs, most recent first."""
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def _trim(self):
+        # Forget the oldest finished jobs beyond the history limit
+        finished = [job_id for job_id, job in self._jobs.items() if job.done.is_set()]
+        for job_id in finished[:max(0, len(self._jobs) - self.history)]:
+            del self._jobs[job_id]
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            with self._lock:  # No more joining once it has started reading the file
+                job.status, job.started_at = 'running', time.time()
+            self._persist(job)
+            try:
+                job.result = self.reload_fn(job.data_path)
+                job.status = 'succeeded'
+            except Exception as e:
+                job.error = str(e)
+                job.status = 'failed'
+                print(f"❌ Knowledge base reload {job.id} failed, keeping the current index: {e}")
+            job.finished_at = time.time()
+            self._persist(job)
+            if job.status == 'succeeded' and job.follows is None and self.state_dir:
+                # Mark it seen before stamping, so this worker's watcher doesn't repeat it
+                self._seen_generation = job.id
+                self._write_state(GENERATION, {"job_id": job.id, "data_path": job.data_path,
+                                               "worker": job.worker, "finished_at": job.finished_at})
+            job.done.set()
+
+    def _persist(self, job: ReloadJob):
+        # Reloads repeated from another worker's stamp stay local
+        if not self.state_dir or job.follows is not None:
+            return
+        self._write_state(f"{job.id}.json", job.as_dict())
+        # Keep the newest `history` job files across all workers
+        jobs = []
+        for path in glob.glob(os.path.join(self.state_dir, '?' * 32 + '.json')):
+            try:
+                jobs.append((os.path.getmtime(path), path))
+            except OSError:
+                pass  # Pruned by another worker meanwhile
+        for _, path in sorted(jobs)[:max(0, len(jobs) - self.history)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _write_state(self, name: str, state: Dict):
+        path = os.path.join(self.state_dir, name)
+        tmp = temp_path(path)
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(state, f, default=str)
+            os.replace(tmp, path)  # Small and read whole, never mapped: replacing is fine
+        except OSError as e:
+            print(f"Could not record reload state in {self.state_dir}: {e}")
+
+    def _read_state(self, name: str) -> Optional[Dict]:
+        if not self.state_dir:
+            return None
+        try:
+            with open(os.path.join(self.state_dir, name), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
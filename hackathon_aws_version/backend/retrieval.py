@@ -0,0 +1,60 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Rows scored per block when the matrix has to be upcast (float16/int8), so a
+# query never materializes a full-size float32 copy of the document matrix
+BLOCK_ROWS = 65536
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize each row once at load time (zero rows are left as zeros)."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1.0)
+
+
+def normalize_vector(vec) -> np.ndarray:
+    vec = np.asarray(vec, dtype=np.float32).ravel()
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm > 0 else vec
+
+
+def dot_scores(matrix: np.ndarray, query: np.ndarray, scale: Optional[np.ndarray] = None,
+               block_rows: int = BLOCK_ROWS) -> np.ndarray:
+    """
+    Cosine similarity of a normalized query against pre-normalized rows:
+    one matrix-vector product. `scale` holds per-row inverse norms for
+    quantized (int8) matrices.
+    """
+    query = np.asarray(query, dtype=np.float32)
+    if matrix.dtype == np.float32:
+        scores = matrix @ query
+    else:
+        scores = np.empty(matrix.shape[0], dtype=np.float32)
+        for start in range(0, matrix.shape[0], block_rows):
+            block = np.asarray(matrix[start:start + block_rows], dtype=np.float32)
+            scores[start:start + block_rows] = block @ query
+    if scale is not None:
+        scores *= scale
+    return scores
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first, without a full sort."""
+    n = scores.shape[0]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < n:
+        candidates = np.argpartition(scores, n - k)[n - k:]
+    else:
+        candidates = np.arange(n)
+    return candidates[np.argsort(scores[candidates])[::-1]]
+
+
+def search(matrix: np.ndarray, query, k: int, scale: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Score a query against the matrix and return (indices, scores) of the top k."""
+    scores = dot_scores(matrix, normalize_vector(query), scale)
+    indices = top_k(scores, k)
+    return indices, scores[indices]
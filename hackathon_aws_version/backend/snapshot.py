@@ -0,0 +1,107 @@
+import hashlib
+import json
+import time
+from typing import Dict, Iterable, Iterator, List
+
+from document_store import ChunkStore, DocumentStore
+
+
+def document_key(doc: Dict) -> str:
+    """Stable identity of a post across reloads: its id, else its source file, else its title."""
+    for field in ('id', 'source_file', 'title'):
+        if doc.get(field):
+            return f"{field}:{doc[field]}"
+    return f"hash:{document_hash(doc)}"
+
+
+def document_hash(doc: Dict) -> str:
+    """Content hash of a post; any edited field marks it as changed."""
+    payload = json.dumps(doc, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def keyed_documents(docs: Iterable[Dict], keys: List[str], hashes: List[str]) -> Iterator[Dict]:
+    """
+    Pass docs through, appending each one's document_key (suffixed by
+    occurrence so duplicate titles stay distinct) and document_hash.
+    """
+    seen: Dict[str, int] = {}
+    for doc in docs:
+        key = document_key(doc)
+        seen[key] = seen.get(key, 0) + 1
+        keys.append(key if seen[key] == 1 else f"{key}#{seen[key]}")
+        hashes.append(document_hash(doc))
+        yield doc
+
+
+class IndexSnapshot:
+    """
+    One version of everything retrieval reads: the posts, their chunks, the
+    embedding matrix and the dense/BM25 indexes. A snapshot is built in full
+    before it is published and never modified afterwards, so a query that
+    reads `engine.snapshot` once sees a consistent index even while a reload
+    is building the next one.
+
+    Posts and chunks are kept in a DocumentStore and ChunkStore: compact
+    metadata in memory, texts in memory-mapped blobs under `text_prefix`
+    (in memory when it is None). Documents are streamed in and not retained.
+    """
+
+    __slots__ = ('version', 'data_path', 'text_prefix', 'knowledge_base', 'doc_keys', 'doc_hashes', 'chunks',
+                 'document_embeddings', 'embedding_store', 'vector_index', 'vectorizer', 'bm25',
+                 'bundle', 'created_at')
+
+    def __init__(self, version: int = 0, data_path: str = None, documents: Iterable[Dict] = (),
+                 text_prefix: str = None):
+        self.version = version
+        self.data_path = data_path
+        self.text_prefix = text_prefix
+        self.doc_keys: List[str] = []
+        self.doc_hashes: List[str] = []
+        self.knowledge_base = DocumentStore.build(
+            keyed_documents(documents, self.doc_keys, self.doc_hashes),
+            f"{text_prefix}.docs" if text_prefix else None)
+        self.chunks = ChunkStore.build((), self.knowledge_base)
+        self.document_embeddings = None
+        self.embedding_store = None
+        self.vector_index = None
+        self.vectorizer = None
+        self.bm25 = None
+        self.bundle = None  # Manifest, when loaded from a prebuilt bundle
+        self.created_at = time.time()
+
+    def chunk_rows(self) -> Dict[int, List[int]]:
+        """Chunk row numbers of each post, keyed by the post's position."""
+        rows: Dict[int, List[int]] = {}
+        for row, parent_id in enumerate(self.chunks.parent_ids.tolist()):
+            rows.setdefault(parent_id, []).append(row)
+        return rows
+
+
+class DocumentDiff:
+    """How a new document list differs from a snapshot's, by stable key and content hash."""
+
+    def __init__(self, previous: IndexSnapshot, snapshot: IndexSnapshot):
+        old = {key: (i, digest) for i, (key, digest) in enumerate(zip(previous.doc_keys, previous.doc_hashes))}
+        self.added: List[str] = []
+        self.changed: List[str] = []
+        self.unchanged: List[str] = []
+        self.reused: Dict[int, int] = {}  # New post position -> its position in the previous snapshot
+        for i, (key, digest) in enumerate(zip(snapshot.doc_keys, snapshot.doc_hashes)):
+            if key not in old:
+                self.added.append(key)
+            elif old[key][1] != digest:
+                self.changed.append(key)
+            else:
+                self.unchanged.append(key)
+                self.reused[i] = old[key][0]
+        current = set(snapshot.doc_keys)
+        self.removed = [key for key in previous.doc_keys if key not in current]
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            "added": len(self.added),
+            "changed": len(self.changed),
+            "removed": len(self.removed),
+            "unchanged": len(self.unchanged)
+        }
@@ -0,0 +1,330 @@
+import abc
+import json
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from atomic_files import publish, temp_path
+from retrieval import BLOCK_ROWS, dot_scores, normalize_rows, normalize_vector, top_k
+
+try:
+    import hnswlib  # Optional: pip install hnswlib
+except ImportError:
+    hnswlib = None
+
+
+class VectorIndex(abc.ABC):
+    """
+    Interface for dense vector indexes over the L2-normalized document matrix.
+    Scores are cosine similarities; indices are row numbers in the matrix.
+    """
+
+    kind = 'base'
+
+    def __init__(self, **params):
+        self.params = params
+        self.matrix = None
+        self.scale = None
+
+    @abc.abstractmethod
+    def build(self, matrix: np.ndarray, scale: Optional[np.ndarray] = None) -> 'VectorIndex':
+        """Index `matrix` and return self; `scale` holds per-row inverse norms for int8 matrices."""
+
+    @abc.abstractmethod
+    def search(self, query, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(row indices, scores) of the best `k` rows for `query`, best first."""
+
+    @abc.abstractmethod
+    def save(self, path: str):
+        """Persist index structures (not the document matrix) under `path`."""
+
+    @classmethod
+    @abc.abstractmethod
+    def load(cls, path: str, matrix: np.ndarray, scale: Optional[np.ndarray] = None) -> 'VectorIndex':
+        """Rebuild an index saved by save() over the same `matrix`."""
+
+    def filename(self, prefix: str) -> str:
+        """Index file name for a store prefix; parameters are part of the name."""
+        tag = '-'.join(f"{k}{v}" for k, v in sorted(self.build_params().items()))
+        return f"{prefix}.{self.kind}{'-' + tag if tag else ''}.npz"
+
+    def build_params(self) -> Dict:
+        """Parameters that change the built structure (search-time knobs excluded)."""
+        return {}
+
+    def info(self) -> Dict:
+        return {"kind": self.kind, "params": self.params}
+
+    def _write_npz(self, path: str, **arrays):
+        tmp = temp_path(path, '.npz')
+        np.savez(tmp, params=np.array(json.dumps(self.params)), **arrays)
+        publish(tmp, path)
+
+
+class ExactIndex(VectorIndex):
+    """Brute-force scan: one matrix-vector product per query. Always 100% recall."""
+
+    kind = 'exact'
+
+    def build(self, matrix, scale=None):
+        self.matrix, self.scale = matrix, scale
+        return self
+
+    def search(self, query, k):
+        scores = dot_scores(self.matrix, normalize_vector(query), self.scale)
+        indices = top_k(scores, k)
+        return indices, scores[indices]
+
+    def save(self, path):
+        pass  # Nothing beyond the document matrix itself
+
+    @classmethod
+    def load(cls, path, matrix, scale=None):
+        return cls().build(matrix, scale)
+
+
+class SparseIndex(VectorIndex):
+    """
+    Exact search over a sparse CSR matrix (TF-IDF) without ever densifying it.
+    Rows and queries are L2-normalized, so one sparse product gives cosine
+    scores, and only documents sharing a term with the query are ranked.
+    """
+
+    kind = 'sparse'
+
+    def build(self, matrix, scale=None):
+        self.matrix = matrix.tocsr()
+        return self
+
+    def search(self, query, k):
+        scores = (self.matrix @ query.T).tocoo()
+        if scores.nnz == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        best = top_k(scores.data, k)
+        return scores.row[best].astype(np.int64), scores.data[best]
+
+    def save(self, path):
+        pass  # Rebuilt from the fitted vectorizer
+
+    @classmethod
+    def load(cls, path, matrix, scale=None):
+        return cls().build(matrix)
+
+    def info(self):
+        return {"kind": self.kind, "params": {"nnz": int(self.matrix.nnz), "shape": list(self.matrix.shape)}}
+
+
+class IVFIndex(VectorIndex):
+    """
+    Inverted-file index in pure NumPy.
+    Spherical k-means splits the documents into `nlist` cells; a query scores
+    the centroids, probes the `nprobe` best cells and re-ranks only their
+    members exactly. Raise `nprobe` for recall, lower it for latency.
+    """
+
+    kind = 'ivf'
+
+    def __init__(self, nlist: int = 0, nprobe: int = 8, iterations: int = 10,
+                 train_size: int = 100_000, seed: int = 0):
+        super().__init__(nlist=nlist, nprobe=nprobe, iterations=iterations,
+                         train_size=train_size, seed=seed)
+        self.nprobe = nprobe
+        self.centroids = None
+        self.list_offsets = None
+        self.list_ids = None
+
+    def build_params(self):
+        return {"nlist": self.params['nlist'] or 'auto'}
+
+    def build(self, matrix, scale=None):
+        self.matrix, self.scale = matrix, scale
+        n = matrix.shape[0]
+        nlist = min(self.params['nlist'] or max(1, int(4 * np.sqrt(n))), n)
+        rng = np.random.default_rng(self.params['seed'])
+
+        # Train centroids on a sample; assignments for the full corpus come after
+        sample_ids = np.sort(rng.choice(n, size=min(n, max(nlist, self.params['train_size'])), replace=False))
+        sample = normalize_rows(matrix[sample_ids])
+        centroids = sample[rng.choice(sample.shape[0], size=nlist, replace=False)].copy()
+        for _ in range(self.params['iterations']):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            empty = np.bincount(assign, minlength=nlist) == 0
+            sums[empty] = centroids[empty]  # Keep empty cells where they were
+            centroids = normalize_rows(sums)
+
+        assign = np.empty(n, dtype=np.int32)
+        for start in range(0, n, BLOCK_ROWS):
+            block = normalize_rows(matrix[start:start + BLOCK_ROWS])
+            assign[start:start + BLOCK_ROWS] = np.argmax(block @ centroids.T, axis=1)
+
+        self.params['built_nlist'] = nlist
+        self.centroids = centroids
+        self.list_ids = np.argsort(assign, kind='stable').astype(np.int64)
+        self.list_offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=nlist))]).astype(np.int64)
+        return self
+
+    def search(self, query, k):
+        query = normalize_vector(query)
+        nprobe = min(self.nprobe, self.centroids.shape[0])
+        cells = top_k(self.centroids @ query, nprobe)
+        candidates = np.concatenate([
+            self.list_ids[self.list_offsets[c]:self.list_offsets[c + 1]] for c in cells
+        ])
+        if candidates.size == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        candidates.sort()  # Sequential access into the memory-mapped matrix
+        scale = self.scale[candidates] if self.scale is not None else None
+        scores = dot_scores(self.matrix[candidates], query, scale)
+        best = top_k(scores, k)
+        return candidates[best], scores[best]
+
+    def save(self, path):
+        self._write_npz(path, centroids=self.centroids, list_offsets=self.list_offsets,
+                        list_ids=self.list_ids)
+
+    @classmethod
+    def load(cls, path, matrix, scale=None):
+        data = np.load(path)
+        params = json.loads(str(data['params']))
+        built_nlist = params.pop('built_nlist', None)
+        index = cls(**params)
+        index.params['built_nlist'] = built_nlist
+        index.matrix, index.scale = matrix, scale
+        index.centroids = data['centroids']
+        index.list_offsets = data['list_offsets']
+        index.list_ids = data['list_ids']
+        return index
+
+
+class HNSWIndex(VectorIndex):
+    """
+    Hierarchical navigable small-world graph via the optional `hnswlib` package.
+    `M` and `ef_construction` trade build time/memory for graph quality;
+    `ef_search` trades query latency for recall.
+    """
+
+    kind = 'hnsw'
+
+    def __init__(self, M: int = 16, ef_construction: int = 200, ef_search: int = 64):
+        if hnswlib is None:
+            raise ImportError("hnswlib is not installed (pip install hnswlib)")
+        super().__init__(M=M, ef_construction=ef_construction, ef_search=ef_search)
+        self.graph = None
+
+    def build_params(self):
+        return {"M": self.params['M'], "ef": self.params['ef_construction']}
+
+    def build(self, matrix, scale=None):
+        self.matrix, self.scale = matrix, scale
+        n, dim = matrix.shape
+        self.graph = hnswlib.Index(space='ip', dim=dim)
+        self.graph.init_index(max_elements=max(1, n), M=self.params['M'],
+                              ef_construction=self.params['ef_construction'])
+        for start in range(0, n, BLOCK_ROWS):
+            block = np.asarray(matrix[start:start + BLOCK_ROWS], dtype=np.float32)
+            if scale is not None:
+                block = block * scale[start:start + BLOCK_ROWS, None]
+            self.graph.add_items(block, np.arange(start, start + block.shape[0]))
+        self.graph.set_ef(self.params['ef_search'])
+        return self
+
+    def search(self, query, k):
+        k = min(k, self.graph.get_current_count())
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        self.graph.set_ef(max(self.params['ef_search'], k))
+        labels, distances = self.graph.knn_query(normalize_vector(query), k=k)
+        return labels[0].astype(np.int64), (1.0 - distances[0]).astype(np.float32)
+
+    def save(self, path):
+        tmp = temp_path(path)
+        self.graph.save_index(tmp)
+        publish(tmp, path)
+
+    @classmethod
+    def load(cls, path, matrix, scale=None, **params):
+        index = cls(**params)
+        index.matrix, index.scale = matrix, scale
+        index.graph = hnswlib.Index(space='ip', dim=matrix.shape[1])
+        index.graph.load_index(path, max_elements=matrix.shape[0])
+        index.graph.set_ef(index.params['ef_search'])
+        return index
+
+    def filename(self, prefix):
+        return super().filename(prefix)[:-len('.npz')] + '.bin'
+
+
+INDEX_TYPES = {cls.kind: cls for cls in (ExactIndex, IVFIndex, HNSWIndex)}
+
+
+def create_index(kind: str = None) -> VectorIndex:
+    """Create the index configured by VECTOR_INDEX and its tuning variables."""
+    kind = (kind or os.getenv('VECTOR_INDEX', 'exact')).lower()
+    if kind == 'ivf':
+        return IVFIndex(nlist=int(os.getenv('IVF_NLIST', '0')),
+                        nprobe=int(os.getenv('IVF_NPROBE', '8')))
+    if kind == 'hnsw':
+        try:
+            return HNSWIndex(M=int(os.getenv('HNSW_M', '16')),
+                             ef_construction=int(os.getenv('HNSW_EF_CONSTRUCTION', '200')),
+                             ef_search=int(os.getenv('HNSW_EF_SEARCH', '64')))
+        except ImportError as e:
+            print(f"⚠️  {e}; falling back to exact search")
+            return ExactIndex()
+    if kind != 'exact':
+        print(f"⚠️  Unknown VECTOR_INDEX '{kind}'; using exact search")
+    return ExactIndex()
+
+
+def load_or_build_index(index: VectorIndex, prefix: Optional[str], matrix: np.ndarray,
+                        scale: Optional[np.ndarray] = None) -> VectorIndex:
+    """Load a saved index for this store prefix if present, otherwise build (and save) it."""
+    if isinstance(index, ExactIndex) or prefix is None:
+        return index.build(matrix, scale)
+
+    path = index.filename(prefix)
+    if os.path.exists(path):
+        try:
+            if isinstance(index, HNSWIndex):
+                loaded = HNSWIndex.load(path, matrix, scale, **index.params)
+            else:
+                loaded = type(index).load(path, matrix, scale)
+                loaded.nprobe = index.nprobe  # Search-time knob comes from current config
+                loaded.params['nprobe'] = index.nprobe
+            print(f"🗺️  Loaded {index.kind} index: {path}")
+            return loaded
+        except Exception as e:
+            print(f"Could not load {index.kind} index, rebuilding: {e}")
+
+    start = time.perf_counter()
+    index.build(matrix, scale)
+    print(f"🏗️  Built {index.kind} index over {matrix.shape[0]} vectors in {time.perf_counter() - start:.2f}s")
+    try:
+        index.save(path)
+    except OSError as e:
+        print(f"Could not save {index.kind} index: {e}")
+    return index
+
+
+def evaluate_index(index: VectorIndex, reference: VectorIndex, queries: np.ndarray, k: int = 10) -> Dict:
+    """Recall@k against a reference (normally exact) index, plus latency stats."""
+    latencies: List[float] = []
+    recalls: List[float] = []
+    for query in queries:
+        expected = set(reference.search(query, k)[0].tolist())
+        start = time.perf_counter()
+        found = index.search(query, k)[0]
+        latencies.append((time.perf_counter() - start) * 1000)
+        if expected:
+            recalls.append(len(expected.intersection(found.tolist())) / len(expected))
+    return {
+        "kind": index.kind,
+        "params": dict(index.params),
+        f"recall@{k}": float(np.mean(recalls)) if recalls else 0.0,
+        "latency_ms_mean": float(np.mean(latencies)),
+        "latency_ms_p95": float(np.percentile(latencies, 95)),
+    }
@@ -0,0 +1,19 @@
+"""
+Production entry point: gunicorn -c gunicorn.conf.py wsgi:app
+The knowledge base, embeddings and indexes are loaded here, once, in the
+gunicorn master (preload_app), so forked workers share them copy-on-write
+instead of each loading its own copy.
+"""
+
+import gc
+
+from app import app, rag_engine
+
+print("Loading knowledge base...")
+count = rag_engine.load_knowledge_base()
+print(f"Loaded {count} documents")
+
+# Move everything loaded so far out of the collector's generations, so GC
+# passes in the workers don't touch (and un-share) the parent's pages
+gc.collect()
+gc.freeze()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Recall@k and latency report for the vector index backends.
+Builds exact, IVF (pure NumPy) and, if hnswlib is installed, HNSW indexes
+over a synthetic clustered corpus and sweeps their search-time knobs.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from retrieval import normalize_rows
+from vector_index import ExactIndex, HNSWIndex, IVFIndex, evaluate_index, hnswlib
+
+
+def clustered_corpus(n: int, dim: int, clusters: int, seed: int = 0):
+    """Normalized vectors drawn around random topic centres, like real embeddings."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dim), dtype=np.float32)
+    labels = rng.integers(0, clusters, size=n)
+    docs = centres[labels] + 0.6 * rng.standard_normal((n, dim), dtype=np.float32)
+    queries = centres[rng.integers(0, clusters, size=200)] + 0.6 * rng.standard_normal((200, dim), dtype=np.float32)
+    return normalize_rows(docs), queries
+
+
+def report(result: dict, k: int, build_s: float = None):
+    params = ', '.join(f"{key}={value}" for key, value in result['params'].items())
+    build = f"  build={build_s:.1f}s" if build_s is not None else ''
+    print(f"{result['kind']:>5}  recall@{k}={result[f'recall@{k}']:.3f}  "
+          f"mean={result['latency_ms_mean']:.3f}ms  p95={result['latency_ms_p95']:.3f}ms  [{params}]{build}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark ANN recall and latency')
+    parser.add_argument('--docs', type=int, default=100_000)
+    parser.add_argument('--dim', type=int, default=128)
+    parser.add_argument('--clusters', type=int, default=500)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--nlist', type=int, default=0, help='IVF cells (0 = 4*sqrt(n))')
+    parser.add_argument('--nprobe', default='1,4,16,64', help='IVF probes to sweep')
+    parser.add_argument('--ef-search', default='16,64,256', help='HNSW ef values to sweep')
+    args = parser.parse_args()
+
+    matrix, queries = clustered_corpus(args.docs, args.dim, args.clusters)
+    queries = queries[:args.queries]
+    print(f"🚀 ANN benchmark: {args.docs:,} docs, dim={args.dim}, {len(queries)} queries, k={args.k}")
+    print("=" * 78)
+
+    exact = ExactIndex().build(matrix)
+    report(evaluate_index(exact, exact, queries, args.k), args.k)
+
+    start = time.perf_counter()
+    ivf = IVFIndex(nlist=args.nlist).build(matrix)
+    ivf_build = time.perf_counter() - start
+    with tempfile.TemporaryDirectory() as tmp:
+        # Round-trip through save/load so the benchmark covers the persisted form
+        path = ivf.filename(os.path.join(tmp, 'bench'))
+        ivf.save(path)
+        ivf = IVFIndex.load(path, matrix)
+    for nprobe in [int(p) for p in args.nprobe.split(',')]:
+        ivf.nprobe = ivf.params['nprobe'] = nprobe
+        report(evaluate_index(ivf, exact, queries, args.k), args.k, ivf_build)
+
+    if hnswlib is None:
+        print(" hnsw  skipped (pip install hnswlib)")
+        return
+    start = time.perf_counter()
+    hnsw = HNSWIndex().build(matrix)
+    hnsw_build = time.perf_counter() - start
+    for ef in [int(e) for e in args.ef_search.split(',')]:
+        hnsw.params['ef_search'] = ef
+        report(evaluate_index(hnsw, exact, queries, args.k), args.k, hnsw_build)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Concurrency load test: sync Flask app vs async ASGI app against the mock NIM.
+The Flask app is served by a fixed pool of threads (like gunicorn
+workers x threads), so each chat waiting on the LLM occupies one of them;
+the ASGI app awaits the NIM on one event loop in a single process.
+"""
+
+import argparse
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+QUESTIONS = [
+    "What is the best BMX bike for beginners?",
+    "How do I learn to bunny hop?",
+    "Which pre workout supplements are worth it?",
+    "How should I set up my BMX grips?",
+]
+
+
+def start_mock_process(port: int, llm_latency_ms: float) -> subprocess.Popen:
+    """Run the mock NIM in its own process, like a remote NIM, and wait until it answers."""
+    mock = subprocess.Popen([
+        sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mock_nim.py'),
+        '--port', str(port), '--latency-ms', '5', '--per-item-ms', '0',
+        '--dimension', '256', '--llm-latency-ms', str(llm_latency_ms)
+    ])
+    for _ in range(100):
+        try:
+            requests.get(f'http://127.0.0.1:{port}/v1/models', timeout=1)
+            return mock
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    mock.terminate()
+    raise RuntimeError('mock NIM did not start')
+
+
+def serve_flask(flask_app, port: int, threads: int):
+    """Serve the Flask app with a bounded thread pool and return the server."""
+    from werkzeug.serving import BaseWSGIServer
+
+    class PooledWSGIServer(BaseWSGIServer):
+        def __init__(self):
+            super().__init__('127.0.0.1', port, flask_app)
+            self.pool = ThreadPoolExecutor(max_workers=threads)
+
+        def process_request(self, request, client_address):
+            self.pool.submit(self._handle, request, client_address)
+
+        def _handle(self, request, client_address):
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    server = PooledWSGIServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def serve_asgi(asgi_app, port: int):
+    """Run uvicorn on a background thread and wait until it accepts requests."""
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(asgi_app, host='127.0.0.1', port=port, log_level='warning'))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def load_test(url: str, requests_total: int, concurrency: int) -> dict:
+    """Fire distinct chats with `concurrency` clients; return throughput and latency percentiles."""
+    def one(i: int) -> float:
+        start = time.perf_counter()
+        response = requests.post(url, json={"message": f"{QUESTIONS[i % len(QUESTIONS)]} (#{i})"}, timeout=300)
+        response.raise_for_status()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = sorted(pool.map(one, range(requests_total)))
+    elapsed = time.perf_counter() - start
+    return {
+        "rps": requests_total / elapsed,
+        "p50": latencies[len(latencies) // 2],
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+        "elapsed": elapsed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare sync and async serving under concurrent chats')
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--sync-threads', type=int, default=8,
+                        help='Threads serving the Flask app (e.g. gunicorn workers x threads)')
+    parser.add_argument('--llm-latency-ms', type=float, default=500.0)
+    args = parser.parse_args()
+
+    mock = start_mock_process(8011, args.llm_latency_ms)
+    cache_dir = tempfile.mkdtemp(prefix='bench-async-')
+    os.environ.update({
+        'NVIDIA_API_KEY': 'local-mock',
+        'NVIDIA_NIM_BASE_URL': 'http://127.0.0.1:8011/v1',
+        'EMBEDDING_CACHE_PATH': os.path.join(cache_dir, 'embeddings.sqlite'),
+        'EMBEDDING_STORE_DIR': cache_dir,
+        'RESPONSE_CACHE_ENABLED': 'false'
+    })
+
+    import app as flask_module
+    import asgi_app
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+    print(f"🚀 {args.requests} chats, {args.concurrency} concurrent clients, "
+          f"LLM latency {args.llm_latency_ms:.0f}ms (mock NIM)")
+    print("=" * 70)
+
+    flask_module.rag_engine.load_knowledge_base()
+    flask_server = serve_flask(flask_module.app, 5101, args.sync_threads)
+    result = load_test('http://127.0.0.1:5101/chat', args.requests, args.concurrency)
+    flask_server.shutdown()
+    print(f"Flask ({args.sync_threads} threads): {result['rps']:7.1f} req/s  "
+          f"p50={result['p50']:.2f}s  p95={result['p95']:.2f}s")
+
+    asgi_server = serve_asgi(asgi_app.app, 5102)
+    result = load_test('http://127.0.0.1:5102/chat', args.requests, args.concurrency)
+    asgi_server.should_exit = True
+    print(f"ASGI (1 event loop):  {result['rps']:7.1f} req/s  "
+          f"p50={result['p50']:.2f}s  p95={result['p95']:.2f}s")
+    mock.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark embedding throughput against the local mock NIM.
+Compares one-request-per-document against batched and concurrent requests.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from openai import OpenAI
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from embeddings import NIMEmbeddingClient
+from mock_nim import start_mock_nim
+
+
+def load_texts(count: int) -> list:
+    """Build `count` document texts by cycling through the knowledge base."""
+    kb_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'processed_blogs.json')
+    with open(kb_path, 'r', encoding='utf-8') as f:
+        blogs = json.load(f).get('blogs', [])
+    texts = []
+    for i in range(count):
+        doc = blogs[i % len(blogs)]
+        texts.append(f"{doc.get('title', '')} {doc.get('content', '')} #{i}")
+    return texts
+
+
+def run(server, texts: list, batch_size: int, max_batch_tokens: int, concurrency: int) -> dict:
+    """Embed all texts with the given batching settings and report throughput."""
+    client = OpenAI(base_url=server.base_url, api_key='local-mock', max_retries=0)
+    embedder = NIMEmbeddingClient(client, 'nvidia/nv-embedqa-e5-v5', batch_size=batch_size,
+                                  max_batch_tokens=max_batch_tokens, concurrency=concurrency)
+    requests_before = server.requests
+    start = time.perf_counter()
+    vectors = embedder.embed(texts)
+    elapsed = time.perf_counter() - start
+    return {
+        "batch_size": batch_size,
+        "concurrency": concurrency,
+        "throttled": embedder.throttle.throttled,
+        "docs": len(vectors),
+        "requests": server.requests - requests_before,
+        "seconds": elapsed,
+        "docs_per_sec": len(vectors) / elapsed if elapsed else float('inf')
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark batched embedding throughput')
+    parser.add_argument('--docs', type=int, default=500)
+    parser.add_argument('--batch-sizes', default='1,16,64',
+                        help='Comma-separated batch sizes to compare')
+    parser.add_argument('--concurrency', default='1,8',
+                        help='Comma-separated in-flight request limits to compare')
+    parser.add_argument('--max-batch-tokens', type=int, default=1_000_000)
+    parser.add_argument('--latency-ms', type=float, default=20.0)
+    parser.add_argument('--per-item-ms', type=float, default=0.5)
+    parser.add_argument('--server-max-concurrent', type=int, default=0,
+                        help='Make the mock answer 429 above this many in-flight requests')
+    args = parser.parse_args()
+
+    server = start_mock_nim(latency_ms=args.latency_ms, per_item_ms=args.per_item_ms, dimension=256,
+                            max_concurrent=args.server_max_concurrent)
+    texts = load_texts(args.docs)
+
+    print(f"🚀 Embedding {len(texts)} documents against mock NIM ({server.base_url})")
+    print(f"   latency={args.latency_ms}ms/request + {args.per_item_ms}ms/item")
+    print("=" * 60)
+    baseline = None
+    for concurrency in [int(c) for c in args.concurrency.split(',')]:
+        for batch_size in [int(b) for b in args.batch_sizes.split(',')]:
+            result = run(server, texts, batch_size, args.max_batch_tokens, concurrency)
+            baseline = baseline or result['seconds']
+            print(f"batch={result['batch_size']:>4}  concurrency={concurrency:>3}  "
+                  f"requests={result['requests']:>5}  throttled={result['throttled']:>3}  "
+                  f"time={result['seconds']:.2f}s  {result['docs_per_sec']:.0f} docs/s  "
+                  f"speedup={baseline / result['seconds']:.1f}x")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
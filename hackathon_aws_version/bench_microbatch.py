@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Query-embedding micro-batching against the mock NIM.
+Fires concurrent distinct queries through the engine's query embedding path
+with batching off and with a few batch windows, and reports how many
+embedding requests reached the NIM and the per-query latency.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from mock_nim import start_mock_nim
+
+
+def run(engine, queries, concurrency: int) -> dict:
+    def one(query: str) -> float:
+        start = time.perf_counter()
+        engine._embed_query(query)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = sorted(pool.map(one, queries))
+    return {
+        "qps": len(queries) / (time.perf_counter() - start),
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark query embedding micro-batching')
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--windows', default='0,2,5,10', help='Batch windows in ms (0 = off)')
+    parser.add_argument('--max-batch', type=int, default=32)
+    parser.add_argument('--latency-ms', type=float, default=20.0, help='Mock fixed cost per request')
+    parser.add_argument('--per-item-ms', type=float, default=0.5, help='Mock cost per embedded text')
+    parser.add_argument('--server-max-concurrent', type=int, default=16,
+                        help='Mock answers 429 beyond this many requests in flight')
+    args = parser.parse_args()
+
+    server = start_mock_nim(latency_ms=args.latency_ms, per_item_ms=args.per_item_ms, dimension=256,
+                            max_concurrent=args.server_max_concurrent)
+    os.environ.update({
+        'NVIDIA_API_KEY': 'local-mock',
+        'NVIDIA_NIM_BASE_URL': server.base_url,
+        'EMBEDDING_CACHE_PATH': os.path.join(tempfile.mkdtemp(prefix='bench-microbatch-'), 'e.sqlite'),
+        'QUERY_EMBEDDING_MAX_BATCH': str(args.max_batch)
+    })
+    from nvidia_rag import NVIDIARAGEngine
+
+    print(f"🚀 {args.queries} distinct queries, {args.concurrency} concurrent callers, "
+          f"mock NIM {args.latency_ms:.0f}ms + {args.per_item_ms}ms/item, "
+          f"max {args.server_max_concurrent} in flight")
+    print("=" * 78)
+    for window in [float(w) for w in args.windows.split(',')]:
+        os.environ['QUERY_EMBEDDING_BATCH_WINDOW_MS'] = str(window)
+        engine = NVIDIARAGEngine()
+        queries = [f"query {window} {i} about bmx bikes" for i in range(args.queries)]
+        requests_before, rejected_before = server.requests, server.rejected
+        result = run(engine, queries, args.concurrency)
+        batching = engine.query_batcher.stats.as_dict() if engine.query_batcher else None
+        label = f"window={window:g}ms" if window else "no batching"
+        print(f"{label:>14}  {result['qps']:7.0f} q/s  p50={result['p50_ms']:6.1f}ms  "
+              f"p95={result['p95_ms']:6.1f}ms  NIM requests={server.requests - requests_before}  "
+              f"429s={server.rejected - rejected_before}"
+              + (f"  mean batch={batching['mean_batch_size']}" if batching else ''))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Shared pytest fixtures: a local mock NIM, an environment that points the RAG
+engine at it with every cache under a temp directory, and a small generated
+corpus. None of them need an API key or network access.
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from mock_nim import start_mock_nim
+
+TOPICS = [
+    ("Bunny Hop Basics", "bunny hop", "Pull the bars up, then level the bike with your feet."),
+    ("Chain Tension Guide", "chain tension", "Slide the rear wheel back until the chain has a little slack."),
+    ("Kids BMX Bikes", "kids bike", "A 16 inch frame suits most riders between five and eight."),
+    ("Grips and Bar Ends", "grips", "Flanged grips stop your hands sliding off on landings."),
+    ("Pre Workout Nutrition", "supplements", "Eat slow carbs two hours before a session, not sugar."),
+    ("Manual Practice", "manual", "Find the balance point by shifting your hips back over the wheel."),
+]
+
+
+def make_posts(count: int = 12):
+    """`count` posts with a few headed sections each, cycling through TOPICS."""
+    posts = []
+    for i in range(count):
+        title, topic, tip = TOPICS[i % len(TOPICS)]
+        sections = [f"## Part {n}\n{tip} Lesson {i}.{n} on {topic} covers it step by step. " * 4
+                    for n in range(3)]
+        posts.append({
+            "title": f"{title} {i}",
+            "content": "\n\n".join(sections),
+            "category": "BMX",
+            "tags": [topic],
+            "source_file": f"/blogs/post-{i}.md"
+        })
+    return posts
+
+
+def write_corpus(path, posts):
+    """Write posts as a JSON Lines corpus and return the path as a string."""
+    with open(path, 'w', encoding='utf-8') as f:
+        for post in posts:
+            f.write(json.dumps(post) + '\n')
+    return str(path)
+
+
+@pytest.fixture
+def mock_nim():
+    server = start_mock_nim(dimension=32)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def nim_env(monkeypatch, tmp_path, mock_nim):
+    """Engine settings for dense retrieval through the mock NIM; returns the server."""
+    store_dir = tmp_path / 'store'
+    store_dir.mkdir()
+    monkeypatch.setenv('NVIDIA_API_KEY', 'local-mock')
+    monkeypatch.setenv('NVIDIA_NIM_BASE_URL', mock_nim.base_url)
+    monkeypatch.setenv('EMBEDDING_CACHE_PATH', str(tmp_path / 'embeddings.sqlite'))
+    monkeypatch.setenv('EMBEDDING_STORE_DIR', str(store_dir))
+    monkeypatch.setenv('DOCUMENT_STORE_DIR', str(tmp_path / 'documents'))
+    monkeypatch.setenv('NVIDIA_EMBEDDING_MAX_RETRIES', '0')
+    for name in ('RETRIEVAL_MODE', 'VECTOR_INDEX', 'EMBEDDING_STORE_DTYPE', 'CHUNKING', 'DOCUMENT_STORE',
+                 'QUERY_EMBEDDING_CACHE_DIR', 'KNOWLEDGE_BASE_BUNDLE', 'KNOWLEDGE_BASE_PATH',
+                 'EMBEDDING_STORE_GC', 'RELOAD_STATE_DIR'):
+        monkeypatch.delenv(name, raising=False)
+    return mock_nim
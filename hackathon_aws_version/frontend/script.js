@@ -4,7 +4,7 @@ const messagesDiv = document.getElementById('messages');
 const userInput = document.getElementById('user-input');
 const sendBtn = document.getElementById('send-btn');
 
-function addMessage(text, isUser, metadata = null) {
+function createMessage(text, isUser) {
     const messageDiv = document.createElement('div');
     messageDiv.className = `message ${isUser ? 'user-message' : 'bot-message'}`;
     
@@ -13,30 +13,91 @@ function addMessage(text, isUser, metadata = null) {
     textDiv.textContent = text;
     messageDiv.appendChild(textDiv);
     
+    messagesDiv.appendChild(messageDiv);
+    messagesDiv.scrollTop = messagesDiv.scrollHeight;
+    return messageDiv;
+}
+
+function addMetadata(messageDiv, metadata) {
+    const metaDiv = document.createElement('div');
+    metaDiv.className = 'message-meta';
+    
+    let metaText = '';
+    if (metadata.model) metaText += `Model: ${metadata.model} | `;
+    if (metadata.context_count) metaText += `Sources: ${metadata.context_count} | `;
+    if (metadata.total_tokens) metaText += `Tokens: ${metadata.total_tokens}`;
+    
+    metaDiv.textContent = metaText;
+    messageDiv.appendChild(metaDiv);
+    
+    // Add sources if available
+    if (metadata.sources && metadata.sources.length > 0) {
+        const sourcesDiv = document.createElement('div');
+        sourcesDiv.className = 'message-sources';
+        sourcesDiv.innerHTML = '<strong>Sources:</strong> ' + metadata.sources.join(', ');
+        messageDiv.appendChild(sourcesDiv);
+    }
+    messagesDiv.scrollTop = messagesDiv.scrollHeight;
+}
+
+function addMessage(text, isUser, metadata = null) {
+    const messageDiv = createMessage(text, isUser);
+    
     // Add metadata for bot messages
     if (!isUser && metadata) {
-        const metaDiv = document.createElement('div');
-        metaDiv.className = 'message-meta';
-        
-        let metaText = '';
-        if (metadata.model) metaText += `Model: ${metadata.model} | `;
-        if (metadata.context_count) metaText += `Sources: ${metadata.context_count} | `;
-        if (metadata.total_tokens) metaText += `Tokens: ${metadata.total_tokens}`;
-        
-        metaDiv.textContent = metaText;
-        messageDiv.appendChild(metaDiv);
+        addMetadata(messageDiv, metadata);
+    }
+}
+
+// Parse one server-sent event frame ("event: ...\ndata: ...")
+function parseEvent(frame) {
+    const data = frame.split('\n')
+        .filter(line => line.startsWith('data:'))
+        .map(line => line.slice(5).trim())
+        .join('\n');
+    return data ? JSON.parse(data) : null;
+}
+
+// Render the reply token by token from /chat/stream; returns false if streaming is unavailable
+async function streamMessage(message) {
+    const response = await fetch(`${API_URL}/chat/stream`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ message })
+    });
+    
+    if (!response.ok || !response.body) return false;
+    
+    const messageDiv = createMessage('', false);
+    const textDiv = messageDiv.querySelector('.message-text');
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
         
-        // Add sources if available
-        if (metadata.sources && metadata.sources.length > 0) {
-            const sourcesDiv = document.createElement('div');
-            sourcesDiv.className = 'message-sources';
-            sourcesDiv.innerHTML = '<strong>Sources:</strong> ' + metadata.sources.join(', ');
-            messageDiv.appendChild(sourcesDiv);
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const event = parseEvent(buffer.slice(0, boundary));
+            buffer = buffer.slice(boundary + 2);
+            if (!event) continue;
+            
+            if (event.type === 'token') {
+                textDiv.textContent += event.content;
+                messagesDiv.scrollTop = messagesDiv.scrollHeight;
+            } else if (event.type === 'done') {
+                addMetadata(messageDiv, event);
+            } else if (event.type === 'error') {
+                textDiv.textContent = `Error: ${event.error}`;
+            }
         }
     }
-    
-    messagesDiv.appendChild(messageDiv);
-    messagesDiv.scrollTop = messagesDiv.scrollHeight;
+    return true;
 }
 
 async function sendMessage() {
@@ -49,6 +110,8 @@ async function sendMessage() {
     sendBtn.textContent = 'Thinking...';
     
     try {
+        if (await streamMessage(message)) return;
+        
         const response = await fetch(`${API_URL}/chat`, {
             method: 'POST',
             headers: {
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Local stub of the NVIDIA NIM OpenAI-compatible API.
+Serves deterministic embeddings and canned chat completions so throughput
+and latency can be benchmarked without burning API credits or depending on
+the real NIM.
+
+Usage:
+    python mock_nim.py --port 8001 --latency-ms 50
+    NVIDIA_NIM_BASE_URL=http://localhost:8001/v1 NVIDIA_API_KEY=local-mock python backend/app.py
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def mock_embedding(text: str, dimension: int) -> list:
+    """Deterministic pseudo-random unit vector derived from the text."""
+    seed = int.from_bytes(hashlib.sha256(text.encode('utf-8')).digest()[:8], 'big')
+    rng = random.Random(seed)
+    vec = [rng.gauss(0.0, 1.0) for _ in range(dimension)]
+    norm = sum(v * v for v in vec) ** 0.5 or 1.0
+    return [v / norm for v in vec]
+
+
+class MockNIMHandler(BaseHTTPRequestHandler):
+    """Request handler; configuration lives on the server instance."""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, payload: dict):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get('Content-Length', 0))
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def do_GET(self):
+        if self.path.rstrip('/').endswith('/models'):
+            self._send_json(200, {"object": "list", "data": [
+                {"id": self.server.embedding_model, "object": "model"}
+            ]})
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        payload = self._read_json()
+        if self.path.rstrip('/').endswith('/embeddings'):
+            self._handle_embeddings(payload)
+        elif self.path.rstrip('/').endswith('/chat/completions'):
+            self._handle_chat(payload)
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def _handle_embeddings(self, payload: dict):
+        server = self.server
+        texts = payload.get('input', [])
+        if isinstance(texts, str):
+            texts = [texts]
+
+        if server.outage_status:
+            server.record_request(len(texts))
+            self._send_json(server.outage_status, {"error": {"message": "mock: embeddings unavailable", "type": "server_error"}})
+            return
+
+        if not server.enter():
+            self._send_json(429, {"error": {"message": "mock: too many concurrent requests", "type": "rate_limit"}})
+            return
+        try:
+            server.record_request(len(texts))
+            time.sleep((server.latency_ms + server.per_item_ms * len(texts)) / 1000.0)
+        finally:
+            server.leave()
+
+        if server.fail_marker and any(server.fail_marker in t for t in texts):
+            self._send_json(400, {"error": {"message": "mock: input rejected", "type": "invalid_request_error"}})
+            return
+
+        data = [
+            {"object": "embedding", "index": i, "embedding": mock_embedding(text, server.dimension)}
+            for i, text in enumerate(texts)
+        ]
+        tokens = sum(max(1, len(t) // 4) for t in texts)
+        self._send_json(200, {
+            "object": "list",
+            "data": data,
+            "model": payload.get('model', server.embedding_model),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens}
+        })
+
+
+    def _handle_chat(self, payload: dict):
+        server = self.server
+        server.record_chat()
+        time.sleep(server.llm_latency_ms / 1000.0)
+
+        messages = payload.get('messages', [])
+        prompt = ' '.join(m.get('content', '') for m in messages)
+        reply = mock_reply(messages)
+        prompt_tokens = max(1, len(prompt) // 4)
+        completion_tokens = len(reply.split())
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+        if payload.get('stream'):
+            include_usage = (payload.get('stream_options') or {}).get('include_usage', False)
+            self._stream_chat(payload, reply, usage if include_usage else None)
+            return
+        self._send_json(200, {
+            "id": f"chatcmpl-mock-{server.chats}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get('model', 'mock-llm'),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": reply},
+                "finish_reason": "stop"
+            }],
+            "usage": usage
+        })
+
+    def _stream_chat(self, payload: dict, reply: str, usage: dict = None):
+        """Send the reply word by word as chat.completion.chunk SSE events."""
+        server = self.server
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+        base = {
+            "id": f"chatcmpl-mock-{server.chats}",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": payload.get('model', 'mock-llm')
+        }
+
+        def send(chunk: dict):
+            self.wfile.write(f"data: {json.dumps(dict(base, **chunk))}\n\n".encode('utf-8'))
+            self.wfile.flush()
+
+        words = reply.split(' ')
+        for i, word in enumerate(words):
+            if i:
+                time.sleep(server.token_latency_ms / 1000.0)
+            send({"choices": [{"index": 0, "delta": {"content": word if i == 0 else ' ' + word},
+                               "finish_reason": None}]})
+        send({"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+        if usage is not None:
+            send({"choices": [], "usage": usage})
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def mock_reply(messages: list) -> str:
+    """Canned answer that echoes the user's question."""
+    question = messages[-1].get('content', '') if messages else ''
+    marker = 'User Question:'
+    if marker in question:
+        question = question.split(marker, 1)[1].split('\n', 1)[0].strip()
+    return f"Mock NIM answer to: {question[:200]}. Check the sources above for details."
+
+
+class MockNIMServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the mock configuration and request counters."""
+
+    daemon_threads = True
+    request_queue_size = 1024  # Load tests open hundreds of connections at once
+
+    def __init__(self, address, latency_ms: float = 0.0, per_item_ms: float = 0.0,
+                 dimension: int = 1024, fail_marker: str = None, max_concurrent: int = 0,
+                 llm_latency_ms: float = 0.0, token_latency_ms: float = 0.0, verbose: bool = False,
+                 outage_status: int = 0):
+        super().__init__(address, MockNIMHandler)
+        self.latency_ms = latency_ms
+        self.per_item_ms = per_item_ms
+        self.dimension = dimension
+        self.fail_marker = fail_marker
+        self.max_concurrent = max_concurrent
+        self.outage_status = outage_status  # Answer every embeddings request with this status (0 = off)
+        self.llm_latency_ms = llm_latency_ms
+        self.token_latency_ms = token_latency_ms
+        self.verbose = verbose
+        self.embedding_model = 'nvidia/nv-embedqa-e5-v5'
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.items = 0
+        self.in_flight = 0
+        self.rejected = 0
+        self.chats = 0
+
+    def enter(self) -> bool:
+        """Admit a request unless the concurrency cap is reached (then it gets a 429)."""
+        with self._lock:
+            if self.max_concurrent and self.in_flight >= self.max_concurrent:
+                self.rejected += 1
+                return False
+            self.in_flight += 1
+            return True
+
+    def leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def record_chat(self):
+        with self._lock:
+            self.chats += 1
+
+    def record_request(self, items: int):
+        with self._lock:
+            self.requests += 1
+            self.items += items
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+def start_mock_nim(port: int = 0, **kwargs) -> MockNIMServer:
+    """Start the mock NIM on a background thread and return the server."""
+    server = MockNIMServer(('127.0.0.1', port), **kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stub of the NVIDIA NIM API')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--latency-ms', type=float, default=50.0,
+                        help='Fixed latency added to every request')
+    parser.add_argument('--per-item-ms', type=float, default=1.0,
+                        help='Additional latency per embedded text')
+    parser.add_argument('--dimension', type=int, default=1024)
+    parser.add_argument('--fail-marker', default=None,
+                        help='Reject any embeddings request containing this substring')
+    parser.add_argument('--max-concurrent', type=int, default=0,
+                        help='Answer 429 when more requests than this are in flight (0 = unlimited)')
+    parser.add_argument('--outage-status', type=int, default=0,
+                        help='Answer every embeddings request with this HTTP status, e.g. 503 (0 = off)')
+    parser.add_argument('--llm-latency-ms', type=float, default=500.0,
+                        help='Latency of each chat completion (time to first token when streaming)')
+    parser.add_argument('--token-latency-ms', type=float, default=20.0,
+                        help='Delay between streamed tokens')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    server = MockNIMServer(('0.0.0.0', args.port), latency_ms=args.latency_ms,
+                           per_item_ms=args.per_item_ms, dimension=args.dimension,
+                           fail_marker=args.fail_marker, max_concurrent=args.max_concurrent,
+                           llm_latency_ms=args.llm_latency_ms,
+                           token_latency_ms=args.token_latency_ms, verbose=args.verbose,
+                           outage_status=args.outage_status)
+    print(f"🧪 Mock NIM listening on http://0.0.0.0:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⏹️  Mock NIM stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""achat(): same response as chat() and concurrent identical questions share one NIM call (mock NIM)."""
+
+import asyncio
+
+from conftest import make_posts, write_corpus
+from nvidia_rag import NVIDIARAGEngine
+
+
+def make_engine(monkeypatch, tmp_path, **env):
+    monkeypatch.setenv('RESPONSE_CACHE_ENABLED', 'false')  # Every chat must reach the LLM
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    engine = NVIDIARAGEngine()
+    engine.load_knowledge_base(write_corpus(tmp_path / 'kb.jsonl', make_posts()))
+    return engine
+
+
+def test_achat_matches_chat(nim_env, monkeypatch, tmp_path):
+    engine = make_engine(monkeypatch, tmp_path)
+    question = "How do I set chain tension?"
+
+    expected = engine.chat(question, top_k=3)
+    result = asyncio.run(engine.achat(question, top_k=3))
+
+    assert result == expected
+    assert result["error"] is None and not result["cached"]
+    assert result["reply"].startswith("Mock NIM answer to: How do I set chain tension?")
+    assert result["sources"] and result["context_count"] > 0
+    assert nim_env.chats == 2
+
+
+def test_concurrent_achats_share_one_llm_call(nim_env, monkeypatch, tmp_path):
+    engine = make_engine(monkeypatch, tmp_path)
+    nim_env.llm_latency_ms = 300  # Keep the leader in flight while the others arrive
+
+    async def ask(questions):
+        return await asyncio.gather(*(engine.achat(q) for q in questions))
+
+    results = asyncio.run(ask(["Bunny hop tips?", "  bunny HOP tips? ", "Bunny hop tips?", "Kids bike size?"]))
+
+    assert nim_env.chats == 2
+    assert results[0] == results[1] == results[2]
+    assert results[0] is not results[1]  # Followers get their own copy
+    assert "Kids bike size?" in results[3]["reply"]
+
+
+def test_achat_without_coalescing_calls_llm_each_time(nim_env, monkeypatch, tmp_path):
+    engine = make_engine(monkeypatch, tmp_path, REQUEST_COALESCING='false')
+
+    async def ask():
+        return await asyncio.gather(*(engine.achat("Bunny hop tips?") for _ in range(3)))
+
+    assert len(asyncio.run(ask())) == 3
+    assert nim_env.chats == 3
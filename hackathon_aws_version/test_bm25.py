@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""BM25Index: whole-word matching, title weighting and save/load."""
+
+import conftest  # noqa: F401 (puts backend on sys.path)
+from bm25 import BM25Index, tokenize
+
+DOCS = [
+    {"title": "Pride Ride Recap", "content": "The pride parade had a bike section."},
+    {"title": "Trail Notes", "content": "A long ride through the woods, riding all day."},
+    {"title": "Pride Month", "content": "Shop hours and a pride sticker giveaway."},
+    {"title": "Ride Setup", "content": "Set your saddle height before every ride."},
+]
+
+
+def test_tokenize_whole_words_without_stop_words():
+    assert tokenize("The RIDE, the pride; riding!") == ['ride', 'pride', 'riding']
+
+
+def test_search_matches_whole_words_only():
+    index = BM25Index().build(DOCS)
+    # "ride" is a substring of "pride" but must never match it
+    assert {doc_id for doc_id, _ in index.search("ride", k=10)} == {0, 1, 3}
+    assert {doc_id for doc_id, _ in index.search("pride", k=10)} == {0, 2}
+    assert index.search("rid", k=10) == []
+
+
+def test_title_matches_rank_first():
+    hits = BM25Index().build(DOCS).search("ride", k=3)
+    # Ride in the title (and the text) beats ride once in the text
+    assert hits[0][0] == 3 and hits[-1][0] == 1
+    assert [score for _, score in hits] == sorted((score for _, score in hits), reverse=True)
+
+
+def test_save_load_round_trip(tmp_path):
+    index = BM25Index(k1=1.5, b=0.5).build(DOCS)
+    path = str(tmp_path / 'bm25.npz')
+    index.save(path)
+    loaded = BM25Index.load(path)
+    assert (loaded.k1, loaded.b, loaded.title_weight) == (1.5, 0.5, 3.0)
+    for query in ("ride", "pride sticker", "saddle height", "nothing here"):
+        assert loaded.search(query, k=4) == index.search(query, k=4)
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+build_bundle.py always builds from a corpus file: never from the bundle
+KNOWLEDGE_BASE_BUNDLE points at, and it refuses a bundle passed as input.
+"""
+
+import os
+import sys
+
+import pytest
+
+from conftest import make_posts, write_corpus
+import build_bundle
+from bundle import read_manifest
+
+
+def run(monkeypatch, *argv):
+    monkeypatch.setattr(sys, 'argv', ['build_bundle.py', *argv])
+    build_bundle.main()
+
+
+def test_builds_from_corpus_even_with_bundle_configured(nim_env, monkeypatch, tmp_path):
+    corpus = write_corpus(tmp_path / 'kb.jsonl', make_posts())
+    old = str(tmp_path / 'old-bundle')
+    run(monkeypatch, corpus, '-o', old)
+
+    # The serving bundle is set; no corpus argument or KNOWLEDGE_BASE_PATH, so the default corpus
+    write_corpus(tmp_path / 'kb.jsonl', make_posts(6))
+    monkeypatch.setenv('KNOWLEDGE_BASE_BUNDLE', old)
+    monkeypatch.setattr(build_bundle, 'DEFAULT_KNOWLEDGE_BASE_PATH', corpus)
+    new = str(tmp_path / 'new-bundle')
+    run(monkeypatch, '-o', new)
+
+    manifest = read_manifest(new, verify=True)
+    assert manifest['source'] == os.path.abspath(corpus) and manifest['documents'] == 6
+
+
+def test_rejects_a_bundle_as_input(nim_env, monkeypatch, tmp_path):
+    corpus = write_corpus(tmp_path / 'kb.jsonl', make_posts())
+    bundle = str(tmp_path / 'bundle')
+    run(monkeypatch, corpus, '-o', bundle)
+
+    with pytest.raises(SystemExit):
+        run(monkeypatch, bundle, '-o', str(tmp_path / 'copy'))
+    assert not os.path.exists(tmp_path / 'copy')
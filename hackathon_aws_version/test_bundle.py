@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+write_bundle/read_bundle round trip: a snapshot loaded from a bundle holds
+the same posts, chunks, embeddings and indexes as the one it was saved from,
+and a rebuild switches the bundle link to a new version without removing the old.
+"""
+
+import os
+
+import numpy as np
+import pytest
+from scipy import sparse
+
+from conftest import make_posts, write_corpus
+from bundle import read_manifest
+from nvidia_rag import NVIDIARAGEngine
+
+QUERIES = ("chain tension", "bunny hop basics", "what should kids ride", "carbs before a session")
+
+
+@pytest.mark.parametrize('mode', ['tfidf', 'float32', 'int8', 'ivf'])
+def test_bundle_round_trip(nim_env, monkeypatch, tmp_path, mode):
+    if mode == 'tfidf':
+        monkeypatch.setenv('NVIDIA_API_KEY', 'fake-key-for-testing')
+    elif mode == 'ivf':
+        monkeypatch.setenv('VECTOR_INDEX', 'ivf')
+    else:
+        monkeypatch.setenv('EMBEDDING_STORE_DTYPE', mode)
+    path = write_corpus(tmp_path / 'kb.jsonl', make_posts())
+    built = NVIDIARAGEngine()
+    built.load_knowledge_base(path)
+    manifest = built.save_bundle(str(tmp_path / 'bundle'))
+    assert read_manifest(str(tmp_path / 'bundle'), verify=True) == manifest
+
+    loaded = NVIDIARAGEngine()
+    stats = loaded.load_bundle(str(tmp_path / 'bundle'))
+    assert stats['bundle'] == manifest['version'] and stats['documents'] == 12
+    original, copy = built.snapshot, loaded.snapshot
+    assert copy.bundle == manifest
+
+    assert list(copy.knowledge_base) == list(original.knowledge_base)
+    assert list(copy.chunks) == list(original.chunks)
+    assert (copy.doc_keys, copy.doc_hashes) == (original.doc_keys, original.doc_hashes)
+    if mode == 'tfidf':
+        assert copy.vectorizer.vocabulary_ == original.vectorizer.vocabulary_
+        assert (copy.document_embeddings != original.document_embeddings).nnz == 0
+        assert sparse.issparse(copy.document_embeddings)
+    else:
+        assert copy.vectorizer is None and copy.document_embeddings.dtype == original.document_embeddings.dtype
+        np.testing.assert_array_equal(copy.document_embeddings, original.document_embeddings)
+        if mode == 'int8':
+            np.testing.assert_array_equal(copy.embedding_store.scale, original.embedding_store.scale)
+    assert copy.vector_index.info() == original.vector_index.info()
+
+    assert loaded.retrieve_relevant_context(QUERIES[0], 3)
+    for query in QUERIES:
+        assert copy.bm25.search(query, 5) == original.bm25.search(query, 5)
+        assert loaded.retrieve_relevant_context(query, 3) == built.retrieve_relevant_context(query, 3)
+
+
+def test_rebundling_same_inputs_keeps_version(nim_env, tmp_path):
+    path = write_corpus(tmp_path / 'kb.jsonl', make_posts())
+    engine = NVIDIARAGEngine()
+    engine.load_knowledge_base(path)
+    first = engine.save_bundle(str(tmp_path / 'bundle'))
+    second = engine.save_bundle(str(tmp_path / 'bundle'))
+    assert second['version'] == first['version']
+    assert sorted(p.name for p in tmp_path.iterdir() if p.name.startswith('bundle')) == \
+        ['bundle', f"bundle.v-{first['version']}"]
+
+
+def test_rebuild_switches_link_and_keeps_old_version(nim_env, tmp_path):
+    bundle = str(tmp_path / 'bundle')
+    path = write_corpus(tmp_path / 'kb.jsonl', make_posts())
+    builder = NVIDIARAGEngine()
+    builder.load_knowledge_base(path)
+    old = builder.save_bundle(bundle)
+    serving = NVIDIARAGEngine()
+    serving.load_bundle(bundle)
+    assert serving.snapshot.data_path == os.path.realpath(bundle)
+
+    write_corpus(tmp_path / 'kb.jsonl', make_posts(13))
+    builder.reload_knowledge_base(path)
+    new = builder.save_bundle(bundle)
+    assert new['version'] != old['version']
+    assert os.readlink(bundle) == f"bundle.v-{new['version']}" and read_manifest(bundle) == new
+    # The pod that loaded the old version keeps serving it from its own directory
+    assert os.path.isdir(f"{bundle}.v-{old['version']}")
+    assert len(serving.snapshot.knowledge_base) == 12 and serving.retrieve_relevant_context("chain tension", 3)
+
+
+def test_unversioned_bundle_directory_is_moved_aside(nim_env, tmp_path):
+    bundle = tmp_path / 'bundle'
+    bundle.mkdir()
+    (bundle / 'manifest.json').write_text('{}')
+    engine = NVIDIARAGEngine()
+    engine.load_knowledge_base(write_corpus(tmp_path / 'kb.jsonl', make_posts()))
+    manifest = engine.save_bundle(str(bundle))
+    assert os.path.islink(bundle) and read_manifest(str(bundle)) == manifest
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""Tests for the shared file cache backend: TTL on read and a bounded directory."""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from caching import FileCacheBackend
+
+
+def test_file_cache_round_trip_and_ttl(tmp_path):
+    cache = FileCacheBackend(str(tmp_path), ttl_seconds=60)
+    cache.set('bunny hop', np.arange(4, dtype=np.float32))
+    assert np.array_equal(cache.get('bunny hop'), np.arange(4, dtype=np.float32))
+    old = time.time() - 120
+    for name in os.listdir(tmp_path):
+        os.utime(tmp_path / name, (old, old))
+    assert cache.get('bunny hop') is None
+
+
+def test_file_cache_is_bounded(tmp_path):
+    cache = FileCacheBackend(str(tmp_path), ttl_seconds=3600, max_entries=20)
+    for i in range(100):
+        cache.set(f"query {i}", np.full(4, i, dtype=np.float32))
+    assert len(os.listdir(tmp_path)) <= 20 + cache._prune_every
+    cache.prune()
+    assert len(os.listdir(tmp_path)) == 20
+
+    # Expired entries go first, whatever the count
+    old = time.time() - 7200
+    for name in os.listdir(tmp_path)[:5]:
+        os.utime(tmp_path / name, (old, old))
+    assert cache.prune() == 5
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""/chat/stream through the Flask test client: token events, then one done event (mock NIM)."""
+
+import json
+
+import pytest
+
+from conftest import make_posts, write_corpus
+from nvidia_rag import NVIDIARAGEngine
+
+
+def sse_events(body: str):
+    """Parse `event: ...` / `data: ...` frames into (event, payload) pairs."""
+    events = []
+    for frame in body.strip().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in frame.splitlines())
+        events.append((fields['event'], json.loads(fields['data'])))
+    return events
+
+
+@pytest.fixture
+def client(nim_env, monkeypatch, tmp_path):
+    import app
+
+    # app builds its engine at import; give each test one wired to this test's mock NIM
+    engine = NVIDIARAGEngine()
+    engine.load_knowledge_base(write_corpus(tmp_path / 'kb.jsonl', make_posts()))
+    monkeypatch.setattr(app, 'rag_engine', engine)
+    return app.app.test_client()
+
+
+def test_stream_ends_with_done_event(client, nim_env):
+    response = client.post('/chat/stream', json={"message": "How do I set chain tension?"})
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+
+    events = sse_events(response.get_data(as_text=True))
+    kinds = [kind for kind, _ in events]
+    assert kinds[-1] == 'done' and kinds.count('done') == 1
+    assert set(kinds[:-1]) == {'token'}
+
+    reply = ''.join(payload['content'] for kind, payload in events if kind == 'token')
+    assert reply.startswith("Mock NIM answer to: How do I set chain tension?")
+    done = events[-1][1]
+    assert done['sources'] and done['context_count'] > 0
+    assert nim_env.chats == 1
+
+
+def test_failure_mid_stream_ends_with_error_event(client, monkeypatch):
+    import app
+
+    def broken_stream(query, **kwargs):
+        yield {"type": "token", "content": "Partial"}
+        raise RuntimeError("connection reset")
+
+    monkeypatch.setattr(app.rag_engine, 'chat_stream', broken_stream)
+    events = sse_events(client.post('/chat/stream', json={"message": "bunny hop"}).get_data(as_text=True))
+    assert [kind for kind, _ in events] == ['token', 'error']
+    assert events[-1][1]['error'] == "connection reset"
+
+
+def test_stream_without_message_is_rejected(client):
+    assert client.post('/chat/stream', json={}).status_code == 400
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""chunk_document: chunks stay within `size` and continuations repeat ~`overlap` characters."""
+
+import pytest
+
+import conftest  # noqa: F401 (puts backend on sys.path)
+from chunking import chunk_document
+
+SENTENCES = " ".join(f"Sentence {i} is about pedal grip and stance width." for i in range(60))
+DOC = {
+    "title": "Long Post",
+    "content": f"Intro paragraph.\n\n## Setup\n{SENTENCES}\n\n## Short\nOne line.\n\n## Wrap Up\nThat's all.",
+}
+
+
+@pytest.mark.parametrize('strategy', ['window', 'headings'])
+@pytest.mark.parametrize('size,overlap', [(200, 50), (400, 100)])
+def test_chunks_respect_size_and_overlap(strategy, size, overlap):
+    chunks = chunk_document(DOC, parent_id=4, strategy=strategy, size=size, overlap=overlap)
+    assert len(chunks) > 3
+    assert [c['chunk_index'] for c in chunks] == list(range(len(chunks)))
+    assert all(c['parent_id'] == 4 and c['title'] == "Long Post" for c in chunks)
+    assert all(0 < len(c['content']) <= size for c in chunks)
+
+    # Each continuation of the long section starts with text repeated from the end of the
+    # previous piece, and repeats no more than `overlap` characters
+    pieces = [c['content'].removeprefix('Setup\n\n') for c in chunks if 'Sentence' in c['content']]
+    for previous, current in zip(pieces, pieces[1:]):
+        head = current[:25]
+        assert head in previous
+        assert len(previous) - previous.rindex(head) <= overlap
+
+def test_headings_keep_sections_together():
+    chunks = chunk_document(DOC, parent_id=0, strategy='headings', size=400, overlap=100)
+    setup = [c for c in chunks if c['section'] == 'Setup']
+    assert len(setup) > 1 and all(c['content'].startswith('Setup\n\n') for c in setup)
+    # Small neighbouring sections share a chunk
+    assert any('Short' in c['content'] and 'Wrap Up' in c['content'] for c in chunks)
+
+
+def test_off_keeps_whole_post():
+    chunks = chunk_document(DOC, parent_id=0, strategy='off')
+    assert len(chunks) == 1 and chunks[0]['content'] == DOC['content']
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""ContextPacker: the token budget is never exceeded and repeated passages are skipped."""
+
+import pytest
+
+import conftest  # noqa: F401 (puts backend on sys.path)
+from context_packer import ContextPacker, TokenCounter
+
+WORDS = "rear wheel chain tension slack sprocket hub axle nut frame dropout pedal crank grip".split()
+
+
+def passage(seed: int, words: int = 60) -> str:
+    return " ".join(f"{WORDS[(seed * 7 + i) % len(WORDS)]}{seed}_{i}" for i in range(words))
+
+
+def doc(rank: int, texts, score: float = 1.0):
+    return {
+        "title": f"Post {rank}",
+        "similarity_score": score,
+        "passages": [{"content": text, "score": score - i * 0.01} for i, text in enumerate(texts)]
+    }
+
+
+@pytest.mark.parametrize('budget', [40, 120, 300, 1000])
+def test_budget_is_never_exceeded(budget):
+    counter = TokenCounter()
+    packer = ContextPacker(budget_tokens=budget, max_passage_tokens=100, min_passage_tokens=16, counter=counter)
+    docs = [doc(r, [passage(r * 10 + p) for p in range(3)], score=1.0 - r * 0.1) for r in range(5)]
+    packed = packer.pack(docs)
+
+    texts = [text for entry in packed["docs"] for text in entry["passages"]]
+    assert packed["tokens"] == sum(counter.count(text) for text in texts) <= budget
+    assert all(counter.count(text) <= 100 for text in texts)
+    assert packed["budget"] == budget
+    # Everything was either packed (maybe truncated) or counted as dropped
+    assert len(texts) + packed["dropped"] == 15
+
+
+def test_most_relevant_passages_fill_the_budget_first():
+    packer = ContextPacker(budget_tokens=200, max_passage_tokens=200, min_passage_tokens=16)
+    docs = [doc(0, [passage(1)], score=0.2), doc(1, [passage(2)], score=0.9)]
+    packed = packer.pack(docs)
+    # Grouped back under their posts in retrieval order, but the higher score was kept whole
+    assert [entry["doc"]["title"] for entry in packed["docs"]][-1] == "Post 1"
+    assert packed["docs"][-1]["passages"] == [passage(2)]
+
+
+def test_repeated_passages_are_skipped():
+    text = passage(3)
+    overlapping = " ".join(text.split()[5:]) + " extra words"
+    docs = [doc(0, [text]), doc(1, [text, overlapping, passage(4)], score=0.5)]
+    packed = ContextPacker(budget_tokens=5000).pack(docs)
+
+    texts = [t for entry in packed["docs"] for t in entry["passages"]]
+    assert packed["deduplicated"] == 2
+    assert texts.count(text) == 1 and overlapping not in texts and passage(4) in texts
+
+
+def test_explicit_budget_overrides_default_and_zero_packs_nothing():
+    docs = [doc(0, [passage(5)])]
+    packer = ContextPacker(budget_tokens=1000)
+    packed = packer.pack(docs, budget_tokens=0)
+    assert packed["docs"] == [] and packed["tokens"] == 0 and packed["dropped"] == 1
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Incremental markdown conversion: each run reports the files added, changed
+and removed since the last one, and a touched file (new mtime, same bytes)
+counts as unchanged.
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import convert_md_to_json
+from convert_md_to_json import manifest_path_for
+
+
+def write_post(blog_dir, name, body):
+    path = blog_dir / name
+    path.write_text(f"---\ntitle: {name}\ncategory: BMX\n---\n# {name}\n\n{body}\n", encoding='utf-8')
+    return str(path)
+
+
+def convert(monkeypatch, blog_dir, output):
+    monkeypatch.setattr(sys, 'argv', ['convert_md_to_json.py', str(blog_dir), '-o', str(output)])
+    convert_md_to_json.main()
+    with open(manifest_path_for(output), encoding='utf-8') as f:
+        manifest = json.load(f)
+    if output.suffix == '.jsonl':
+        with open(output, encoding='utf-8') as f:
+            blogs = [json.loads(line) for line in f]
+        return blogs, manifest['metadata']['changes']
+    with open(output, encoding='utf-8') as f:
+        data = json.load(f)
+    return data['blogs'], data['metadata']['changes']
+
+
+@pytest.mark.parametrize('name', ['kb.json', 'kb.jsonl'])
+def test_second_run_reports_added_changed_removed_and_touched(monkeypatch, tmp_path, name):
+    blog_dir = tmp_path / 'blogs'
+    blog_dir.mkdir()
+    output = tmp_path / name
+    kept = write_post(blog_dir, 'kept.md', "Slide the wheel back.")
+    edited = write_post(blog_dir, 'edited.md', "Flanged grips.")
+    touched = write_post(blog_dir, 'touched.md', "Pull the bars up.")
+    deleted = write_post(blog_dir, 'deleted.md', "Eat slow carbs.")
+
+    blogs, changes = convert(monkeypatch, blog_dir, output)
+    assert len(blogs) == 4
+    assert sorted(changes['added']) == sorted([kept, edited, touched, deleted])
+
+    write_post(blog_dir, 'edited.md', "Flanged grips stop your hands sliding off.")
+    stat = os.stat(touched)
+    os.utime(touched, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    os.remove(deleted)
+    added = write_post(blog_dir, 'added.md', "Find the balance point.")
+
+    blogs, changes = convert(monkeypatch, blog_dir, output)
+    assert changes == {"added": [added], "changed": [edited], "removed": [deleted], "unchanged": 2}
+    by_file = {blog['source_file']: blog for blog in blogs}
+    assert sorted(by_file) == sorted([kept, edited, touched, added])
+    assert "sliding off" in by_file[edited]['content']
+
+    # Nothing changed since: every file is reused
+    _, changes = convert(monkeypatch, blog_dir, output)
+    assert changes == {"added": [], "changed": [], "removed": [], "unchanged": 4}
+
+
+def test_json_and_jsonl_outputs_keep_separate_manifests(monkeypatch, tmp_path):
+    blog_dir = tmp_path / 'blogs'
+    blog_dir.mkdir()
+    first = write_post(blog_dir, 'first.md', "Slide the wheel back.")
+    assert manifest_path_for(tmp_path / 'kb.json') != manifest_path_for(tmp_path / 'kb.jsonl')
+
+    convert(monkeypatch, blog_dir, tmp_path / 'kb.json')
+    second = write_post(blog_dir, 'second.md', "Flanged grips.")
+    _, changes = convert(monkeypatch, blog_dir, tmp_path / 'kb.jsonl')
+    assert sorted(changes['added']) == sorted([first, second])
+
+    # The .json output's manifest was left alone, so it sees only the new post
+    _, changes = convert(monkeypatch, blog_dir, tmp_path / 'kb.json')
+    assert changes['added'] == [second] and changes['unchanged'] == 1
+
+
+def test_previous_jsonl_output_is_closed(monkeypatch, tmp_path):
+    blog_dir = tmp_path / 'blogs'
+    blog_dir.mkdir()
+    write_post(blog_dir, 'first.md', "Slide the wheel back.")
+    output = tmp_path / 'kb.jsonl'
+    convert(monkeypatch, blog_dir, output)
+
+    opened = []
+
+    class RecordingEntries(convert_md_to_json.JsonlEntries):
+        def __init__(self, path):
+            super().__init__(path)
+            opened.append(self)
+
+    monkeypatch.setattr(convert_md_to_json, 'JsonlEntries', RecordingEntries)
+    _, changes = convert(monkeypatch, blog_dir, output)
+    assert changes['unchanged'] == 1
+    assert len(opened) == 1 and opened[0].file.closed
+
+    with convert_md_to_json.JsonlEntries(output) as entries:
+        assert entries[str(blog_dir / 'first.md')]['title'] == 'first.md'
+    assert entries.file.closed
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for the batched NIM embedding client against the local mock NIM
+(no API key needed): per-item failures are isolated by splitting the batch,
+while an outage fails the batch without multiplying requests.
+"""
+
+import os
+import sys
+
+from openai import OpenAI
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from embeddings import NIMEmbeddingClient
+from mock_nim import start_mock_nim
+
+
+def make_client(server, **kwargs):
+    client = OpenAI(base_url=server.base_url, api_key='local-mock', max_retries=0)
+    return NIMEmbeddingClient(client, 'nvidia/nv-embedqa-e5-v5', batch_size=64, concurrency=1, **kwargs)
+
+
+def test_rejected_item_is_isolated():
+    """A 400 caused by one text splits the batch; every other text still gets its vector."""
+    server = start_mock_nim(dimension=16, fail_marker='POISON')
+    try:
+        texts = [f"post {i}" for i in range(8)]
+        texts[5] = "POISON post"
+        vectors = make_client(server).embed(texts)
+        assert len(vectors) == 8
+        assert not any(vectors[5])
+        assert all(any(vec) for i, vec in enumerate(vectors) if i != 5)
+    finally:
+        server.shutdown()
+
+
+def test_outage_does_not_split_batches():
+    """A 503 that survives every retry fails the batch as a whole: 1 + max_retries requests, not one per item."""
+    server = start_mock_nim(dimension=16, outage_status=503)
+    try:
+        embedder = make_client(server, max_retries=1)
+        embedder.throttle.base_delay = embedder.throttle.delay = 0.01  # Keep the backoff short
+        vectors = embedder.embed([f"post {i}" for i in range(16)])
+        assert server.requests == 2
+        assert len(vectors) == 16 and not any(any(vec) for vec in vectors)
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_rejected_item_is_isolated()
+    test_outage_does_not_split_batches()
+    print("✅ Embedding client tests passed")
+
+
+def test_engine_embedder_does_not_retry_inside_the_sdk(nim_env, monkeypatch):
+    """The engine's embedder counts every HTTP attempt itself; the SDK must not add its own retries."""
+    from nvidia_rag import NVIDIARAGEngine
+
+    monkeypatch.setenv('NVIDIA_EMBEDDING_MAX_RETRIES', '1')
+    nim_env.outage_status = 503
+    engine = NVIDIARAGEngine()
+    for _ in range(2):  # As built, and as rebuilt in a forked worker
+        engine.embedder.throttle.base_delay = engine.embedder.throttle.delay = 0.01
+        requests = nim_env.requests
+        engine.embedder.embed(["post 1", "post 2", "post 3"])
+        assert nim_env.requests - requests == 2
+        engine.reset_after_fork()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Hybrid retrieval under a slow embedding NIM: BM25 must keep answering while
+dense retrieval times out or is skipped (uses the mock NIM, no API key).
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from conftest import make_posts, write_corpus
+from nvidia_rag import NVIDIARAGEngine
+
+
+def test_bm25_answers_while_embeddings_hang(nim_env, monkeypatch, tmp_path):
+    monkeypatch.setenv('RETRIEVAL_MODE', 'hybrid')
+    monkeypatch.setenv('HYBRID_DENSE_BUDGET_MS', '100')
+    monkeypatch.setenv('HYBRID_WORKERS', '2')
+    engine = NVIDIARAGEngine()
+    assert engine.load_knowledge_base(write_corpus(tmp_path / 'kb.jsonl', make_posts())) == 12
+
+    nim_env.latency_ms = 1500  # Every query embedding now takes far longer than the budget
+    queries = [f"chain tension slack question {i}" for i in range(8)]
+    with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+        results = list(pool.map(lambda q: engine.retrieve_relevant_context(q, 3), queries))
+
+    assert all(results), "every query should get BM25 results"
+    assert all(docs[0]['title'].startswith('Chain Tension') for docs in results)
+    timeouts = engine.retriever_timeouts
+    assert timeouts['dense'] + timeouts['dense_skipped'] == len(queries)
+    # Only HYBRID_WORKERS embedding calls are ever left hanging; the rest never start
+    assert timeouts['dense'] <= 2 and timeouts['dense_skipped'] >= len(queries) - 2
+
+
+def test_chat_keeps_the_budget_with_response_cache(nim_env, monkeypatch, tmp_path):
+    monkeypatch.setenv('RETRIEVAL_MODE', 'hybrid')
+    monkeypatch.setenv('HYBRID_DENSE_BUDGET_MS', '100')
+    monkeypatch.delenv('RESPONSE_CACHE_ENABLED', raising=False)
+    engine = NVIDIARAGEngine()
+    assert engine.response_cache is not None
+    engine.load_knowledge_base(write_corpus(tmp_path / 'kb.jsonl', make_posts()))
+
+    # The cache lookup must not embed the query itself once retrieval gave up on it
+    nim_env.latency_ms = 1500
+    start = time.monotonic()
+    result = engine.chat("how much chain tension slack", top_k=3)
+    assert time.monotonic() - start < 1.0
+    assert not result['error'] and result['sources']
+
+    start = time.monotonic()
+    events = list(engine.chat_stream("is my chain tension right", top_k=3))
+    assert time.monotonic() - start < 1.0
+    assert events[-1]['type'] == 'done'
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""MicroBatcher/AsyncMicroBatcher: batch sizes, per-caller results and error fan-out."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import conftest  # noqa: F401 (puts backend on sys.path)
+from microbatch import AsyncMicroBatcher, MicroBatcher
+
+
+def test_concurrent_items_are_batched_up_to_max_batch():
+    batches = []
+    lock = threading.Lock()
+
+    def double(items):
+        with lock:
+            batches.append(len(items))
+        time.sleep(0.05)
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(double, max_batch=4, max_wait_ms=50, concurrency=1)
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        results = list(pool.map(batcher.submit, range(10)))
+
+    assert results == [item * 2 for item in range(10)]  # Each caller gets its own result
+    assert sum(batches) == 10 and max(batches) <= 4 and len(batches) < 10
+    stats = batcher.stats.as_dict()
+    assert stats["items"] == 10 and stats["largest_batch"] == max(batches) and stats["errors"] == 0
+
+
+def test_lone_item_goes_out_after_max_wait():
+    batcher = MicroBatcher(lambda items: [item.upper() for item in items], max_batch=32, max_wait_ms=20)
+    start = time.monotonic()
+    assert batcher.submit('q') == 'Q'
+    assert time.monotonic() - start < 1.0
+    assert batcher.stats.as_dict()["batches"] == 1
+
+
+def test_batch_error_reaches_every_caller_in_it():
+    def failing(items):
+        time.sleep(0.05)
+        raise RuntimeError(f"batch of {len(items)} failed")
+
+    batcher = MicroBatcher(failing, max_batch=8, max_wait_ms=100, concurrency=1)
+
+    def call(item):
+        try:
+            return batcher.submit(item)
+        except RuntimeError as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        errors = list(pool.map(call, range(4)))
+    assert all(isinstance(e, RuntimeError) for e in errors)
+    assert batcher.stats.as_dict()["errors"] >= 1
+    # The batcher keeps working after a failed batch
+    batcher.fn = lambda items: items
+    assert batcher.submit('ok') == 'ok'
+
+
+def test_async_batcher_sizes_and_errors():
+    async def main():
+        sizes = []
+
+        async def echo(items):
+            sizes.append(len(items))
+            return [f"vec:{item}" for item in items]
+
+        batcher = AsyncMicroBatcher(echo, max_batch=3, max_wait_ms=20)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(7)))
+        assert results == [f"vec:{i}" for i in range(7)]
+        assert sizes == [3, 3, 1]
+
+        async def failing(items):
+            raise ValueError("nope")
+
+        batcher = AsyncMicroBatcher(failing, max_batch=3, max_wait_ms=5)
+        errors = await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+        assert all(isinstance(e, ValueError) for e in errors)
+        assert batcher.stats.as_dict()["errors"] == 1
+
+    asyncio.run(main())
+
+
+def test_submit_timeout():
+    batcher = MicroBatcher(lambda items: time.sleep(0.5) or items, max_batch=1, max_wait_ms=0)
+    with pytest.raises(TimeoutError):
+        batcher.submit('slow', timeout=0.05)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Knowledge base reloads against the mock NIM (no API key needed): a reload
+during an embedding outage must fail and leave the previous index serving,
+and a reload made in one worker must reach the others.
+"""
+
+import time
+
+from conftest import make_posts, write_corpus
+from nvidia_rag import NVIDIARAGEngine
+
+
+def test_reload_during_embedding_outage_keeps_old_index(nim_env, tmp_path):
+    path = write_corpus(tmp_path / 'kb.jsonl', make_posts())
+    engine = NVIDIARAGEngine()
+    assert engine.load_knowledge_base(path) == 12
+    live = engine.snapshot
+    before = engine.retrieve_relevant_context("chain tension", 3)
+    assert before and live.vectorizer is None
+
+    # Every post changes, and every embeddings request now fails
+    edited = [dict(post, content=post['content'] + " Updated.") for post in make_posts()]
+    write_corpus(tmp_path / 'kb.jsonl', edited)
+    nim_env.outage_status = 503
+    job = engine.reload_jobs.submit(path)
+    assert job.wait(60)
+
+    assert job.status == 'failed' and 'embeddings failed' in job.error
+    assert engine.snapshot is live
+    assert engine.retrieve_relevant_context("chain tension", 3) == before
+
+    # Once the NIM is back the same reload goes through
+    nim_env.outage_status = 0
+    job = engine.reload_jobs.submit(path)
+    assert job.wait(60) and job.status == 'succeeded'
+    assert job.result['changed'] == 12 and engine.snapshot.version == live.version + 1
+
+
+def test_reload_reaches_every_worker(nim_env, monkeypatch, tmp_path):
+    """Two engines sharing RELOAD_STATE_DIR stand in for two gunicorn workers."""
+    monkeypatch.setenv('RELOAD_STATE_DIR', str(tmp_path / 'reload'))
+    path = write_corpus(tmp_path / 'kb.jsonl', make_posts())
+    workers = [NVIDIARAGEngine(), NVIDIARAGEngine()]
+    for engine in workers:
+        engine.load_knowledge_base(path)
+    receiver, other = workers
+    other.reload_jobs.watch(interval=0.05)
+
+    write_corpus(tmp_path / 'kb.jsonl', make_posts(13))
+    job = receiver.reload_jobs.submit(path)
+    assert job.wait(60) and job.status == 'succeeded'
+
+    # The other worker can report on the job and repeats the reload itself
+    seen = other.reload_jobs.get(job.id)
+    assert seen is not None and seen.as_dict()['result'] == job.result
+    deadline = time.monotonic() + 30
+    while len(other.snapshot.knowledge_base) != 13 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert len(other.snapshot.knowledge_base) == 13
+    assert other.reload_jobs.jobs()[0].follows == job.id
+    # ...once: the receiver doesn't reload again, and followers don't stamp new generations
+    time.sleep(0.3)
+    assert len(receiver.reload_jobs.jobs()) == 1 and len(other.reload_jobs.jobs()) == 1
+    assert other.reload_jobs.get('0' * 32) is None
+
+
+def test_unknown_job_without_shared_state_says_why(nim_env):
+    engine = NVIDIARAGEngine()
+    assert engine.reload_jobs.get('0' * 32) is None
+    assert 'RELOAD_STATE_DIR' in engine.reload_jobs.unknown_job_message('0' * 32)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""SingleFlight/AsyncSingleFlight: one leader call per key, result or exception shared by every waiter."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import conftest  # noqa: F401 (puts backend on sys.path)
+from singleflight import AsyncSingleFlight, SingleFlight
+
+
+def run_concurrently(flight, key, fn, callers=8):
+    started = threading.Barrier(callers)
+
+    def call(_):
+        started.wait()
+        try:
+            return flight.do(key, fn)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=callers) as pool:
+        return list(pool.map(call, range(callers)))
+
+
+def test_concurrent_calls_share_one_leader():
+    flight = SingleFlight()
+    runs = []
+
+    def slow():
+        runs.append(1)
+        time.sleep(0.2)
+        return {"reply": "hello"}
+
+    results = run_concurrently(flight, 'q', slow)
+    assert len(runs) == 1
+    assert [shared for _, shared in results].count(False) == 1
+    assert all(result == {"reply": "hello"} for result, _ in results)
+    assert flight.stats() == {"calls": 1, "shared": 7, "in_flight": 0}
+
+
+def test_exception_is_shared_and_not_cached():
+    flight = SingleFlight()
+
+    def failing():
+        time.sleep(0.2)
+        raise RuntimeError("NIM down")
+
+    results = run_concurrently(flight, 'q', failing)
+    assert all(isinstance(e, RuntimeError) and str(e) == "NIM down" for e in results)
+    assert flight.stats()["calls"] == 1
+    # Nothing is remembered once the call completes
+    assert flight.do('q', lambda: 'recovered') == ('recovered', False)
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight()
+    assert flight.do('a', lambda: 1) == (1, False)
+    assert flight.do('b', lambda: 2) == (2, False)
+    assert flight.stats()["shared"] == 0
+
+
+def test_async_single_flight_shares_result_and_exception():
+    async def main():
+        flight = AsyncSingleFlight()
+        runs = []
+
+        async def slow():
+            runs.append(1)
+            await asyncio.sleep(0.05)
+            return 'answer'
+
+        results = await asyncio.gather(*(flight.do('q', slow) for _ in range(5)))
+        assert len(runs) == 1 and [shared for _, shared in results].count(False) == 1
+        assert all(result == 'answer' for result, _ in results)
+
+        async def failing():
+            await asyncio.sleep(0.05)
+            raise ValueError('bad')
+
+        errors = await asyncio.gather(*(flight.do('e', failing) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(e, ValueError) for e in errors)
+        assert flight.stats() == {"calls": 2, "shared": 6, "in_flight": 0}
+
+    asyncio.run(main())
+
+
+def test_cancelled_waiter_does_not_cancel_the_shared_call():
+    async def main():
+        flight = AsyncSingleFlight()
+
+        async def slow():
+            await asyncio.sleep(0.1)
+            return 'done'
+
+        first = asyncio.ensure_future(flight.do('q', slow))
+        second = asyncio.ensure_future(flight.do('q', slow))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert await second == ('done', True)
+
+    asyncio.run(main())
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Incremental reloads (DocumentDiff + _build_snapshot): unchanged posts keep
+their chunks and vectors, only new or edited ones are embedded, and the
+result matches a full build of the same corpus.
+"""
+
+import numpy as np
+import pytest
+
+from conftest import make_posts, write_corpus
+from nvidia_rag import NVIDIARAGEngine
+
+
+@pytest.mark.parametrize('dtype', ['float32', 'int8'])
+def test_incremental_reload_matches_full_build(nim_env, monkeypatch, tmp_path, dtype):
+    monkeypatch.setenv('EMBEDDING_STORE_DTYPE', dtype)
+    monkeypatch.setenv('EMBEDDING_CACHE_PATH', '')  # Reuse has to come from the previous snapshot
+    path = write_corpus(tmp_path / 'kb.jsonl', make_posts())
+    engine = NVIDIARAGEngine()
+    engine.load_knowledge_base(path)
+    chunks_per_post = len(engine.snapshot.chunks) // 12
+
+    # Edit two posts, drop one and add one
+    posts = make_posts(13)
+    posts[3]['content'] += " Edited."
+    posts[7]['title'] += " (updated)"
+    del posts[5]
+    write_corpus(tmp_path / 'kb.jsonl', posts)
+    items = nim_env.items
+    stats = engine.reload_knowledge_base(path)
+
+    assert (stats['added'], stats['changed'], stats['removed'], stats['unchanged']) == (1, 2, 1, 9)
+    assert stats['reused_chunks'] == 9 * chunks_per_post
+    assert nim_env.items - items == 3 * chunks_per_post
+    incremental = engine.snapshot
+    assert str(incremental.document_embeddings.dtype) == dtype
+
+    # Same corpus from scratch, into fresh stores
+    monkeypatch.setenv('EMBEDDING_STORE_DIR', str(tmp_path))
+    monkeypatch.setenv('DOCUMENT_STORE_DIR', str(tmp_path / 'full-documents'))
+    full = NVIDIARAGEngine()
+    full.load_knowledge_base(path)
+    full = full.snapshot
+
+    assert incremental.doc_keys == full.doc_keys and incremental.doc_hashes == full.doc_hashes
+    assert list(incremental.chunks) == list(full.chunks)
+    if dtype == 'int8':
+        # Reused int8 rows are re-quantized to exactly the same values
+        np.testing.assert_array_equal(incremental.document_embeddings, full.document_embeddings)
+        np.testing.assert_allclose(incremental.embedding_store.scale, full.embedding_store.scale, rtol=1e-6)
+    else:
+        np.testing.assert_allclose(incremental.document_embeddings, full.document_embeddings, atol=1e-6)
+
+
+def test_unchanged_reload_embeds_nothing(nim_env, monkeypatch, tmp_path):
+    monkeypatch.setenv('EMBEDDING_CACHE_PATH', '')
+    path = write_corpus(tmp_path / 'kb.jsonl', make_posts())
+    engine = NVIDIARAGEngine()
+    engine.load_knowledge_base(path)
+    items = nim_env.items
+
+    stats = engine.reload_knowledge_base(path)
+    assert stats['unchanged'] == 12 and stats['reused_chunks'] == stats['chunks']
+    assert nim_env.items == items
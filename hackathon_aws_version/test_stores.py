@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+On-disk stores written by several processes at once, as replicas sharing a
+cache volume do: a file someone else already published is reused, never
+replaced, and older embedding stores are only deleted when asked to.
+"""
+
+import os
+import threading
+
+import numpy as np
+
+import conftest  # noqa: F401 (puts backend on sys.path)
+from atomic_files import publish, temp_path
+from document_store import TextBlob
+from embedding_store import EmbeddingStore
+
+
+def test_temp_paths_are_unique_per_writer(tmp_path):
+    path = str(tmp_path / 'kb.docs.bin')
+    names = {temp_path(path) for _ in range(100)}
+    assert len(names) == 100 and all('.tmp-' in name for name in names)
+
+
+def test_publish_keeps_the_file_already_there(tmp_path):
+    path = tmp_path / 'blob.bin'
+    path.write_bytes(b'first')
+    tmp = temp_path(str(path))
+    with open(tmp, 'wb') as f:
+        f.write(b'second')
+    assert not publish(tmp, str(path))
+    assert path.read_bytes() == b'first' and not os.path.exists(tmp)
+
+
+def test_text_blob_rebuild_reuses_published_file(tmp_path):
+    prefix = str(tmp_path / 'kb.docs')
+    first = TextBlob.build(['alpha', 'beta'], prefix)
+    inode = os.stat(first.path).st_ino
+    second = TextBlob.build(['alpha', 'beta'], prefix)
+    assert second.path == first.path and os.stat(second.path).st_ino == inode
+    assert [second[i] for i in range(len(second))] == ['alpha', 'beta']
+    assert sorted(os.listdir(tmp_path)) == [os.path.basename(first.path)]
+
+
+def test_embedding_store_race_opens_existing_and_keeps_old_versions(tmp_path):
+    prefix = str(tmp_path / 'kb')
+    vectors = np.random.default_rng(0).normal(size=(5, 8))
+    old = EmbeddingStore.build(prefix, 'old', vectors, 'int8')
+    first = EmbeddingStore.build(prefix, 'new', vectors, 'int8')
+    inode = os.stat(first.path).st_ino
+    # A second writer finishing the same store later opens the first one's files
+    second = EmbeddingStore.build(prefix, 'new', vectors * 2, 'int8')
+    assert os.stat(second.path).st_ino == inode
+    np.testing.assert_array_equal(second.matrix, first.matrix)
+    assert os.path.exists(old.path) and not any('.tmp-' in name for name in os.listdir(tmp_path))
+
+    EmbeddingStore.build(prefix, 'newer', vectors, 'float32', remove_stale=True)
+    assert sorted(os.listdir(tmp_path)) == ['kb.emb-newer-float32.npy']
+
+
+def test_concurrent_publish_has_one_winner(tmp_path):
+    path = str(tmp_path / 'blob.bin')
+    writers = 8
+    barrier = threading.Barrier(writers)
+    outcomes = {}
+
+    def write(n):
+        tmp = temp_path(path)
+        with open(tmp, 'wb') as f:
+            f.write(b'writer %d' % n)
+        barrier.wait()
+        outcomes[n] = publish(tmp, path)
+
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    winners = [n for n, published in outcomes.items() if published]
+    assert len(winners) == 1
+    with open(path, 'rb') as f:
+        assert f.read() == b'writer %d' % winners[0]
+    assert os.listdir(tmp_path) == ['blob.bin']
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""VectorIndex: the interface is abstract and every shipped index implements it."""
+
+import numpy as np
+import pytest
+
+import conftest  # noqa: F401 (puts backend on sys.path)
+from retrieval import normalize_rows
+from vector_index import ExactIndex, HNSWIndex, IVFIndex, SparseIndex, VectorIndex
+
+
+def test_interface_cannot_be_instantiated():
+    with pytest.raises(TypeError):
+        VectorIndex()
+
+
+def test_subclass_missing_a_method_fails_at_construction():
+    class NoSave(VectorIndex):
+        kind = 'nosave'
+
+        def build(self, matrix, scale=None):
+            return self
+
+        def search(self, query, k):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        @classmethod
+        def load(cls, path, matrix, scale=None):
+            return cls()
+
+    with pytest.raises(TypeError, match='save'):
+        NoSave()
+
+
+@pytest.mark.parametrize('cls', [ExactIndex, SparseIndex, IVFIndex, HNSWIndex])
+def test_shipped_indexes_are_concrete(cls):
+    assert not cls.__abstractmethods__
+
+
+def test_ivf_round_trip_matches_exact(tmp_path):
+    rng = np.random.default_rng(0)
+    matrix = normalize_rows(rng.standard_normal((400, 16)).astype(np.float32))
+    query = matrix[7] + 0.01
+
+    exact = ExactIndex().build(matrix)
+    ivf = IVFIndex(nlist=8, nprobe=8).build(matrix)
+    path = str(tmp_path / 'index.npz')
+    ivf.save(path)
+    loaded = IVFIndex.load(path, matrix)
+
+    assert exact.search(query, 5)[0][0] == 7
+    assert list(loaded.search(query, 5)[0]) == list(exact.search(query, 5)[0])
+
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark markdown ingestion on a generated corpus.
+Writes N posts (SAMPLE_BLOGS repeated under unique file names), then times
+the markdown cleanup against the original eight-pass version and the full
+conversion with a range of worker counts.
+"""
+
+import argparse
+import contextlib
+import os
+import re
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from convert_md_to_json import clean_markdown_content, convert_files, extract_frontmatter, find_markdown_files, ingest
+from setup_sample_blogs import SAMPLE_BLOGS
+
+def legacy_clean_markdown_content(content):
+    """clean_markdown_content as it was: eight re.sub passes with patterns looked up per call."""
+    content = re.sub(r'^#{1,6}\s+', '', content, flags=re.MULTILINE)
+    content = re.sub(r'\*\*(.*?)\*\*', r'\1', content)
+    content = re.sub(r'\*(.*?)\*', r'\1', content)
+    content = re.sub(r'`(.*?)`', r'\1', content)
+    content = re.sub(r'```.*?```', '', content, flags=re.DOTALL)
+    content = re.sub(r'\[([^\]]+)\]\([^\)]+\)', r'\1', content)
+    content = re.sub(r'!\[([^\]]*)\]\([^\)]+\)', r'\1', content)
+    content = re.sub(r'\n\s*\n', '\n\n', content)
+    return content.strip()
+
+def generate_corpus(directory, posts):
+    """Write `posts` markdown files, 1000 per subdirectory; returns total bytes."""
+    total = 0
+    for i in range(posts):
+        blog = SAMPLE_BLOGS[i % len(SAMPLE_BLOGS)]
+        subdir = Path(directory) / f"{i // 1000:03d}"
+        if i % 1000 == 0:
+            subdir.mkdir(parents=True, exist_ok=True)
+        # Number each title so the posts aren't byte-identical
+        content = blog["content"].replace('title: "', f'title: "#{i} ', 1)
+        with open(subdir / f"{i:06d}-{blog['filename']}", 'w', encoding='utf-8') as f:
+            f.write(content)
+        total += len(content.encode('utf-8'))
+    return total
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark convert_md_to_json.py on a generated corpus')
+    parser.add_argument('--posts', type=int, default=100000)
+    parser.add_argument('--workers', default='1,2,4,0', help='Worker counts to time (0 = one per CPU)')
+    parser.add_argument('--corpus-dir', help='Reuse (or create) the corpus here instead of a temp dir')
+    args = parser.parse_args()
+
+    corpus_dir = args.corpus_dir or tempfile.mkdtemp(prefix='bench-convert-')
+    if not find_markdown_files(corpus_dir):
+        size, seconds = timed(lambda: generate_corpus(corpus_dir, args.posts))
+        print(f"📝 Generated {args.posts:,} posts ({size / 1e6:.0f} MB) in {seconds:.1f}s: {corpus_dir}")
+    md_files = sorted(find_markdown_files(corpus_dir))
+    print(f"🚀 {len(md_files):,} posts, {os.cpu_count()} CPUs")
+    print("=" * 70)
+
+    try:
+        # Cleanup alone, on the bodies of the distinct sample posts
+        bodies = [extract_frontmatter(blog["content"])[1] for blog in SAMPLE_BLOGS]
+        bodies = [bodies[i % len(bodies)] for i in range(len(md_files))]
+        legacy, legacy_s = timed(lambda: [legacy_clean_markdown_content(body) for body in bodies])
+        current, current_s = timed(lambda: [clean_markdown_content(body) for body in bodies])
+        assert legacy == current, "cleanup output changed"
+        print(f"{'cleanup, 8 passes':>22}  {legacy_s:6.2f}s")
+        print(f"{'cleanup, current':>22}  {current_s:6.2f}s  ({legacy_s / current_s:.2f}x, identical output)")
+
+        baseline = reference = None
+        for workers in [int(w) for w in args.workers.split(',')]:
+            workers = workers or os.cpu_count() or 1
+            # The serial path prints one line per file; time it without the terminal
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                blogs, seconds = timed(lambda: [entry for entry, _ in convert_files(md_files, workers)])
+            if reference is None:
+                reference, baseline = blogs, seconds
+            assert blogs == reference, f"workers={workers} produced different output"
+            print(f"{f'convert, workers={workers}':>22}  {seconds:6.2f}s  "
+                  f"{len(md_files) / seconds:8,.0f} posts/s  ({baseline / seconds:.2f}x)")
+
+        # A re-run with the manifest from a full run, after touching 1% of the files
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            entries, files, _ = ingest(md_files, {}, {})
+            previous = {blog['source_file']: blog for blog in entries}
+            for file_path in md_files[::100]:
+                os.utime(file_path)
+            entries, _, changes = ingest(md_files, files, previous)
+            _, seconds = timed(lambda: list(entries))
+        print(f"{'re-run, 1% touched':>22}  {seconds:6.2f}s  "
+              f"{changes['unchanged']:,} unchanged, {len(changes['changed'])} changed ({baseline / seconds:.1f}x)")
+    finally:
+        if not args.corpus_dir:
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -6,9 +6,24 @@ Convert markdown blog files to JSON format for RAG system
 import os
 import json
 import re
+import hashlib
 from datetime import datetime
 from pathlib import Path
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+# Compiled once at import, i.e. once per worker process
+HEADER_RE = re.compile(r'^#{1,6}\s+', re.MULTILINE)
+BOLD_RE = re.compile(r'\*\*(.*?)\*\*')
+ITALIC_RE = re.compile(r'\*(.*?)\*')
+INLINE_CODE_RE = re.compile(r'`(.*?)`')
+LINK_RE = re.compile(r'\[([^\]]+)\]\([^\)]+\)')
+IMAGE_RE = re.compile(r'!\[([^\]]*)\]\([^\)]+\)')
+BLANK_LINES_RE = re.compile(r'\n\s*\n')
+TITLE_RE = re.compile(r'^#\s+(.+)', re.MULTILINE)
+
+def _first_group(match):
+    return match.group(1)
 
 def extract_frontmatter(content):
     """Extract YAML frontmatter from markdown content."""
@@ -36,24 +51,56 @@ def extract_frontmatter(content):
 
 def clean_markdown_content(content):
     """Clean markdown content for better RAG processing."""
-    # Remove markdown syntax but keep structure
-    content = re.sub(r'^#{1,6}\s+', '', content, flags=re.MULTILINE)  # Headers
-    content = re.sub(r'\*\*(.*?)\*\*', r'\1', content)  # Bold
-    content = re.sub(r'\*(.*?)\*', r'\1', content)  # Italic
-    content = re.sub(r'`(.*?)`', r'\1', content)  # Inline code
-    content = re.sub(r'```.*?```', '', content, flags=re.DOTALL)  # Code blocks
-    content = re.sub(r'\[([^\]]+)\]\([^\)]+\)', r'\1', content)  # Links
-    content = re.sub(r'!\[([^\]]*)\]\([^\)]+\)', r'\1', content)  # Images
-    content = re.sub(r'\n\s*\n', '\n\n', content)  # Multiple newlines
+    # Remove markdown syntax but keep structure. Rules run in the same order
+    # as always (later ones see earlier ones' output), but a rule is skipped
+    # when the character it needs isn't in the text at all.
+    content = HEADER_RE.sub('', content)  # Headers
+    if '*' in content:
+        content = BOLD_RE.sub(_first_group, content)  # Bold
+        content = ITALIC_RE.sub(_first_group, content)  # Italic
+    if '`' in content:
+        # Inline code; this leaves no ``` runs, so fenced blocks need no pass of their own
+        content = INLINE_CODE_RE.sub(_first_group, content)
+    if '](' in content:
+        content = LINK_RE.sub(_first_group, content)  # Links
+        content = IMAGE_RE.sub(_first_group, content)  # Images
+    content = BLANK_LINES_RE.sub('\n\n', content)  # Multiple newlines
     
     return content.strip()
 
 def process_markdown_file(file_path):
     """Process a single markdown file."""
+    return ingest_markdown_file(file_path)[0]
+
+def ingest_markdown_file(file_path):
+    """
+    Read a markdown file once and return (blog entry or None, manifest record),
+    the record holding the file's size, mtime and content hash.
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+            stat = os.fstat(f.fileno())
+    except OSError as e:
+        print(f"Error processing {file_path}: {e}")
+        return None, None
+    record = {
+        "size": len(data),
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": hashlib.sha256(data).hexdigest()
+    }
+    try:
+        content = data.decode('utf-8')
+    except UnicodeDecodeError as e:
+        print(f"Error processing {file_path}: {e}")
+        return None, record
+    # Same newlines as reading the file in text mode
+    content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return parse_markdown(content, file_path), record
+
+def parse_markdown(content, file_path):
+    """Build the blog entry for one markdown file's text."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
         # Extract frontmatter
         frontmatter, main_content = extract_frontmatter(content)
         
@@ -64,7 +111,7 @@ def process_markdown_file(file_path):
         title = frontmatter.get('title', '')
         if not title:
             # Try to extract from first header
-            title_match = re.search(r'^#\s+(.+)', content, re.MULTILINE)
+            title_match = TITLE_RE.search(content)
             if title_match:
                 title = title_match.group(1).strip()
             else:
@@ -105,13 +152,151 @@ def find_markdown_files(directory):
                 md_files.append(os.path.join(root, file))
     return md_files
 
+def convert_files(md_files, workers=1):
+    """ingest_markdown_file results for md_files, in order; parsed across `workers` processes."""
+    if workers <= 1:
+        for file_path in md_files:
+            print(f"Processing: {file_path}")
+            yield ingest_markdown_file(file_path)
+        return
+    
+    # Hand files out in chunks so per-task IPC doesn't dominate on small posts
+    chunksize = max(1, min(256, len(md_files) // (workers * 8)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(ingest_markdown_file, md_files, chunksize=chunksize)
+
+JSONL_EXTENSIONS = ('.jsonl', '.ndjson')
+
+def output_format(output_path):
+    """'jsonl' for .jsonl/.ndjson outputs, else the original single-document 'json'."""
+    return 'jsonl' if output_path.suffix.lower() in JSONL_EXTENSIONS else 'json'
+
+def manifest_path_for(output_path):
+    """
+    The ingestion manifest sits next to the output and keeps its full name,
+    e.g. processed_blogs.jsonl.manifest.json, so a .json and a .jsonl output
+    side by side each keep their own.
+    """
+    return output_path.with_name(output_path.name + '.manifest.json')
+
+class JsonlEntries:
+    """
+    Blog entries of a JSON Lines output by source file. Only line offsets
+    are kept in memory; an entry is read back from disk when asked for, so
+    the file stays open until close() (or the end of a with block).
+    """
+    
+    def __init__(self, path):
+        self.offsets = {}
+        self.file = open(path, 'rb')
+        try:
+            offset = 0
+            for line in self.file:
+                if line.strip():
+                    self.offsets[json.loads(line)['source_file']] = offset
+                offset += len(line)
+        except Exception:
+            self.file.close()
+            raise
+    
+    def __contains__(self, source_file):
+        return source_file in self.offsets
+    
+    def __getitem__(self, source_file):
+        self.file.seek(self.offsets[source_file])
+        return json.loads(self.file.readline())
+    
+    def close(self):
+        self.file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+def load_previous_run(output_path):
+    """
+    Manifest records and blog entries (both keyed by source file) from the
+    last run, or two empty dicts if either file is missing or unreadable.
+    """
+    try:
+        with open(manifest_path_for(output_path), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if output_format(output_path) == 'jsonl':
+            blogs = JsonlEntries(output_path)
+        else:
+            with open(output_path, 'r', encoding='utf-8') as f:
+                blogs = {blog['source_file']: blog for blog in json.load(f).get('blogs', [])}
+    except (OSError, ValueError, KeyError) as e:
+        print(f"No usable previous run, processing every file ({e.__class__.__name__})")
+        return {}, {}
+    return manifest.get('files', {}), blogs
+
+def unchanged_by_stat(file_path, record):
+    """True when size and mtime match the manifest, so the file needn't be read at all."""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return False
+    return record is not None and record['size'] == stat.st_size and record['mtime_ns'] == stat.st_mtime_ns
+
+def ingest(md_files, previous_files, previous_blogs, workers=1):
+    """
+    Returns (iterator of blog entries for md_files in order, new manifest
+    records, changes since the previous run); the records and changes are
+    complete once the iterator is exhausted. Files whose size and mtime are
+    unchanged reuse their previous entry; the rest are parsed, and those
+    whose hash matches the manifest (e.g. only touched) still count as unchanged.
+    """
+    files = {}
+    changes = {"added": [], "changed": [], "removed": [], "unchanged": 0}
+    
+    def entries():
+        reuse = {file_path for file_path in md_files
+                 if file_path in previous_blogs and unchanged_by_stat(file_path, previous_files.get(file_path))}
+        parsed = convert_files([file_path for file_path in md_files if file_path not in reuse], workers)
+        for file_path in md_files:
+            if file_path in reuse:
+                blog_entry, record = previous_blogs[file_path], previous_files[file_path]
+            else:
+                blog_entry, record = next(parsed)
+            if record is None:
+                continue
+            files[file_path] = record
+            previous = previous_files.get(file_path)
+            if previous is None:
+                changes["added"].append(file_path)
+            elif previous['sha256'] != record['sha256']:
+                changes["changed"].append(file_path)
+            else:
+                changes["unchanged"] += 1
+            if blog_entry:
+                yield blog_entry
+        changes["removed"] = [file_path for file_path in previous_files if file_path not in files]
+    
+    return entries(), files, changes
+
+def write_jsonl(output_path, blogs):
+    """Write blog entries one per line as they arrive; the file is replaced only once complete."""
+    tmp_path = output_path.with_name(output_path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for blog in blogs:
+            f.write(json.dumps(blog, ensure_ascii=False))
+            f.write('\n')
+    os.replace(tmp_path, output_path)
+
 def main():
     parser = argparse.ArgumentParser(description='Convert markdown blog files to JSON for RAG system')
     parser.add_argument('input_dir', help='Directory containing markdown files')
     parser.add_argument('--output', '-o', default='../data/processed_blogs.json', 
-                       help='Output JSON file path')
+                       help='Output file path (.jsonl writes JSON Lines, one post per line)')
     parser.add_argument('--recursive', '-r', action='store_true', 
                        help='Search subdirectories recursively')
+    parser.add_argument('--workers', '-w', type=int, default=1,
+                       help='Parse files in this many processes (0 = one per CPU)')
+    parser.add_argument('--full', action='store_true',
+                       help='Ignore the ingestion manifest and re-process every file')
     
     args = parser.parse_args()
     
@@ -124,43 +309,74 @@ def main():
     
     print(f"Found {len(md_files)} markdown files")
     
-    # Process files
-    blogs = []
+    # Process new and changed files only, reusing the last run's entries for the rest
+    output_path = Path(args.output)
+    fmt = output_format(output_path)
+    previous_files, previous_blogs = ({}, {}) if args.full else load_previous_run(output_path)
+    workers = args.workers or os.cpu_count() or 1
+    if workers > 1:
+        print(f"Parsing with {workers} worker processes")
+    
+    entries, files, changes = ingest(md_files, previous_files, previous_blogs, workers)
     categories = set()
+    totals = {"count": 0, "words": 0}
     
-    for file_path in md_files:
-        print(f"Processing: {file_path}")
-        blog_entry = process_markdown_file(file_path)
-        
-        if blog_entry:
-            blogs.append(blog_entry)
-            if blog_entry['category']:
-                categories.add(blog_entry['category'])
-    
-    # Create output structure
-    output_data = {
-        "blogs": blogs,
-        "metadata": {
-            "total_count": len(blogs),
+    def tally(blogs):
+        for blog in blogs:
+            totals["count"] += 1
+            totals["words"] += blog['word_count']
+            if blog['category']:
+                categories.add(blog['category'])
+            yield blog
+    
+    def metadata():
+        return {
+            "total_count": totals["count"],
             "last_updated": datetime.now().isoformat(),
             "categories": list(categories),
             "source_directory": args.input_dir,
-            "processing_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            "processing_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            # Source files added/changed/removed since the previous run
+            "changes": changes
         }
-    }
     
     # Ensure output directory exists
-    output_path = Path(args.output)
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
-    # Write JSON file
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, indent=2, ensure_ascii=False)
+    try:
+        if fmt == 'jsonl':
+            # One post per line, written as it is produced; metadata goes in the manifest
+            write_jsonl(output_path, tally(entries))
+        else:
+            blogs = list(tally(entries))
+            output_data = {"blogs": blogs, "metadata": metadata()}
+            
+            # Write JSON file
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(output_data, f, indent=2, ensure_ascii=False)
+    finally:
+        # Reused entries are read from the previous output until the last one is written
+        if isinstance(previous_blogs, JsonlEntries):
+            previous_blogs.close()
+    
+    # Manifest last: if writing the output fails, the next run re-processes those files
+    manifest = {"output": os.path.abspath(output_path), "format": fmt, "files": files}
+    if fmt == 'jsonl':
+        manifest["metadata"] = metadata()
+    with open(manifest_path_for(output_path), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
     
-    print(f"\n✅ Successfully processed {len(blogs)} blog posts")
+    print(f"\n✅ Successfully processed {totals['count']} blog posts")
     print(f"📁 Output saved to: {output_path}")
+    print(f"🔁 Since last run: {len(changes['added'])} added, {len(changes['changed'])} changed, "
+          f"{len(changes['removed'])} removed, {changes['unchanged']} unchanged")
+    for kind in ('added', 'changed', 'removed'):
+        for file_path in changes[kind][:20]:
+            print(f"   {kind}: {file_path}")
+        if len(changes[kind]) > 20:
+            print(f"   ... and {len(changes[kind]) - 20:,} more {kind} (see the metadata)")
     print(f"📊 Categories found: {', '.join(categories)}")
-    print(f"📝 Total words: {sum(blog['word_count'] for blog in blogs):,}")
+    print(f"📝 Total words: {totals['words']:,}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file